@@ -0,0 +1,217 @@
+import argparse
+import json
+import multiprocessing
+import sqlite3
+import time
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from betting_stats import STANDARD_JUICE
+
+# games columns known before kickoff; strategies may only filter on these
+PRE_GAME_COLUMNS = {
+    "season", "game_type", "date", "iso_date", "date_ord", "month", "day_of_season",
+    "team_id", "opponent_id", "team", "opponent", "team_rank", "opp_rank",
+    "team_conf", "opp_conf", "team_division", "opp_division", "coach", "opp_coach",
+    "team_spread", "opp_spread", "site", "underdog_favorite", "team_game_no",
+    "team_wins_entering", "team_losses_entering", "team_ties_entering",
+    "opp_wins_entering", "opp_losses_entering", "opp_ties_entering", "over_under",
+}
+FILTER_OPERATORS = {"=", "!=", "<", "<=", ">", ">=", "in", "not in", "is null", "is not null"}
+# bet -> (games column holding the graded result, value for a win, value for a loss)
+BET_OUTCOMES = {
+    "cover": ("covered", "yes", "no"),
+    "fade": ("covered", "no", "yes"),
+    "over": ("over_or_under_result", "over", "under"),
+    "under": ("over_or_under_result", "under", "over"),
+}
+STAKE_RULES = ("flat", "to_win")
+
+class Strategy(NamedTuple):
+    """
+    Declarative strategy: bet `bet` on every games row matching all `filters`
+    ((column, operator, value) on PRE_GAME_COLUMNS) between the seasons, at `odds`.
+    stake "flat" risks 1 unit per bet, "to_win" risks enough to win 1 unit.
+    """
+    name: str
+    filters: Tuple[Tuple[str, str, object], ...] = ()
+    bet: str = "cover"
+    stake: str = "flat"
+    odds: int = STANDARD_JUICE
+    start_year: Optional[int] = None
+    end_year: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Strategy":
+        data = dict(data)
+        data["filters"] = tuple(tuple(f) for f in data.get("filters", ()))
+        return cls(**data)
+
+def profit_per_unit(odds: int) -> float:
+    """Profit on a 1 unit winning bet at American `odds`."""
+    return 100 / -odds if odds < 0 else odds / 100
+
+def strategy_sql(strategy: Strategy) -> Tuple[str, list]:
+    """
+    Per season results of `strategy` as one query: every matching row is graded,
+    staked and priced in SQL, and a running sum / running max over the bets in
+    date order gives the equity curve and drawdown.
+    """
+    if strategy.bet not in BET_OUTCOMES:
+        raise ValueError(f"Unknown bet '{strategy.bet}', expected one of {sorted(BET_OUTCOMES)}")
+    if strategy.stake not in STAKE_RULES:
+        raise ValueError(f"Unknown stake rule '{strategy.stake}', expected one of {STAKE_RULES}")
+    if -100 < strategy.odds < 100:
+        raise ValueError(f"Invalid American odds {strategy.odds}")
+
+    conditions = []
+    params: list = []
+    for column, operator, *value in strategy.filters:
+        operator = operator.lower()
+        if column not in PRE_GAME_COLUMNS:
+            raise ValueError(f"Column '{column}' is not known before kickoff (or not a games column)")
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unknown filter operator '{operator}'")
+        if operator in ("is null", "is not null"):
+            conditions.append(f"{column} {operator.upper()}")
+        elif operator in ("in", "not in"):
+            values = list(value[0])
+            conditions.append(f"{column} {operator.upper()} ({','.join(['?'] * len(values))})")
+            params.extend(values)
+        else:
+            conditions.append(f"{column} {operator} ?")
+            params.append(value[0])
+    if strategy.start_year is not None:
+        conditions.append("season >= ?")
+        params.append(strategy.start_year)
+    if strategy.end_year is not None:
+        conditions.append("season <= ?")
+        params.append(strategy.end_year)
+
+    result_column, win_value, loss_value = BET_OUTCOMES[strategy.bet]
+    payout = profit_per_unit(strategy.odds)
+    # flat: risk 1 to win payout; to_win: risk 1 / payout to win 1
+    risk, win_profit = (1.0, payout) if strategy.stake == "flat" else (1 / payout, 1.0)
+    where = " AND ".join(conditions) if conditions else "1"
+    query = f"""
+        WITH bets AS (
+            SELECT id, season, date_ord,
+                CASE LOWER({result_column}) WHEN '{win_value}' THEN 1 WHEN '{loss_value}' THEN -1 ELSE 0 END AS outcome
+            FROM games
+            WHERE {where} AND {result_column} IS NOT NULL
+        ),
+        priced AS (
+            SELECT *,
+                CASE outcome WHEN 1 THEN {win_profit!r} WHEN -1 THEN -{risk!r} ELSE 0.0 END AS profit,
+                CASE WHEN outcome = 0 THEN 0.0 ELSE {risk!r} END AS risked
+            FROM bets
+        ),
+        curve AS (
+            SELECT *, SUM(profit) OVER bets_so_far AS equity
+            FROM priced
+            WINDOW bets_so_far AS (ORDER BY date_ord, id ROWS UNBOUNDED PRECEDING)
+        ),
+        peaks AS (
+            -- equity starts at 0 before the first bet
+            SELECT *, MAX(0.0, MAX(equity) OVER bets_so_far) AS peak
+            FROM curve
+            WINDOW bets_so_far AS (ORDER BY date_ord, id ROWS UNBOUNDED PRECEDING)
+        )
+        SELECT season, COUNT(*) AS bets,
+            SUM(outcome = 1) AS wins, SUM(outcome = -1) AS losses, SUM(outcome = 0) AS pushes,
+            SUM(profit) AS units, SUM(risked) AS risked, MAX(peak - equity) AS max_drawdown
+        FROM peaks
+        GROUP BY season
+        ORDER BY season
+    """
+    return query, params
+
+def _summary(bets: int, wins: int, losses: int, pushes: int, units: float, risked: float) -> dict:
+    decided = wins + losses
+    return {
+        "bets": bets,
+        "wins": wins,
+        "losses": losses,
+        "pushes": pushes,
+        "win_pct": round(wins / decided * 100, 2) if decided else None,
+        "units": round(units, 2),
+        "risked": round(risked, 2),
+        "roi_pct": round(units / risked * 100, 2) if risked else None,
+    }
+
+def run_strategy(conn: sqlite3.Connection, strategy: Strategy) -> dict:
+    """
+    Backtests `strategy` over games. Returns the overall record, units won, ROI on
+    units risked and the max drawdown (in units, from the running peak), plus the
+    same numbers per season under "seasons".
+    """
+    query, params = strategy_sql(strategy)
+    rows = conn.execute(query, params).fetchall()
+    seasons = {}
+    totals = [0, 0, 0, 0, 0.0, 0.0]
+    max_drawdown = 0.0
+    for season, bets, wins, losses, pushes, units, risked, drawdown in rows:
+        seasons[season] = _summary(bets, wins, losses, pushes, units, risked)
+        seasons[season]["max_drawdown"] = round(drawdown, 2)
+        for i, value in enumerate((bets, wins, losses, pushes, units, risked)):
+            totals[i] += value
+        # peaks are running over all seasons, so the overall max is the max per season
+        max_drawdown = max(max_drawdown, drawdown)
+    result = {"strategy": strategy.name}
+    result.update(_summary(*totals))
+    result["max_drawdown"] = round(max_drawdown, 2)
+    result["seasons"] = seasons
+    return result
+
+# per worker process state for sweep, set by _init_backtest_worker
+_worker_conn = None
+
+def _init_backtest_worker(db_path: str):
+    global _worker_conn
+    _worker_conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+def _backtest_worker(strategy: Strategy) -> dict:
+    return run_strategy(_worker_conn, strategy)
+
+def sweep(db_path: str, strategies: Sequence[Strategy], workers: int = 4) -> List[dict]:
+    """
+    Backtests many strategy variants on a process pool (one read-only connection per
+    worker) and returns the results in input order.
+    """
+    start = time.perf_counter()
+    # reject bad strategies before starting any workers
+    for strategy in strategies:
+        strategy_sql(strategy)
+    if workers <= 1 or len(strategies) <= 1:
+        _init_backtest_worker(str(db_path))
+        results = [_backtest_worker(strategy) for strategy in strategies]
+    else:
+        with multiprocessing.Pool(processes=min(workers, len(strategies)),
+                                  initializer=_init_backtest_worker,
+                                  initargs=(str(db_path),)) as pool:
+            results = pool.map(_backtest_worker, strategies, chunksize=max(1, len(strategies) // (workers * 4)))
+    print(f"[info] Backtested {len(strategies)} strategies in {time.perf_counter() - start:.2f}s.")
+    return results
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Backtest betting strategies against games.")
+    arg_parser.add_argument("strategies", help="json file with a list of strategy objects "
+                            "(name, filters [[column, op, value], ...], bet, stake, odds, start_year, end_year)")
+    arg_parser.add_argument("--db", default="./new_database.db", help="sqlite database path")
+    arg_parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    arg_parser.add_argument("--seasons", action="store_true", help="print the per season breakdown")
+    args = arg_parser.parse_args()
+
+    with open(args.strategies, "r", encoding="utf-8") as f:
+        strategies = [Strategy.from_dict(data) for data in json.load(f)]
+    results = sweep(args.db, strategies, workers=args.workers)
+    results.sort(key=lambda r: r["roi_pct"] if r["roi_pct"] is not None else float("-inf"), reverse=True)
+    for result in results:
+        print(f"{result['strategy']}: {result['wins']}-{result['losses']}-{result['pushes']} "
+              f"({result['win_pct']}%), {result['units']:+.2f} units, ROI {result['roi_pct']}%, "
+              f"max drawdown {result['max_drawdown']:.2f}")
+        if args.seasons:
+            for season, s in result["seasons"].items():
+                print(f"    {season}: {s['wins']}-{s['losses']}-{s['pushes']} {s['units']:+.2f} units "
+                      f"(ROI {s['roi_pct']}%, drawdown {s['max_drawdown']:.2f})")
+
+if __name__=="__main__":
+    main()
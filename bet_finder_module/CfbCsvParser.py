@@ -0,0 +1,214 @@
+import csv
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from CfbGameDb import GAME_COLUMNS
+from TeamResolver import TeamResolver
+from utilities import CsvKeys, game_date_columns
+
+# returned by converters instead of raising so a whole column converts in one map()
+INVALID = object()
+
+def to_text(value: str):
+    value = value.strip()
+    return value if value else None
+
+def to_lower(value: str):
+    value = value.strip().lower()
+    return value if value else None
+
+def to_float(value: str):
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return INVALID
+
+def to_int(value: str):
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        number = to_float(value)
+        if number is None or number is INVALID or not number.is_integer():
+            return INVALID
+        return int(number)
+
+def to_rank(value: str):
+    # unranked teams are exported as "NR"
+    if value.strip().upper() == "NR":
+        return None
+    return to_int(value)
+
+def to_date_columns(date_text: Optional[str], season):
+    if season is INVALID:
+        season = None
+    try:
+        return game_date_columns(date_text, season)
+    except ValueError:
+        return INVALID
+
+def to_site(value: str):
+    value = value.strip().upper()
+    if not value:
+        return "N"
+    return value if value in ("N", "V", "H") else INVALID
+
+# games column -> (csv column, converter). team_id / opponent_id are resolved from team / opponent.
+CSV_SCHEMA = {
+    "season": (CsvKeys.SEASON, to_int),
+    "game_type": (CsvKeys.GAME_TYPE, to_lower),
+    "date": (CsvKeys.DATE, to_text),
+    "team_rank": (CsvKeys.TEAM_RANK, to_rank),
+    "team": (CsvKeys.TEAM, to_lower),
+    "team_conf": (CsvKeys.TEAM_CONF, to_lower),
+    "team_division": (CsvKeys.TEAM_DIVISION, to_lower),
+    "coach": (CsvKeys.COACH, to_lower),
+    "team_spread": (CsvKeys.TEAM_SPREAD, to_float),
+    "site": (CsvKeys.SITE, to_site),
+    "opp_rank": (CsvKeys.OPP_RANK, to_rank),
+    "opponent": (CsvKeys.OPPONENT, to_lower),
+    "opp_conf": (CsvKeys.OPP_CONF, to_lower),
+    "opp_division": (CsvKeys.OPP_DIVISION, to_lower),
+    "opp_coach": (CsvKeys.OPP_COACH, to_lower),
+    "opp_spread": (CsvKeys.OPP_SPREAD, to_float),
+    "result": (CsvKeys.RESULT, to_text),
+    "team_points": (CsvKeys.TEAM_POINTS, to_int),
+    "opp_points": (CsvKeys.OPP_POINTS, to_int),
+    "points_diff": (CsvKeys.POINTS_DIFF, to_int),
+    "total_points": (CsvKeys.TOTAL_POINTS, to_int),
+    "team_season_id": (CsvKeys.TEAM_SEASON_ID, to_lower),
+    "team_game_no": (CsvKeys.TEAM_GAME_NO, to_int),
+    "underdog_favorite": (CsvKeys.UNDERDOG_FAVORITE, to_lower),
+    "covered": (CsvKeys.COVERED, to_lower),
+    "team_wins_entering": (CsvKeys.TEAM_WINS_ENTERING, to_int),
+    "team_losses_entering": (CsvKeys.TEAM_LOSSES_ENTERING, to_int),
+    "team_ties_entering": (CsvKeys.TEAM_TIES_ENTERING, to_int),
+    "opp_wins_entering": (CsvKeys.OPP_WINS_ENTERING, to_int),
+    "opp_losses_entering": (CsvKeys.OPP_LOSSES_ENTERING, to_int),
+    "opp_ties_entering": (CsvKeys.OPP_TIES_ENTERING, to_int),
+    "over_under": (CsvKeys.OVER_UNDER, to_float),
+    "over_or_under_result": (CsvKeys.OVER_OR_UNDER_RESULT, to_lower),
+}
+ID_COLUMNS = {"team_id": "team", "opponent_id": "opponent"}
+# derived from the parsed date + season by game_date_columns
+DATE_COLUMNS = ("iso_date", "date_ord", "month", "day_of_season")
+assert set(CSV_SCHEMA) | set(ID_COLUMNS) | set(DATE_COLUMNS) == set(GAME_COLUMNS), \
+    "CSV_SCHEMA out of sync with GAME_COLUMNS"
+MIN_ROW_LENGTH = max(key for key, _ in CSV_SCHEMA.values()) + 1
+
+class CfbCsvParser:
+    """
+    Typed parsing stage for the CFB csv export.
+    Rows are read in chunks and converted a column at a time (one map() per column
+    per chunk) into ints / floats / None / lowercase categoricals, the date is expanded
+    into iso_date / date_ord / month / day_of_season, team names are resolved to ids,
+    and the result is yielded as tuples in GAME_COLUMNS order.
+    Malformed or unresolved rows go to a side csv with a trailing reason column.
+    """
+    def __init__(self, resolver: TeamResolver, chunk_size: int = 5000,
+                 rejects_path: Optional[Path] = None):
+        assert chunk_size > 0, "chunk_size must be positive"
+        self.resolver = resolver
+        self.chunk_size = chunk_size
+        self.rejects_path = rejects_path
+        self._rejects_file = None
+        self._rejects_writer = None
+        self.counts = {"parsed": 0, "rejected": 0, "unresolved": 0}
+
+    def convert_chunk(self, rows: List[List[str]]) -> Tuple[List[tuple], List[Tuple[list, str]]]:
+        """Returns (db tuples, [(row, reason), ...]) for a chunk of raw csv rows."""
+        rejects = []
+        good_rows = []
+        for row in rows:
+            if len(row) < MIN_ROW_LENGTH:
+                rejects.append((row, f"short row ({len(row)} columns)"))
+            else:
+                good_rows.append(row)
+        if not good_rows:
+            return [], rejects
+
+        columns = {}
+        bad_index = {}
+        for name, (key, converter) in CSV_SCHEMA.items():
+            values = list(map(converter, [row[key] for row in good_rows]))
+            if INVALID in values:
+                for i, value in enumerate(values):
+                    if value is INVALID:
+                        bad_index.setdefault(i, f"invalid {name}: '{good_rows[i][key]}'")
+            columns[name] = values
+
+        date_values = list(map(to_date_columns, columns["date"], columns["season"]))
+        if INVALID in date_values:
+            for i, value in enumerate(date_values):
+                if value is INVALID:
+                    bad_index.setdefault(i, f"invalid date: '{columns['date'][i]}'")
+                    date_values[i] = (None,) * len(DATE_COLUMNS)
+        columns.update(zip(DATE_COLUMNS, zip(*date_values)))
+
+        # one resolver lookup per distinct name in the chunk
+        for id_column, name_column in ID_COLUMNS.items():
+            names = columns[name_column]
+            ids = {name: self.resolver.get_id(name) for name in set(names)}
+            columns[id_column] = [ids[name] for name in names]
+            for i, team_id in enumerate(columns[id_column]):
+                if team_id is None:
+                    bad_index.setdefault(i, f"unresolved team: '{names[i]}'")
+
+        tuples = list(zip(*(columns[name] for name in GAME_COLUMNS)))
+        if bad_index:
+            rejects.extend((good_rows[i], reason) for i, reason in sorted(bad_index.items()))
+            tuples = [t for i, t in enumerate(tuples) if i not in bad_index]
+        return tuples, rejects
+
+    def iter_chunks(self, rows) -> Iterator[List[tuple]]:
+        """Converts an iterable of raw csv rows (header already consumed) chunk by chunk."""
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            tuples, rejects = self.convert_chunk(chunk)
+            self.counts["parsed"] += len(tuples)
+            self.write_rejects(rejects)
+            yield tuples
+
+    def iter_file_chunks(self, csv_path: Path) -> Iterator[List[tuple]]:
+        """Yields lists of db tuples, one per chunk of `csv_path`."""
+        try:
+            with open(csv_path, newline='', encoding='utf-8') as csvfile:
+                reader = csv.reader(csvfile)
+                next(reader, None)
+                yield from self.iter_chunks(reader)
+        finally:
+            self.close()
+
+    def iter_file(self, csv_path: Path) -> Iterator[tuple]:
+        """Yields db tuples for every valid row of `csv_path`."""
+        for tuples in self.iter_file_chunks(csv_path):
+            yield from tuples
+
+    def write_rejects(self, rejects: List[Tuple[list, str]]):
+        for row, reason in rejects:
+            if reason.startswith("unresolved team"):
+                self.counts["unresolved"] += 1
+            else:
+                self.counts["rejected"] += 1
+            if self.rejects_path is None:
+                print(f"[warn] Rejected row ({reason}): {row}")
+                continue
+            if self._rejects_writer is None:
+                self._rejects_file = open(self.rejects_path, "w", newline='', encoding='utf-8')
+                self._rejects_writer = csv.writer(self._rejects_file)
+            self._rejects_writer.writerow(list(row) + [reason])
+
+    def close(self):
+        if self._rejects_file is not None:
+            self._rejects_file.close()
+            self._rejects_file = None
+            self._rejects_writer = None
+            print(f"[info] Wrote {self.counts['rejected'] + self.counts['unresolved']} rejected rows to {self.rejects_path}")
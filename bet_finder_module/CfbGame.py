@@ -1,12 +1,59 @@
 from typing import Optional
+
+# attribute names in to_db_tuple() order, also the games table column order
+GAME_FIELDS = (
+    "team_id",
+    "opponent_id",
+    "season",
+    "game_type",
+    "date",
+    "team_rank",
+    "team",
+    "team_conf",
+    "team_division",
+    "coach",
+    "team_spread",
+    "site",
+    "opp_rank",
+    "opponent",
+    "opp_conf",
+    "opp_division",
+    "opp_coach",
+    "opp_spread",
+    "result",
+    "team_points",
+    "opp_points",
+    "points_diff",
+    "total_points",
+    "team_season_id",
+    "team_game_no",
+    "underdog_favorite",
+    "covered",
+    "team_wins_entering",
+    "team_losses_entering",
+    "team_ties_entering",
+    "opp_wins_entering",
+    "opp_losses_entering",
+    "opp_ties_entering",
+    "over_under",
+    "over_or_under_result",
+    "iso_date",
+    "date_ord",
+    "month",
+    "day_of_season",
+)
+
 class CfbGame:
+    # no per-instance __dict__: large loads create one of these per csv row
+    __slots__ = GAME_FIELDS
+
     def __init__(
         self,
         team_id: Optional[int] = None,
         opponent_id: Optional[int] = None,
         season: Optional[int] = None,
         game_type: Optional[str] = None,
-        date: Optional[str] = None,  # ISO string, e.g., '2025-09-01'
+        date: Optional[str] = None,  # as exported, e.g. '1/20/25'
         team_rank: Optional[int] = None,
         team: Optional[str] = None,
         team_conf: Optional[str] = None,
@@ -25,7 +72,7 @@ class CfbGame:
         opp_points: Optional[int] = None,
         points_diff: Optional[int] = None,
         total_points: Optional[int] = None,
-        team_season_id: Optional[int] = None,
+        team_season_id: Optional[str] = None,
         team_game_no: Optional[int] = None,
         underdog_favorite: Optional[str] = None,
         covered: Optional[str] = None,
@@ -37,6 +84,10 @@ class CfbGame:
         opp_ties_entering: Optional[int] = None,
         over_under: Optional[float] = None,
         over_or_under_result: Optional[str] = None,
+        iso_date: Optional[str] = None,  # derived from date, e.g. '2025-01-20'
+        date_ord: Optional[int] = None,  # date.toordinal()
+        month: Optional[int] = None,
+        day_of_season: Optional[int] = None,  # days since July 1 of the season year
     ):
         self.team_id = team_id
         self.opponent_id = opponent_id
@@ -73,6 +124,10 @@ class CfbGame:
         self.opp_ties_entering = opp_ties_entering
         self.over_under = over_under
         self.over_or_under_result = over_or_under_result
+        self.iso_date = iso_date
+        self.date_ord = date_ord
+        self.month = month
+        self.day_of_season = day_of_season
     def to_db_tuple(self):
         return (
             self.team_id,
@@ -110,6 +165,10 @@ class CfbGame:
             self.opp_ties_entering,
             self.over_under,
             self.over_or_under_result,
+            self.iso_date,
+            self.date_ord,
+            self.month,
+            self.day_of_season,
         )
     def __repr__(self):
         return f"<CfbGame {self.team} vs {self.opponent} on {self.date}>"
\ No newline at end of file
@@ -0,0 +1,135 @@
+import sqlite3
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+from CfbGame import CfbGame, GAME_FIELDS
+
+# storage kind per field, taken from the CfbGame.__init__ annotations
+def _field_kind(annotation) -> str:
+    args = getattr(annotation, "__args__", (annotation,))
+    if int in args:
+        return "int"
+    if float in args:
+        return "float"
+    return "str"
+
+FIELD_KINDS = {name: _field_kind(CfbGame.__init__.__annotations__[name]) for name in GAME_FIELDS}
+# every int field (ids, seasons, points, ranks, records) fits in 32 bits
+ARRAY_TYPECODES = {"int": "i", "float": "d"}
+
+class CfbGameBatch:
+    """
+    Columnar container for many games, keyed by CfbGame field name.
+    int / float fields live in array.array columns with a bytearray null mask, str fields
+    are dictionary encoded (array of codes into a per-column value list, code 0 is None).
+    Rows are only materialized on demand, either as db tuples or as CfbGame objects.
+    """
+    def __init__(self):
+        self._length = 0
+        self._values: Dict[str, array] = {}
+        self._nulls: Dict[str, bytearray] = {}
+        self._dictionaries: Dict[str, List[Optional[str]]] = {}
+        self._codes: Dict[str, Dict[Optional[str], int]] = {}
+        for name, kind in FIELD_KINDS.items():
+            if kind == "str":
+                self._values[name] = array("I")
+                self._dictionaries[name] = [None]
+                self._codes[name] = {None: 0}
+            else:
+                self._values[name] = array(ARRAY_TYPECODES[kind])
+                self._nulls[name] = bytearray()
+
+    @classmethod
+    def from_tuples(cls, rows: Iterable[tuple]) -> "CfbGameBatch":
+        """Builds a batch from tuples in GAME_FIELDS order (e.g. a CfbCsvParser chunk)."""
+        batch = cls()
+        batch.extend(rows)
+        return batch
+
+    @classmethod
+    def from_cursor(cls, cursor: sqlite3.Cursor, fetch_size: int = 5000) -> "CfbGameBatch":
+        """
+        Builds a batch from an executed query that selects every GAME_FIELDS column
+        (any order, extra columns are ignored).
+        """
+        names = [d[0] for d in cursor.description]
+        missing = [name for name in GAME_FIELDS if name not in names]
+        assert not missing, f"Query is missing game columns: {missing}"
+        positions = [names.index(name) for name in GAME_FIELDS]
+        batch = cls()
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            if positions != list(range(len(GAME_FIELDS))):
+                rows = [tuple(row[p] for p in positions) for row in rows]
+            batch.extend(rows)
+        return batch
+
+    def extend(self, rows: Iterable[tuple]):
+        """Appends rows column by column (one pass per column, no per-row objects)."""
+        rows = rows if isinstance(rows, list) else list(rows)
+        if not rows:
+            return
+        columns = list(zip(*rows))
+        assert len(columns) == len(GAME_FIELDS), \
+            f"Expected {len(GAME_FIELDS)} values per row, got {len(columns)}"
+        for name, column in zip(GAME_FIELDS, columns):
+            if FIELD_KINDS[name] == "str":
+                codes = self._codes[name]
+                dictionary = self._dictionaries[name]
+                for value in set(column):
+                    if value not in codes:
+                        codes[value] = len(dictionary)
+                        dictionary.append(value)
+                self._values[name].extend(map(codes.__getitem__, column))
+            elif None in column:
+                self._nulls[name].extend([value is None for value in column])
+                self._values[name].extend([0 if value is None else value for value in column])
+            else:
+                self._nulls[name].extend(bytes(len(column)))
+                self._values[name].extend(column)
+        self._length += len(rows)
+
+    def append(self, row: tuple):
+        self.extend([row])
+
+    def __len__(self):
+        return self._length
+
+    def column(self, name: str) -> list:
+        """Python values of one field, with None for nulls."""
+        values = self._values[name]
+        if FIELD_KINDS[name] == "str":
+            return list(map(self._dictionaries[name].__getitem__, values))
+        return [None if null else value for value, null in zip(values, self._nulls[name])]
+
+    def iter_db_tuples(self) -> Iterator[tuple]:
+        """Yields rows in GAME_FIELDS order, ready for CfbGameDb.insert_games / stage_games."""
+        return zip(*(self.column(name) for name in GAME_FIELDS))
+
+    def iter_games(self) -> Iterator[CfbGame]:
+        for row in self.iter_db_tuples():
+            yield CfbGame(*row)
+
+    def game(self, index: int) -> CfbGame:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("CfbGameBatch index out of range")
+        values = []
+        for name in GAME_FIELDS:
+            if FIELD_KINDS[name] == "str":
+                values.append(self._dictionaries[name][self._values[name][index]])
+            elif self._nulls[name][index]:
+                values.append(None)
+            else:
+                values.append(self._values[name][index])
+        return CfbGame(*values)
+
+    def nbytes(self) -> int:
+        """Approximate size of the column buffers (excluding the shared str dictionaries)."""
+        total = sum(values.itemsize * len(values) for values in self._values.values())
+        return total + sum(len(nulls) for nulls in self._nulls.values())
+
+    def __repr__(self):
+        return f"<CfbGameBatch {self._length} games>"
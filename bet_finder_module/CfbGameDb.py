@@ -1,9 +1,21 @@
-from CfbGame import CfbGame
+from CfbGame import CfbGame, GAME_FIELDS
+from TeamResolver import TeamResolver
+from utilities import game_date_columns
 import sqlite3
+import time
+from itertools import islice
+from typing import Iterable, Optional, Union
+
+# games columns in CfbGame.to_db_tuple() order
+GAME_COLUMNS = GAME_FIELDS
+# natural key of a game row, one row per team per game
+GAME_KEY_COLUMNS = ("team_id", "opponent_id", "date")
+
 class CfbGameDb:
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(self, conn: sqlite3.Connection, resolver: Optional[TeamResolver] = None):
         self._conn = conn
         self._cur = self._conn.cursor()
+        self._resolver = resolver
 
         self._ddl = """
             CREATE TABLE IF NOT EXISTS games (
@@ -12,7 +24,7 @@ class CfbGameDb:
                 opponent_id             INTEGER,
                 season                  INTEGER,
                 game_type               TEXT,
-                date                    TEXT,  -- ISO 8601
+                date                    TEXT,  -- as exported, m/d/yy
                 team_rank               INTEGER,
                 team                    TEXT,
                 team_conf               TEXT,
@@ -43,29 +55,80 @@ class CfbGameDb:
                 opp_ties_entering       INTEGER,
                 over_under              REAL,
                 over_or_under_result    TEXT,
+                iso_date                TEXT,  -- ISO 8601, derived from date
+                date_ord                INTEGER,  -- proleptic Gregorian ordinal
+                month                   INTEGER,
+                day_of_season           INTEGER,  -- days since July 1 of the season year
                 FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE CASCADE,
                 FOREIGN KEY (opponent_id) REFERENCES teams(id) ON DELETE CASCADE
             );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_games_natural_key
+                ON games(team_id, opponent_id, date);
             """
 
+        # access paths for BetFinder: per team / opponent season ranges, conference
+        # filters and league wide season scans
+        self._index_ddl = """
+            CREATE INDEX IF NOT EXISTS idx_games_team_season ON games(team_id, season);
+            CREATE INDEX IF NOT EXISTS idx_games_opponent_season ON games(opponent_id, season);
+            CREATE INDEX IF NOT EXISTS idx_games_opp_conf_season ON games(opp_conf, season);
+            CREATE INDEX IF NOT EXISTS idx_games_season_date_ord ON games(season, date_ord);
+            DROP INDEX IF EXISTS idx_games_season;
+            """
+        # columns added after the first release of the games table, with their types
+        self._date_columns = {
+            "iso_date": "TEXT",
+            "date_ord": "INTEGER",
+            "month": "INTEGER",
+            "day_of_season": "INTEGER",
+        }
 
-        self._insert_sql = """
-        INSERT INTO games (
-            team_id, opponent_id,
-            season, game_type, date,
-            team_rank, team, team_conf, team_division, coach,
-            team_spread, site,
-            opp_rank, opponent, opp_conf, opp_division, opp_coach,
-            opp_spread, result,
-            team_points, opp_points, points_diff, total_points,
-            team_season_id, team_game_no,
-            underdog_favorite, covered,
-            team_wins_entering, team_losses_entering, team_ties_entering,
-            opp_wins_entering, opp_losses_entering, opp_ties_entering,
-            over_under, over_or_under_result
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
-        """
+
+        columns = ", ".join(GAME_COLUMNS)
+        placeholders = ", ".join(["?"] * len(GAME_COLUMNS))
+        key_columns = ", ".join(GAME_KEY_COLUMNS)
+        self._insert_sql = f"INSERT INTO games ({columns}) VALUES ({placeholders});"
+
+        # set based ingest: rows are bulk loaded into a temp staging table and merged
+        # into games with one INSERT ... SELECT ... ON CONFLICT on the natural key
+        self._staging_ddl = f"""
+            CREATE TEMP TABLE IF NOT EXISTS games_staging AS
+                SELECT {columns}, 0 AS source_order FROM games WHERE 0;
+            CREATE UNIQUE INDEX IF NOT EXISTS temp.idx_games_staging_key
+                ON games_staging({key_columns});
+            """
+        key_match = " AND ".join(f"g.{c} = s.{c}" for c in GAME_KEY_COLUMNS)
+        value_columns = [c for c in GAME_COLUMNS if c not in GAME_KEY_COLUMNS]
+        # a staged key is only replaced by a row from a later source (e.g. the next csv)
+        self._stage_sql = f"""
+            INSERT INTO games_staging ({columns}, source_order) VALUES ({placeholders}, ?)
+            ON CONFLICT({key_columns}) DO UPDATE SET
+                {", ".join(f"{c} = excluded.{c}" for c in value_columns)},
+                source_order = excluded.source_order
+            WHERE excluded.source_order > games_staging.source_order;
+            """
+        self._count_new_sql = f"""
+            SELECT COUNT(*) FROM games_staging s
+            WHERE NOT EXISTS (SELECT 1 FROM games g WHERE {key_match});
+            """
+        self._count_changed_sql = f"""
+            SELECT COUNT(*) FROM games_staging s
+            JOIN games g ON {key_match}
+            WHERE {" OR ".join(f"g.{c} IS NOT s.{c}" for c in value_columns)};
+            """
+        # WHERE true is required by sqlite to parse ON CONFLICT after a SELECT
+        self._merge_update_sql = f"""
+            INSERT INTO games ({columns})
+            SELECT {columns} FROM games_staging WHERE true
+            ON CONFLICT({key_columns}) DO UPDATE SET
+                {", ".join(f"{c} = excluded.{c}" for c in value_columns)}
+            WHERE {" OR ".join(f"games.{c} IS NOT excluded.{c}" for c in value_columns)};
+            """
+        self._merge_ignore_sql = f"""
+            INSERT INTO games ({columns})
+            SELECT {columns} FROM games_staging WHERE true
+            ON CONFLICT({key_columns}) DO NOTHING;
+            """
 
     def table_exists(self, table_name: str) -> bool:
         try:
@@ -84,9 +147,151 @@ class CfbGameDb:
             return False
         print("[info] Creating table 'games'.")
         self._cur.executescript(self._ddl)
+        self._cur.executescript(self._index_ddl)
         self._conn.commit()
         return True
 
+    def ensure_indexes(self, analyze: bool = True):
+        """
+        Creates any missing query indexes and, by default, refreshes the planner
+        statistics with ANALYZE. Run after an ingest.
+        """
+        self.ensure_schema()
+        self._cur.executescript(self._index_ddl)
+        if analyze:
+            self._cur.execute("ANALYZE games;")
+        self._conn.commit()
+
+    def ensure_schema(self):
+        """Brings a games table created by an older version up to the current schema."""
+        self.ensure_natural_key()
+        self.ensure_date_columns()
+
+    def ensure_date_columns(self):
+        """
+        Adds iso_date / date_ord / month / day_of_season to an older games table and
+        backfills them from date and season. Returns the number of rows backfilled.
+        """
+        existing = {row[1] for row in self._cur.execute("PRAGMA table_info(games);")}
+        missing = [c for c in self._date_columns if c not in existing]
+        with self._conn:
+            for column in missing:
+                self._cur.execute(f"ALTER TABLE games ADD COLUMN {column} {self._date_columns[column]};")
+        rows = self._cur.execute(
+            "SELECT id, date, season FROM games WHERE date_ord IS NULL AND date IS NOT NULL;"
+        ).fetchall()
+        if not rows:
+            return 0
+        updates = []
+        for game_id, date_text, season in rows:
+            try:
+                season = int(season) if season not in (None, "") else None
+                updates.append(game_date_columns(date_text, season) + (game_id,))
+            except ValueError as e:
+                print(f"[warn] Could not parse date '{date_text}' for game {game_id}: {e}")
+        with self._conn:
+            self._cur.executemany(
+                "UPDATE games SET iso_date = ?, date_ord = ?, month = ?, day_of_season = ? WHERE id = ?;",
+                updates
+            )
+        print(f"[info] Backfilled date columns for {len(updates)} games.")
+        return len(updates)
+
+    def ensure_natural_key(self):
+        """
+        Adds the UNIQUE (team_id, opponent_id, date) index to a games table created
+        before it existed, dropping duplicate rows (keeps the lowest id) first.
+        """
+        self._cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_games_natural_key';"
+        )
+        if self._cur.fetchone() is not None:
+            return False
+        key_columns = ", ".join(GAME_KEY_COLUMNS)
+        with self._conn:
+            self._cur.execute(f"""
+                DELETE FROM games WHERE id NOT IN (
+                    SELECT MIN(id) FROM games GROUP BY {key_columns}
+                );
+            """)
+            removed = self._cur.rowcount
+            self._cur.execute(
+                f"CREATE UNIQUE INDEX idx_games_natural_key ON games({key_columns});"
+            )
+        print(f"[info] Created natural key index on games ({removed} duplicate rows removed).")
+        return True
+
+    def begin_staging(self):
+        """Creates (or empties) the temp games_staging table."""
+        self.ensure_schema()
+        self._cur.executescript(self._staging_ddl)
+        with self._conn:
+            self._cur.execute("DELETE FROM games_staging;")
+
+    def stage_games(self, games: Iterable[Union[CfbGame, tuple]], batch_size: int = 5000,
+                    source_order: int = 0):
+        """
+        Bulk loads games into games_staging, one executemany per batch.
+        A natural key already staged from the same source_order is kept (first one wins);
+        one staged from a lower source_order is replaced. Returns the number of rows read.
+        """
+        assert batch_size > 0, "batch_size must be positive"
+        games_iter = iter(games)
+        count_read = 0
+        while True:
+            batch = [(g.to_db_tuple() if isinstance(g, CfbGame) else tuple(g)) + (source_order,)
+                     for g in islice(games_iter, batch_size)]
+            if not batch:
+                break
+            with self._conn:
+                self._cur.executemany(self._stage_sql, batch)
+            count_read += len(batch)
+        return count_read
+
+    def merge_staging(self, update_existing: bool = True):
+        """
+        Merges games_staging into games in a single transaction and empties it.
+        New keys are inserted; existing keys are updated only when a value differs
+        (or never, with update_existing=False). Returns inserted/updated/unchanged counts.
+        """
+        with self._conn:
+            staged = self._cur.execute("SELECT COUNT(*) FROM games_staging;").fetchone()[0]
+            inserted = self._cur.execute(self._count_new_sql).fetchone()[0]
+            updated = 0
+            if update_existing:
+                updated = self._cur.execute(self._count_changed_sql).fetchone()[0]
+                self._cur.execute(self._merge_update_sql)
+            else:
+                self._cur.execute(self._merge_ignore_sql)
+            self._cur.execute("DELETE FROM games_staging;")
+        return {
+            "inserted": inserted,
+            "updated": updated,
+            "unchanged": staged - inserted - updated,
+        }
+
+    def merge_games(self, games: Iterable[Union[CfbGame, tuple]], batch_size: int = 5000,
+                    update_existing: bool = True):
+        """
+        Set based upsert: stage all games, then merge them into games at once.
+        Returns a dict of inserted / updated / skipped counts, where skipped covers both
+        unchanged existing games and duplicate keys within `games`.
+        """
+        start = time.perf_counter()
+        self.begin_staging()
+        count_read = self.stage_games(games, batch_size=batch_size)
+        merged = self.merge_staging(update_existing=update_existing)
+        counts = {
+            "inserted": merged["inserted"],
+            "updated": merged["updated"],
+            "skipped": count_read - merged["inserted"] - merged["updated"],
+        }
+        elapsed = time.perf_counter() - start
+        rate = count_read / elapsed if elapsed > 0 else float("inf")
+        print(f"[info] Merged {count_read} games in {elapsed:.2f}s ({rate:.0f} rows/sec): "
+              f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['skipped']} skipped.")
+        return counts
+
     def insert_game(self, game: CfbGame):
         try:
             values = game.to_db_tuple()
@@ -96,6 +301,36 @@ class CfbGameDb:
         except Exception as e:
             print(f"[error] Failed to insert game: {e}")
 
+    def insert_games(self, games: Iterable[Union[CfbGame, tuple]], batch_size: int = 1000):
+        """
+        Bulk insert games with one executemany + commit per batch.
+        Accepts CfbGame objects or tuples already in to_db_tuple() order.
+        Rows must be new: a natural key clash fails the batch (use merge_games to upsert).
+        A failing batch is rolled back and the error is re-raised; batches
+        committed before it are kept. Returns the number of rows inserted.
+        """
+        assert batch_size > 0, "batch_size must be positive"
+        games_iter = iter(games)
+        count_inserted = 0
+        start = time.perf_counter()
+        while True:
+            batch = [g.to_db_tuple() if isinstance(g, CfbGame) else g
+                     for g in islice(games_iter, batch_size)]
+            if not batch:
+                break
+            try:
+                with self._conn:
+                    self._cur.executemany(self._insert_sql, batch)
+            except Exception as e:
+                print(f"[error] Failed to insert batch of {len(batch)} games "
+                      f"(rolled back, {count_inserted} already committed): {e}")
+                raise
+            count_inserted += len(batch)
+        elapsed = time.perf_counter() - start
+        rate = count_inserted / elapsed if elapsed > 0 else float("inf")
+        print(f"[info] Bulk inserted {count_inserted} games in {elapsed:.2f}s ({rate:.0f} rows/sec).")
+        return count_inserted
+
     def select_print_all(self):
         self._cur.execute("""
             SELECT g.*, t1.team_name as home_team, t2.team_name as away_team
@@ -110,25 +345,18 @@ class CfbGameDb:
             break
         return rows
 
+    @property
+    def resolver(self) -> TeamResolver:
+        # built on first use so the teams table is only read once per wrapper
+        if self._resolver is None:
+            self._resolver = TeamResolver(self._conn)
+        return self._resolver
+
     def get_team_id_by_name(self, name: str):
-        try:
-            norm = (name or "").strip().lower()
-            self._cur.execute(
-                """
-                SELECT id FROM teams
-                WHERE LOWER(TRIM(team_name)) = ?
-                """,
-                (norm,)
-            )
-            row = self._cur.fetchone()
-            if row:
-                return row[0]
-            else:
-                print(f"[warn] Team not found: '{name}'")
-                return None
-        except Exception as e:
-            print(f"[error] Failed to fetch team ID for '{name}': {e}")
-            return None
+        team_id = self.resolver.get_id(name)
+        if team_id is None:
+            print(f"[warn] Team not found: '{name}'")
+        return team_id
 
     def game_exists(self, team_id: int, opponent_id: int, date: str):
         try:
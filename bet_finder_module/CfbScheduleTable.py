@@ -1,10 +1,13 @@
 import sqlite3
 from CfbSchedule import CfbSchedule
+from TeamResolver import TeamResolver
+from typing import Optional
 import json
 class CfbScheduleTable:
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(self, conn: sqlite3.Connection, resolver: Optional[TeamResolver] = None):
         self._conn = conn
         self._cur = self._conn.cursor()
+        self._resolver = resolver
         self._ddl = """
             CREATE TABLE IF NOT EXISTS schedule (
                 id              INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -112,26 +115,19 @@ class CfbScheduleTable:
         except Exception as e:
             return False
 
+    @property
+    def resolver(self) -> TeamResolver:
+        # built on first use so the teams table is only read once per wrapper
+        if self._resolver is None:
+            self._resolver = TeamResolver(self._conn)
+        return self._resolver
+
     def get_team_id_by_name(self, name: str):
-        try:
-            norm = (name or "").strip().lower()
-            self._cur.execute(
-                """
-                SELECT id FROM teams
-                WHERE LOWER(TRIM(team_name)) = ?
-                """,
-                (norm,)
-            )
-            row = self._cur.fetchone()
-            if row:
-                return row[0]
-            else:
-                print(f"[warn] Team not found: '{name}'")
-                return None
-        except Exception as e:
-            print(f"[error] Failed to fetch team ID for '{name}': {e}")
-            return None
-        
+        team_id = self.resolver.get_id(name)
+        if team_id is None:
+            print(f"[warn] Team not found: '{name}'")
+        return team_id
+
     def close(self):
         try:
             if self._conn:
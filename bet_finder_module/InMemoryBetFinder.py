@@ -0,0 +1,309 @@
+from bet_finder import BetFinder
+from TeamSeasonStats import STATS_COLUMNS
+from datetime import date
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional, see the "analytics" extra in pyproject.toml
+    np = None
+
+# games columns held in memory; everything numeric is float64 with NaN for NULL
+NUMERIC_COLUMNS = ("team_id", "season", "date_ord", "team_points", "opp_points",
+                   "team_spread", "over_under", "total_points")
+# dictionary encoded text columns, code -1 is NULL
+TEXT_COLUMNS = ("date", "team", "opponent", "opp_conf", "covered", "over_or_under_result")
+
+def _encode(values) -> tuple:
+    """(int32 codes, distinct values) for a column of str / None values."""
+    categories = []
+    lookup = {None: -1}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(categories)
+            categories.append(value)
+        codes[i] = code
+    return codes, categories
+
+class InMemoryBetFinder(BetFinder):
+    """
+    BetFinder over NumPy column arrays: the games table is read once (reload() to pick
+    up new data) and every query is a few boolean masks and reductions instead of a
+    round trip to SQLite. Results are identical to BetFinder's; the connection is only
+    kept for team name resolution and for did_cover / did_hit_over_under values
+    outside yes / no / push and over / under / push.
+    Needs numpy (the "analytics" extra).
+    """
+    def __init__(self, db_path: str, debug: bool = False, cache_size: int = 1024):
+        if np is None:
+            raise ImportError("InMemoryBetFinder needs numpy: pip install numpy "
+                              "(or install this project with the 'analytics' extra).")
+        super().__init__(db_path, debug=debug, cache_size=cache_size)
+        # did_cover / did_hit_over_under / win_loss_record / team_report take the
+        # totals path, which _team_totals below serves from the arrays
+        self.use_stats = True
+        self.reload()
+
+    def reload(self):
+        """(Re)loads the games table into memory, ordered like BetFinder's results."""
+        cur = self.conn.cursor()
+        cur.execute(
+            f"SELECT {', '.join(NUMERIC_COLUMNS + TEXT_COLUMNS)} FROM games ORDER BY date_ord, id;"
+        )
+        rows = cur.fetchall()
+        columns = list(zip(*rows)) if rows else [()] * (len(NUMERIC_COLUMNS) + len(TEXT_COLUMNS))
+
+        self._num = {}
+        for name, values in zip(NUMERIC_COLUMNS, columns):
+            self._num[name] = np.array(values, dtype=np.float64)
+        self._codes = {}
+        self._categories = {}
+        for name, values in zip(TEXT_COLUMNS, columns[len(NUMERIC_COLUMNS):]):
+            self._codes[name], self._categories[name] = _encode(values)
+        self._length = len(rows)
+
+        # calendar year of each game, converted once per distinct date
+        date_ords, inverse = np.unique(self._num["date_ord"], return_inverse=True)
+        years = np.array([date.fromordinal(int(o)).year if not np.isnan(o) else np.nan
+                          for o in date_ords.tolist()], dtype=np.float64)
+        self._year = years[inverse] if self._length else np.empty(0)
+
+        # row positions per team, kept in date order by the stable sort
+        team_id = self._num["team_id"]
+        order = np.argsort(team_id, kind="stable")
+        order = order[~np.isnan(team_id[order])]
+        team_ids, starts = np.unique(team_id[order], return_index=True)
+        self._team_rows = {int(t): rows_ for t, rows_ in zip(team_ids, np.split(order, starts[1:]))}
+
+        # per row contribution to each STATS_COLUMNS total, as in TeamSeasonStats
+        team_points, opp_points = self._num["team_points"], self._num["opp_points"]
+        spread = self._num["team_spread"]
+        scored = ~np.isnan(team_points) & ~np.isnan(opp_points)
+        spread_games = scored & ~np.isnan(spread)
+        covered = self._codes_matching("covered", ["yes", "no", "push"], lower=True)
+        result = self._codes_matching("over_or_under_result", ["over", "under", "push"], lower=True)
+        with np.errstate(invalid="ignore"):
+            self._contrib = {
+                "games": np.ones(self._length),
+                "covers": covered["yes"],
+                "non_covers": covered["no"],
+                "cover_pushes": covered["push"],
+                "ou_games": self._codes["over_or_under_result"] != -1,
+                "overs": result["over"],
+                "unders": result["under"],
+                "ou_pushes": result["push"],
+                "scored_games": scored,
+                "wins": team_points > opp_points,
+                "losses": team_points < opp_points,
+                "ties": team_points == opp_points,
+                "spread_games": spread_games,
+                "spread_delta_sum": np.where(spread_games, spread - (opp_points - team_points), 0.0),
+            }
+        assert list(self._contrib) == list(STATS_COLUMNS), "contributions out of sync with STATS_COLUMNS"
+        # cached results were computed from the previous arrays
+        self.cache_clear()
+        print(f"[info] Loaded {self._length} games into memory.")
+
+    def _codes_matching(self, name: str, values: List[str], lower: bool = False) -> Dict[str, "np.ndarray"]:
+        """Boolean row mask per value of a text column (LOWER() = value with `lower`)."""
+        codes = self._codes[name]
+        masks = {}
+        for value in values:
+            matching = [code for code, category in enumerate(self._categories[name])
+                        if (category.lower() if lower else category) == value]
+            masks[value] = np.isin(codes, matching)
+        return masks
+
+    def _rows(self, team_ids: Optional[List[Optional[int]]]) -> "np.ndarray":
+        """Row positions of the given teams (all rows for None), in date order per team."""
+        if team_ids is None:
+            return np.arange(self._length)
+        parts = [self._team_rows[t] for t in team_ids if t in self._team_rows]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def _season_mask(self, rows, start_year: int, end_year: int,
+                     conferences: Optional[List[str]] = None) -> "np.ndarray":
+        season = self._num["season"][rows]
+        with np.errstate(invalid="ignore"):
+            mask = (season >= start_year) & (season <= end_year)
+        if conferences:
+            categories = self._categories["opp_conf"]
+            codes = [code for code, conf in enumerate(categories) if conf in conferences]
+            mask &= np.isin(self._codes["opp_conf"][rows], codes)
+        return mask
+
+    def _text(self, name: str, rows) -> list:
+        categories = self._categories[name]
+        return [categories[code] if code >= 0 else None for code in self._codes[name][rows].tolist()]
+
+    def _team_totals(
+        self,
+        team_ids: Optional[List[int]],
+        start_year: int,
+        end_year: int,
+        conferences: Optional[List[str]] = None
+    ) -> Dict[int, dict]:
+        """STATS_COLUMNS totals per team_id, one bincount per column."""
+        rows = self._rows(team_ids)
+        rows = rows[self._season_mask(rows, start_year, end_year, conferences)]
+        rows = rows[~np.isnan(self._num["team_id"][rows])]
+        team_ids_found, inverse = np.unique(self._num["team_id"][rows], return_inverse=True)
+        totals = {}
+        for column, contrib in self._contrib.items():
+            sums = np.bincount(inverse, weights=contrib[rows], minlength=len(team_ids_found))
+            totals[column] = sums.tolist() if column == "spread_delta_sum" else sums.round().astype(np.int64).tolist()
+        return {
+            int(team_id): {column: totals[column][i] for column in STATS_COLUMNS}
+            for i, team_id in enumerate(team_ids_found.tolist())
+        }
+
+    def spread_deltas(
+            self,
+            team_name: str,
+            start_year: int,
+            end_year: int
+        ):
+        rows = self._rows([self.team_id(team_name)])
+        team_points = self._num["team_points"][rows]
+        opp_points = self._num["opp_points"][rows]
+        spread = self._num["team_spread"][rows]
+        mask = (self._season_mask(rows, start_year, end_year)
+                & ~np.isnan(spread) & ~np.isnan(team_points) & ~np.isnan(opp_points))
+        rows, team_points, opp_points, spread = rows[mask], team_points[mask], opp_points[mask], spread[mask]
+        actual_spread = opp_points - team_points
+
+        return [
+            {
+                "date": game_date,
+                "season": season,
+                "team": team,
+                "opponent": opponent,
+                "team_points": points,
+                "opp_points": opp,
+                "closing_spread": predicted,
+                "actual_spread": actual,
+                "delta": round(predicted - actual, 2)
+            }
+            for game_date, season, team, opponent, points, opp, predicted, actual in zip(
+                self._text("date", rows),
+                self._num["season"][rows].astype(np.int64).tolist(),
+                self._text("team", rows),
+                self._text("opponent", rows),
+                team_points.astype(np.int64).tolist(),
+                opp_points.astype(np.int64).tolist(),
+                spread.tolist(),
+                actual_spread.astype(np.int64).tolist(),
+            )
+        ]
+
+    def total_points_deltas(
+            self,
+            team_name: str,
+            start_year: int,
+            end_year: int
+        ):
+        rows = self._rows([self.team_id(team_name)])
+        team_points = self._num["team_points"][rows]
+        opp_points = self._num["opp_points"][rows]
+        over_under = self._num["over_under"][rows]
+        mask = (self._season_mask(rows, start_year, end_year)
+                & ~np.isnan(over_under) & ~np.isnan(team_points) & ~np.isnan(opp_points))
+        rows, team_points, opp_points, over_under = rows[mask], team_points[mask], opp_points[mask], over_under[mask]
+        actual_total = team_points + opp_points
+
+        return [
+            {
+                "date": game_date,
+                "season": season,
+                "team": team,
+                "opponent": opponent,
+                "team_points": points,
+                "opp_points": opp,
+                "actual_total": actual,
+                "predicted_total": predicted,
+                "delta": round(actual - predicted, 2),
+                "result": result
+            }
+            for game_date, season, team, opponent, points, opp, actual, predicted, result in zip(
+                self._text("date", rows),
+                self._num["season"][rows].astype(np.int64).tolist(),
+                self._text("team", rows),
+                self._text("opponent", rows),
+                team_points.astype(np.int64).tolist(),
+                opp_points.astype(np.int64).tolist(),
+                actual_total.astype(np.int64).tolist(),
+                over_under.tolist(),
+                self._text("over_or_under_result", rows),
+            )
+        ]
+
+    def did_hit_over_under_in_date_window(
+        self,
+        start_year: int,
+        end_year: int,
+        start_mmdd: str,
+        end_mmdd: str,
+        team_name: Optional[str] = None,
+        conferences: Optional[List[str]] = None
+    ) -> Optional[dict]:
+        start_month, start_day = map(int, start_mmdd.split("/"))
+        end_month, end_day = map(int, end_mmdd.split("/"))
+
+        # same windows as BetFinder: one (first day, last day) per calendar year, which
+        # holds games of that season and of the previous one (bowls in January)
+        first_ords = np.full(end_year - start_year + 1, np.nan)
+        last_ords = np.full(end_year - start_year + 1, np.nan)
+        for year in range(start_year, end_year + 1):
+            try:
+                first_ords[year - start_year] = date(year, start_month, start_day).toordinal()
+                last_ords[year - start_year] = date(year, end_month, end_day).toordinal()
+            except ValueError:
+                continue
+        if np.isnan(first_ords).all():
+            print("[warn] No games matched within the date window.")
+            return None
+
+        if team_name:
+            team_id = self.team_id(team_name)
+            if team_id is None:
+                return None
+            rows = self._rows([team_id])
+        else:
+            rows = self._rows(None)
+
+        season = self._num["season"][rows]
+        date_ord = self._num["date_ord"][rows]
+        year = self._year[rows]
+        over_under = self._num["over_under"][rows]
+        total_points = self._num["total_points"][rows]
+        with np.errstate(invalid="ignore"):
+            mask = ((year >= start_year) & (year <= end_year)
+                    & (season >= start_year) & (season <= end_year)
+                    & ((season == year) | (season == year - 1)))
+            window = np.where(mask, year - start_year, 0).astype(np.int64)
+            mask &= (date_ord >= first_ords[window]) & (date_ord <= last_ords[window])
+            mask &= (~np.isnan(over_under) & ~np.isnan(total_points)
+                     & (over_under != 0) & (total_points != 0))
+        if conferences:
+            mask &= self._season_mask(rows, start_year, end_year, conferences)
+
+        total = int(mask.sum())
+        if total == 0:
+            print("[warn] No games matched within the date window.")
+            return None
+
+        over_under, total_points = over_under[mask], total_points[mask]
+        over = int((total_points > over_under).sum())
+        under = int((total_points < over_under).sum())
+        push = int((total_points == over_under).sum())
+        return {
+            "games": total,
+            "over_pct": round(over / total * 100, 2),
+            "under_pct": round(under / total * 100, 2),
+            "push_pct": round(push / total * 100, 2),
+            "over_count": over,
+            "under_count": under,
+            "push_count": push
+        }
@@ -0,0 +1,122 @@
+import sqlite3
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+HASH_BLOCK_SIZE = 1 << 20
+
+def hash_file_prefix(path: Path, length: int):
+    """Returns a sha256 object fed with the first `length` bytes of `path`."""
+    hasher = hashlib.sha256()
+    remaining = length
+    with open(path, "rb") as f:
+        while remaining > 0:
+            block = f.read(min(HASH_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+def complete_lines_length(path: Path) -> Tuple[int, int]:
+    """(bytes up to and including the last newline, number of newlines) of `path`."""
+    length = 0
+    lines = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            length += len(line)
+            lines += 1
+    return length, lines
+
+class IngestManifest:
+    """
+    Records how far each source csv has been ingested: size, sha256 of the ingested
+    prefix and the byte / row offset of the last committed batch. Offsets always sit
+    on a line boundary; `size` is only set once a file was read to the end, so a NULL
+    size marks a load that was interrupted.
+    """
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._cur = self._conn.cursor()
+        self._ddl = """
+            CREATE TABLE IF NOT EXISTS ingest_manifest (
+                path            TEXT PRIMARY KEY,
+                size            INTEGER,
+                content_hash    TEXT NOT NULL,
+                byte_offset     INTEGER NOT NULL,
+                row_offset      INTEGER NOT NULL,
+                updated_at      TEXT NOT NULL
+            );
+            """
+        self._upsert_sql = """
+            INSERT INTO ingest_manifest (path, size, content_hash, byte_offset, row_offset, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                size = excluded.size,
+                content_hash = excluded.content_hash,
+                byte_offset = excluded.byte_offset,
+                row_offset = excluded.row_offset,
+                updated_at = excluded.updated_at;
+            """
+
+    def create_table_if_not_exists(self):
+        self._cur.executescript(self._ddl)
+        self._conn.commit()
+
+    @staticmethod
+    def key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    def get(self, path: Path) -> Optional[dict]:
+        self._cur.execute(
+            "SELECT size, content_hash, byte_offset, row_offset FROM ingest_manifest WHERE path = ?;",
+            (self.key(path),)
+        )
+        row = self._cur.fetchone()
+        if row is None:
+            return None
+        size, content_hash, byte_offset, row_offset = row
+        return {"size": size, "content_hash": content_hash,
+                "byte_offset": byte_offset, "row_offset": row_offset}
+
+    def record(self, path: Path, content_hash: str, byte_offset: int, row_offset: int,
+               size: Optional[int] = None, commit: bool = False):
+        """
+        Upserts the checkpoint for `path`. Without `commit` it joins the open transaction,
+        so callers sharing this connection can commit it together with the rows it covers.
+        """
+        self._cur.execute(self._upsert_sql, (
+            self.key(path), size, content_hash, byte_offset, row_offset,
+            datetime.now().isoformat(timespec="seconds"),
+        ))
+        if commit:
+            self._conn.commit()
+
+    def record_complete(self, path: Path):
+        """Marks a file as fully ingested by some other path (e.g. a full load_many)."""
+        byte_offset, lines = complete_lines_length(path)
+        content_hash = hash_file_prefix(path, byte_offset).hexdigest()
+        # header line is not a data row
+        self.record(path, content_hash, byte_offset, max(lines - 1, 0),
+                    size=Path(path).stat().st_size, commit=True)
+
+    def plan(self, path: Path):
+        """
+        Decides what to read from `path`. Returns (action, byte_offset, row_offset, hasher)
+        where action is "skip", "resume" (appended tail or interrupted load) or "full",
+        and hasher already holds the bytes before byte_offset.
+        """
+        size = Path(path).stat().st_size
+        entry = self.get(path)
+        if entry is None or size < entry["byte_offset"]:
+            return "full", 0, 0, hashlib.sha256()
+        hasher = hash_file_prefix(path, entry["byte_offset"])
+        if hasher.hexdigest() != entry["content_hash"]:
+            print(f"[info] {path} changed before the last checkpoint, reloading from the start.")
+            return "full", 0, 0, hashlib.sha256()
+        if entry["size"] == size:
+            return "skip", entry["byte_offset"], entry["row_offset"], hasher
+        return "resume", entry["byte_offset"], entry["row_offset"], hasher
@@ -0,0 +1,80 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple
+
+class QueryCache:
+    """
+    Bounded LRU cache of query results for one connection.
+    Every lookup first compares (PRAGMA data_version, total_changes) with the values
+    seen when the entries were stored: data_version moves when another connection
+    commits (e.g. a parse_and_load run), total_changes when this one writes, and
+    either empties the cache, so a stale result is never returned.
+    All methods hold a lock, so one cache can serve several threads as long as
+    `conn` allows it (check_same_thread=False).
+    """
+    def __init__(self, conn: sqlite3.Connection, maxsize: int = 1024):
+        assert maxsize > 0, "maxsize must be positive"
+        self._conn = conn
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._marker = self._read_marker()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _read_marker(self) -> Tuple[int, int]:
+        data_version = self._conn.execute("PRAGMA data_version;").fetchone()[0]
+        return (data_version, self._conn.total_changes)
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any, Tuple[int, int]]:
+        """
+        (True, value, marker) on a hit, (False, None, marker) on a miss; pass the
+        marker to store() with the freshly computed value.
+        """
+        with self._lock:
+            marker = self._read_marker()
+            if marker != self._marker:
+                self._marker = marker
+                if self._entries:
+                    self._entries.clear()
+                    self.invalidations += 1
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return False, None, marker
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value, marker
+
+    def store(self, key: Hashable, value: Any, marker: Tuple[int, int]):
+        """
+        Caches `value`, unless the database changed since the lookup that returned
+        `marker` (the value may have been computed from the old data).
+        """
+        with self._lock:
+            if marker != self._marker:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
@@ -0,0 +1,147 @@
+import sqlite3
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from utilities import cfb_tricodes
+
+DATABASE_DIR = Path(__file__).resolve().parent.parent / "database"
+ALIAS_FILES = [
+    DATABASE_DIR / "valid_team_matches_combined.json",
+    DATABASE_DIR / "lookup_keys.json",
+]
+
+def normalize_team_name(name: Optional[str]) -> str:
+    # same folding as the old LOWER(TRIM(team_name)) queries, plus inner whitespace
+    return " ".join((name or "").split()).lower()
+
+class TeamResolver:
+    """
+    In-memory team name -> teams.id lookup.
+    Loads the whole `teams` table once and layers aliases on top, in priority order:
+    team_name, the alias json files in ../database, cfb_tricodes names, espn_key,
+    cfb_tricodes abbreviations. Lower priority sources never override a higher one
+    and keys that are ambiguous within a source are dropped.
+    """
+    def __init__(self, conn: sqlite3.Connection, alias_files=ALIAS_FILES):
+        self._conn = conn
+        self._alias_files = list(alias_files)
+        self._file_aliases = self._load_alias_files()
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self._teams_snapshot: Tuple = ()
+        self._change_marker = None
+        self.refresh()
+
+    def _load_alias_files(self) -> Dict[str, str]:
+        # alias -> full team name; empty / {} values mean "no match" in those files
+        aliases = {}
+        for path in self._alias_files:
+            try:
+                with open(path, "r", encoding="utf-8") as jsonfile:
+                    data = json.load(jsonfile)
+            except FileNotFoundError:
+                print(f"[warn] Alias file not found: {path}")
+                continue
+            except json.JSONDecodeError:
+                print(f"[warn] Invalid JSON in alias file: {path}")
+                continue
+            for alias, full_name in data.items():
+                if isinstance(full_name, str) and full_name.strip():
+                    aliases.setdefault(normalize_team_name(alias), normalize_team_name(full_name))
+        return aliases
+
+    def _read_teams(self) -> Tuple:
+        try:
+            cur = self._conn.execute("SELECT id, team_name, espn_key FROM teams ORDER BY id;")
+            return tuple(cur.fetchall())
+        except sqlite3.OperationalError as e:
+            # fresh database without a teams table yet
+            print(f"[warn] Could not load teams table: {e}")
+            return ()
+
+    def _read_change_marker(self):
+        try:
+            data_version = self._conn.execute("PRAGMA data_version;").fetchone()[0]
+        except sqlite3.Error:
+            data_version = None
+        return (data_version, self._conn.total_changes)
+
+    def refresh(self):
+        """Reload the teams table and rebuild the lookup dict."""
+        self._change_marker = self._read_change_marker()
+        self._teams_snapshot = self._read_teams()
+        self._build(self._teams_snapshot)
+
+    def refresh_if_changed(self) -> bool:
+        """
+        Reload if the teams table changed since the last load. Cheap when nothing was
+        committed since the last check (only PRAGMA data_version / total_changes).
+        """
+        marker = self._read_change_marker()
+        if marker == self._change_marker:
+            return False
+        self._change_marker = marker
+        snapshot = self._read_teams()
+        if snapshot == self._teams_snapshot:
+            return False
+        print("[info] teams table changed, reloading team resolver.")
+        self._teams_snapshot = snapshot
+        self._build(snapshot)
+        return True
+
+    def _build(self, rows: Tuple):
+        ids = {}
+        names = {}
+        espn_keys = {}
+        for team_id, team_name, espn_key in rows:
+            norm = normalize_team_name(team_name)
+            ids[norm] = team_id
+            names[team_id] = team_name
+            if espn_key:
+                espn_keys.setdefault(normalize_team_name(espn_key), []).append(team_id)
+
+        def add_tier(tier: Dict[str, list]):
+            for alias, team_ids in tier.items():
+                unique_ids = set(team_ids)
+                if alias and alias not in ids and len(unique_ids) == 1:
+                    ids[alias] = unique_ids.pop()
+
+        file_tier = {}
+        for alias, full_name in self._file_aliases.items():
+            if full_name in ids:
+                file_tier.setdefault(alias, []).append(ids[full_name])
+        add_tier(file_tier)
+
+        # cfb_tricodes keys are short names ("Ohio State"), resolved through the tiers above
+        tricode_names = {}
+        tricode_codes = {}
+        for team, codes in cfb_tricodes.items():
+            team_id = ids.get(normalize_team_name(team))
+            if team_id is None:
+                continue
+            tricode_names.setdefault(normalize_team_name(team), []).append(team_id)
+            for code in codes:
+                tricode_codes.setdefault(normalize_team_name(code), []).append(team_id)
+        add_tier(tricode_names)
+        add_tier(espn_keys)
+        add_tier(tricode_codes)
+
+        self._ids = ids
+        self._names = names
+
+    def get_id(self, name: Optional[str]) -> Optional[int]:
+        """O(1) lookup; on a miss re-checks the teams table once before giving up."""
+        norm = normalize_team_name(name)
+        team_id = self._ids.get(norm)
+        if team_id is None and self.refresh_if_changed():
+            team_id = self._ids.get(norm)
+        return team_id
+
+    def get_name(self, team_id: int) -> Optional[str]:
+        return self._names.get(team_id)
+
+    def __contains__(self, name) -> bool:
+        return self.get_id(name) is not None
+
+    def __len__(self):
+        return len(self._names)
@@ -0,0 +1,211 @@
+import argparse
+import sqlite3
+import time
+from typing import List
+
+# aggregate column -> contribution of one games row `{r}` (0 / 1 counts, or a delta)
+STATS_COLUMNS = {
+    "games": "1",
+    "covers": "LOWER({r}.covered) = 'yes'",
+    "non_covers": "LOWER({r}.covered) = 'no'",
+    "cover_pushes": "LOWER({r}.covered) = 'push'",
+    "ou_games": "{r}.over_or_under_result IS NOT NULL",
+    "overs": "LOWER({r}.over_or_under_result) = 'over'",
+    "unders": "LOWER({r}.over_or_under_result) = 'under'",
+    "ou_pushes": "LOWER({r}.over_or_under_result) = 'push'",
+    "scored_games": "{r}.team_points IS NOT NULL AND {r}.opp_points IS NOT NULL",
+    "wins": "{r}.team_points > {r}.opp_points",
+    "losses": "{r}.team_points < {r}.opp_points",
+    "ties": "{r}.team_points = {r}.opp_points",
+    "spread_games": "{r}.team_spread IS NOT NULL AND {r}.team_points IS NOT NULL AND {r}.opp_points IS NOT NULL",
+    # same delta as BetFinder.spread_deltas: closing spread - (opp_points - team_points)
+    "spread_delta_sum": "{r}.team_spread - ({r}.opp_points - {r}.team_points)",
+}
+# games columns the aggregates depend on; updates touching only other columns skip the trigger
+SOURCE_COLUMNS = ("team_id", "season", "site", "opp_conf", "covered", "over_or_under_result",
+                  "team_points", "opp_points", "team_spread")
+KEY_COLUMNS = ("team_id", "season", "site", "opp_conf")
+# site / opp_conf are part of the primary key, so NULL is stored as ''
+KEY_EXPRESSIONS = ("{r}.team_id", "{r}.season", "COALESCE({r}.site, '')", "COALESCE({r}.opp_conf, '')")
+FLOAT_TOLERANCE = 1e-6
+
+def row_contributions(r: str) -> List[str]:
+    """SQL expressions for the STATS_COLUMNS contributions of games row `r`."""
+    return [f"COALESCE(({expr.format(r=r)}), 0)" for expr in STATS_COLUMNS.values()]
+
+class TeamSeasonStats:
+    """
+    Materialized per (team_id, season, site, opp_conf) totals of the games table:
+    covers / non covers / pushes, overs / unders / pushes, W/L/T and the summed spread
+    delta. Kept current by triggers on games, so every insert, merge, update or delete
+    adjusts the affected rows; rebuild() recomputes it from scratch and check()
+    compares it with a fresh aggregate of games.
+    """
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._cur = self._conn.cursor()
+
+        stat_columns = ", ".join(STATS_COLUMNS)
+        key_columns = ", ".join(KEY_COLUMNS)
+        column_ddl = ",\n                ".join(
+            f"{name} REAL NOT NULL DEFAULT 0" if name == "spread_delta_sum"
+            else f"{name} INTEGER NOT NULL DEFAULT 0"
+            for name in STATS_COLUMNS
+        )
+        self._ddl = f"""
+            CREATE TABLE IF NOT EXISTS team_season_stats (
+                team_id     INTEGER NOT NULL,
+                season      INTEGER NOT NULL,
+                site        TEXT NOT NULL,
+                opp_conf    TEXT NOT NULL,
+                {column_ddl},
+                PRIMARY KEY ({key_columns})
+            ) WITHOUT ROWID;
+            """
+
+        def apply_sql(r: str, sign: str) -> str:
+            keys = ", ".join(expr.format(r=r) for expr in KEY_EXPRESSIONS)
+            values = ", ".join(f"{sign}{expr}" for expr in row_contributions(r))
+            # WHERE doubles as the guard and lets sqlite parse ON CONFLICT after a SELECT
+            return f"""
+                INSERT INTO team_season_stats ({key_columns}, {stat_columns})
+                SELECT {keys}, {values}
+                WHERE {r}.team_id IS NOT NULL AND {r}.season IS NOT NULL
+                ON CONFLICT({key_columns}) DO UPDATE SET
+                    {", ".join(f"{c} = {c} + excluded.{c}" for c in STATS_COLUMNS)};
+                """
+
+        def prune_sql(r: str) -> str:
+            key_match = " AND ".join(
+                f"{c} = {expr.format(r=r)}" for c, expr in zip(KEY_COLUMNS, KEY_EXPRESSIONS)
+            )
+            return f"DELETE FROM team_season_stats WHERE {key_match} AND games = 0;"
+
+        self._trigger_ddl = f"""
+            CREATE TRIGGER IF NOT EXISTS trg_games_stats_insert AFTER INSERT ON games
+            BEGIN
+                {apply_sql("NEW", "")}
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_games_stats_delete AFTER DELETE ON games
+            BEGIN
+                {apply_sql("OLD", "-")}
+                {prune_sql("OLD")}
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_games_stats_update
+            AFTER UPDATE OF {", ".join(SOURCE_COLUMNS)} ON games
+            BEGIN
+                {apply_sql("OLD", "-")}
+                {prune_sql("OLD")}
+                {apply_sql("NEW", "")}
+            END;
+            """
+        self._drop_triggers_ddl = """
+            DROP TRIGGER IF EXISTS trg_games_stats_insert;
+            DROP TRIGGER IF EXISTS trg_games_stats_delete;
+            DROP TRIGGER IF EXISTS trg_games_stats_update;
+            """
+        group_keys = ", ".join(expr.format(r="g") for expr in KEY_EXPRESSIONS)
+        sums = ", ".join(f"SUM({expr})" for expr in row_contributions("g"))
+        self._aggregate_sql = f"""
+            SELECT {group_keys}, {sums}
+            FROM games g
+            WHERE g.team_id IS NOT NULL AND g.season IS NOT NULL
+            GROUP BY {group_keys}
+            """
+
+    def exists(self) -> bool:
+        self._cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='team_season_stats';"
+        )
+        return self._cur.fetchone() is not None
+
+    def create_table_if_not_exists(self):
+        """
+        Creates the table and its triggers. A new table is filled with rebuild();
+        returns True in that case.
+        """
+        created = not self.exists()
+        self._cur.executescript(self._ddl)
+        self._cur.executescript(self._trigger_ddl)
+        self._conn.commit()
+        if created:
+            print("[info] Created table 'team_season_stats'.")
+            self.rebuild()
+        return created
+
+    def rebuild(self):
+        """Recomputes every row from games in one transaction. Returns the row count."""
+        start = time.perf_counter()
+        key_columns = ", ".join(KEY_COLUMNS)
+        with self._conn:
+            self._cur.execute("DELETE FROM team_season_stats;")
+            self._cur.execute(
+                f"INSERT INTO team_season_stats ({key_columns}, {', '.join(STATS_COLUMNS)}) "
+                + self._aggregate_sql
+            )
+            rows = self._cur.execute("SELECT COUNT(*) FROM team_season_stats;").fetchone()[0]
+        print(f"[info] Rebuilt team_season_stats: {rows} rows in {time.perf_counter() - start:.2f}s.")
+        return rows
+
+    def check(self) -> List[dict]:
+        """
+        Compares the table with a fresh aggregate of games. Returns one dict per key
+        that differs ({"key", "expected", "actual"}, with None for a missing row).
+        """
+        width = len(KEY_COLUMNS)
+        expected = {row[:width]: row[width:] for row in self._cur.execute(self._aggregate_sql)}
+        actual = {
+            row[:width]: row[width:]
+            for row in self._cur.execute(
+                f"SELECT {', '.join(KEY_COLUMNS)}, {', '.join(STATS_COLUMNS)} FROM team_season_stats;"
+            )
+        }
+        mismatches = []
+        for key in sorted(set(expected) | set(actual), key=repr):
+            want, got = expected.get(key), actual.get(key)
+            if want is not None and got is not None and all(
+                abs(a - b) <= FLOAT_TOLERANCE for a, b in zip(want, got)
+            ):
+                continue
+            mismatches.append({
+                "key": dict(zip(KEY_COLUMNS, key)),
+                "expected": dict(zip(STATS_COLUMNS, want)) if want is not None else None,
+                "actual": dict(zip(STATS_COLUMNS, got)) if got is not None else None,
+            })
+        return mismatches
+
+    def drop(self):
+        """Removes the triggers and the table; BetFinder falls back to scanning games."""
+        self._cur.executescript(self._drop_triggers_ddl)
+        self._cur.execute("DROP TABLE IF EXISTS team_season_stats;")
+        self._conn.commit()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Maintain the team_season_stats aggregate table.")
+    arg_parser.add_argument("command", choices=["rebuild", "check", "drop"])
+    arg_parser.add_argument("--db", default="./new_database.db", help="sqlite database path")
+    args = arg_parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    stats = TeamSeasonStats(conn)
+    if args.command == "rebuild":
+        if not stats.create_table_if_not_exists():
+            stats.rebuild()
+    elif args.command == "check":
+        if not stats.exists():
+            print("[error] team_season_stats does not exist, run 'rebuild' first.")
+        else:
+            mismatches = stats.check()
+            for mismatch in mismatches[:20]:
+                print(f"[warn] Mismatch for {mismatch['key']}: "
+                      f"expected {mismatch['expected']}, got {mismatch['actual']}")
+            print(f"[info] team_season_stats check: {len(mismatches)} mismatched rows.")
+            conn.close()
+            raise SystemExit(1 if mismatches else 0)
+    else:
+        stats.drop()
+        print("[info] Dropped team_season_stats and its triggers.")
+    conn.close()
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,236 @@
+import argparse
+import csv
+import multiprocessing
+import sqlite3
+import time
+from itertools import combinations
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from betting_stats import BREAK_EVEN, p_value
+
+def rank_bucket(column: str) -> str:
+    return f"""CASE WHEN {column} IS NULL THEN 'unranked' WHEN {column} <= 5 THEN 'top 5'
+        WHEN {column} <= 10 THEN 'top 10' WHEN {column} <= 25 THEN 'top 25' ELSE 'ranked 26+' END"""
+
+# dimension -> SQL expression over a games row; rows where it is NULL are left out
+DIMENSIONS = {
+    "team": "team_id",
+    "opp_conf": "opp_conf",
+    "site": "site",
+    "underdog_favorite": "underdog_favorite",
+    "team_rank": rank_bucket("team_rank"),
+    "opp_rank": rank_bucket("opp_rank"),
+    # team_spread is negative for the favorite
+    "spread": """CASE WHEN team_spread IS NULL THEN NULL
+        WHEN team_spread <= -14 THEN 'fav 14+' WHEN team_spread <= -7 THEN 'fav 7-13.5'
+        WHEN team_spread < 0 THEN 'fav 0.5-6.5' WHEN team_spread = 0 THEN 'pick'
+        WHEN team_spread < 7 THEN 'dog 0.5-6.5' WHEN team_spread < 14 THEN 'dog 7-13.5'
+        ELSE 'dog 14+' END""",
+    "month": "month",
+    "game_type": "game_type",
+}
+
+class Trend(NamedTuple):
+    metric: str         # "ats" or "total"
+    side: str           # "cover" / "fade" or "over" / "under"
+    filters: Tuple[Tuple[str, object], ...]
+    first_season: int
+    last_season: int
+    bets: int           # decided games (pushes excluded)
+    hits: int
+    hit_pct: float
+    p_value: float
+
+def _season_ranges(start_year: int, end_year: int, spans: Sequence[int], step: int) -> List[Tuple[int, int]]:
+    """Rolling (first, last) season ranges of each span, plus the whole range."""
+    ranges = {(start_year, end_year)}
+    for span in spans:
+        for first in range(start_year, end_year - span + 2, step):
+            ranges.add((first, first + span - 1))
+    return sorted(ranges)
+
+def _mine_combo(conn: sqlite3.Connection, dims: Tuple[str, ...], ranges: List[Tuple[int, int]],
+                min_games: int, max_p: float) -> List[Trend]:
+    """
+    All cells of one dimension combination over every season range in a single
+    grouped query: games are first grouped per season and cell, then the per season
+    rows are summed per range. Returns the cells whose p-value is at most max_p.
+    """
+    names = [f"d{i}" for i in range(len(dims))]
+    selects = ", ".join(f"{DIMENSIONS[dim]} AS {name}" for dim, name in zip(dims, names))
+    not_null = " AND ".join(f"({DIMENSIONS[dim]}) IS NOT NULL" for dim in dims)
+    group = ", ".join(names)
+    values = ", ".join(f"({first}, {last})" for first, last in ranges)
+    query = f"""
+        WITH ranges(first_season, last_season) AS (VALUES {values}),
+        -- a cell without any graded totals (or ATS results) sums to NULL, count it as 0
+        per_season AS (
+            SELECT season, {selects},
+                COALESCE(SUM(LOWER(covered) = 'yes'), 0) AS covers,
+                COALESCE(SUM(LOWER(covered) = 'no'), 0) AS non_covers,
+                COALESCE(SUM(LOWER(over_or_under_result) = 'over'), 0) AS overs,
+                COALESCE(SUM(LOWER(over_or_under_result) = 'under'), 0) AS unders
+            FROM games
+            WHERE season BETWEEN ? AND ? AND {not_null}
+            GROUP BY season, {group}
+        )
+        SELECT r.first_season, r.last_season, {group},
+            COALESCE(SUM(covers), 0), COALESCE(SUM(non_covers), 0),
+            COALESCE(SUM(overs), 0), COALESCE(SUM(unders), 0)
+        FROM ranges r
+        JOIN per_season s ON s.season BETWEEN r.first_season AND r.last_season
+        GROUP BY r.first_season, r.last_season, {group}
+        HAVING SUM(covers) + SUM(non_covers) >= ? OR SUM(overs) + SUM(unders) >= ?
+    """
+    first_year = min(first for first, _ in ranges)
+    last_year = max(last for _, last in ranges)
+    trends = []
+    cur = conn.execute(query, (first_year, last_year, min_games, min_games))
+    for row in cur:
+        first, last = row[0], row[1]
+        filters = tuple(zip(dims, row[2:2 + len(dims)]))
+        covers, non_covers, overs, unders = row[2 + len(dims):]
+        for metric, (yes_side, yes), (no_side, no) in (
+            ("ats", ("cover", covers), ("fade", non_covers)),
+            ("total", ("over", overs), ("under", unders)),
+        ):
+            bets = yes + no
+            if bets < min_games:
+                continue
+            side, hits = (yes_side, yes) if yes >= no else (no_side, no)
+            p = p_value(hits, bets, BREAK_EVEN)
+            if p <= max_p:
+                trends.append(Trend(metric, side, filters, first, last, bets, hits,
+                                    round(hits / bets * 100, 2), p))
+    return trends
+
+# per worker process state for TrendMiner.run, set by _init_mine_worker
+_worker_conn = None
+_worker_settings = None
+
+def _init_mine_worker(db_path: str, settings: dict):
+    global _worker_conn, _worker_settings
+    _worker_conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    _worker_settings = settings
+
+def _mine_worker(dims: Tuple[str, ...]):
+    start = time.perf_counter()
+    trends = _mine_combo(_worker_conn, dims, **_worker_settings)
+    return dims, trends, time.perf_counter() - start
+
+class TrendMiner:
+    """
+    Enumerates every combination of up to `max_dims` DIMENSIONS over rolling season
+    ranges, computes ATS (cover / fade) and total (over / under) records per cell with
+    pushes excluded, and keeps the cells whose best side beats the -110 break even rate
+    with a one sided p-value of at most `max_p`. Each combination is one grouped query,
+    run on a process pool with read-only connections.
+    Many cells are tested, so expect some false positives at any p-value cut off.
+    """
+    def __init__(self, db_path: str, start_year: Optional[int] = None, end_year: Optional[int] = None,
+                 spans: Sequence[int] = (5, 10), step: int = 1, max_dims: int = 2,
+                 min_games: int = 30, max_p: float = 0.01,
+                 dimensions: Optional[Sequence[str]] = None):
+        self.db_path = str(db_path)
+        self.dimensions = list(dimensions or DIMENSIONS)
+        unknown = [dim for dim in self.dimensions if dim not in DIMENSIONS]
+        assert not unknown, f"Unknown dimensions: {unknown}"
+        assert 1 <= max_dims <= len(self.dimensions), "max_dims out of range"
+        self.max_dims = max_dims
+        self.min_games = min_games
+        self.max_p = max_p
+
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            first, last = conn.execute("SELECT MIN(season), MAX(season) FROM games;").fetchone()
+            self._team_names = {team_id: name for team_id, name in
+                                conn.execute("SELECT id, team_name FROM teams;")}
+        finally:
+            conn.close()
+        self.start_year = start_year if start_year is not None else first
+        self.end_year = end_year if end_year is not None else last
+        assert self.start_year <= self.end_year, "start year must be less than or equal to end year"
+        self.ranges = _season_ranges(self.start_year, self.end_year, spans, step)
+
+    def combos(self) -> List[Tuple[str, ...]]:
+        return [combo for size in range(1, self.max_dims + 1)
+                for combo in combinations(self.dimensions, size)]
+
+    def run(self, workers: int = 4) -> List[Trend]:
+        """Mines every combination and returns the trends, strongest (lowest p-value) first."""
+        combos = self.combos()
+        settings = {"ranges": self.ranges, "min_games": self.min_games, "max_p": self.max_p}
+        start = time.perf_counter()
+        print(f"[info] Mining {len(combos)} dimension combinations x {len(self.ranges)} season ranges "
+              f"({self.start_year}-{self.end_year}) with {max(workers, 1)} worker(s).")
+        trends: List[Trend] = []
+        if workers <= 1:
+            _init_mine_worker(self.db_path, settings)
+            results = map(_mine_worker, combos)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(processes=min(workers, len(combos)),
+                                        initializer=_init_mine_worker,
+                                        initargs=(self.db_path, settings))
+            results = pool.imap_unordered(_mine_worker, combos)
+        try:
+            for done, (dims, combo_trends, elapsed) in enumerate(results, 1):
+                trends.extend(combo_trends)
+                print(f"[info] [{done}/{len(combos)}] {' x '.join(dims)}: "
+                      f"{len(combo_trends)} trends ({elapsed:.2f}s)")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        trends.sort(key=lambda trend: (trend.p_value, -trend.bets))
+        print(f"[info] Found {len(trends)} trends in {time.perf_counter() - start:.2f}s.")
+        return trends
+
+    def describe(self, trend: Trend) -> str:
+        """Readable filter list, with team ids shown as team names."""
+        parts = []
+        for dim, value in trend.filters:
+            if dim == "team":
+                value = self._team_names.get(value, value)
+            parts.append(f"{dim}={value}")
+        return " & ".join(parts)
+
+    def write_csv(self, trends: List[Trend], path: str):
+        with open(path, "w", newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["metric", "side", "filters", "first_season", "last_season",
+                             "bets", "hits", "hit_pct", "p_value"])
+            for trend in trends:
+                writer.writerow([trend.metric, trend.side, self.describe(trend), trend.first_season,
+                                 trend.last_season, trend.bets, trend.hits, trend.hit_pct,
+                                 f"{trend.p_value:.3g}"])
+        print(f"[info] Wrote {len(trends)} trends to {path}")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Mine ATS / totals trends over games.")
+    arg_parser.add_argument("--db", default="./new_database.db", help="sqlite database path")
+    arg_parser.add_argument("--start", type=int, help="first season (default: earliest in games)")
+    arg_parser.add_argument("--end", type=int, help="last season (default: latest in games)")
+    arg_parser.add_argument("--spans", type=int, nargs="+", default=[5, 10],
+                            help="rolling season range lengths")
+    arg_parser.add_argument("--step", type=int, default=1, help="seasons between rolling ranges")
+    arg_parser.add_argument("--dims", nargs="+", choices=list(DIMENSIONS), help="dimensions to combine")
+    arg_parser.add_argument("--max-dims", type=int, default=2, help="dimensions per combination")
+    arg_parser.add_argument("--min-games", type=int, default=30)
+    arg_parser.add_argument("--max-p", type=float, default=0.01)
+    arg_parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    arg_parser.add_argument("--top", type=int, default=25, help="trends to print")
+    arg_parser.add_argument("--out", help="write every trend found to this csv")
+    args = arg_parser.parse_args()
+
+    miner = TrendMiner(args.db, start_year=args.start, end_year=args.end, spans=args.spans,
+                       step=args.step, max_dims=args.max_dims, min_games=args.min_games,
+                       max_p=args.max_p, dimensions=args.dims)
+    trends = miner.run(workers=args.workers)
+    for trend in trends[:args.top]:
+        print(f"{trend.first_season}-{trend.last_season} {trend.metric} {trend.side}: "
+              f"{trend.hits}/{trend.bets} ({trend.hit_pct}%) p={trend.p_value:.2g} | {miner.describe(trend)}")
+    if args.out:
+        miner.write_csv(trends, args.out)
+
+if __name__=="__main__":
+    main()
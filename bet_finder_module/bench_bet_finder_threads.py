@@ -0,0 +1,84 @@
+import argparse
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bet_finder import BetFinder
+
+def make_queries(bf: BetFinder, count: int, seed: int = 7):
+    """Random mix of the dashboard queries over the teams that have games."""
+    rng = random.Random(seed)
+    teams = [bf.resolver.get_name(row[0]) for row in
+             bf.conn.execute("SELECT DISTINCT team_id FROM games WHERE team_id IS NOT NULL;")]
+    first, last = bf.conn.execute("SELECT MIN(season), MAX(season) FROM games;").fetchone()
+    queries = []
+    for _ in range(count):
+        team = rng.choice(teams)
+        start = rng.randint(first, last)
+        end = rng.randint(start, last)
+        kind = rng.choice(("did_cover", "did_hit_over_under", "win_loss_record", "spread_deltas"))
+        queries.append((kind, team, start, end))
+    return queries
+
+def run_query(bf: BetFinder, query):
+    kind, team, start, end = query
+    return getattr(bf, kind)(team, start, end)
+
+def writer_loop(db_path: str, stop: threading.Event, counts: dict):
+    """Stands in for an ingest: small committed updates on a separate connection."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    while not stop.is_set():
+        with conn:
+            conn.execute("UPDATE games SET month = month WHERE id IN (SELECT id FROM games ORDER BY RANDOM() LIMIT 50);")
+        counts["commits"] += 1
+        time.sleep(0.01)
+    conn.close()
+
+def measure(bf: BetFinder, queries, threads: int) -> float:
+    start = time.perf_counter()
+    if threads == 1:
+        for query in queries:
+            run_query(bf, query)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda q: run_query(bf, q), queries))
+    return len(queries) / (time.perf_counter() - start)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="BetFinder queries/sec vs thread count (pooled mode).")
+    arg_parser.add_argument("--db", default="./new_database.db", help="sqlite database path")
+    arg_parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    arg_parser.add_argument("--queries", type=int, default=2000)
+    arg_parser.add_argument("--with-writer", action="store_true",
+                            help="keep committing updates from another connection while querying")
+    args = arg_parser.parse_args()
+
+    # no result cache: every call goes to SQLite
+    bf = BetFinder(args.db, cache_size=0, pooled=True)
+    queries = make_queries(bf, args.queries)
+    print("[info] Warming up...")
+    measure(bf, queries[:200], 1)
+
+    stop = threading.Event()
+    writer_counts = {"commits": 0}
+    writer = None
+    if args.with_writer:
+        writer = threading.Thread(target=writer_loop, args=(args.db, stop, writer_counts), daemon=True)
+        writer.start()
+    print(f"{'threads':>8} {'queries/sec':>14} {'speedup':>9}")
+    baseline = None
+    try:
+        for threads in args.threads:
+            rate = measure(bf, queries, threads)
+            baseline = baseline or rate
+            print(f"{threads:>8} {rate:>14.0f} {rate / baseline:>8.2f}x")
+    finally:
+        stop.set()
+        if writer is not None:
+            writer.join()
+            print(f"[info] Writer committed {writer_counts['commits']} transactions meanwhile.")
+        bf.close()
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from CfbGame import CfbGame, GAME_FIELDS
+from CfbGameBatch import CfbGameBatch, FIELD_KINDS
+
+class DictCfbGame:
+    """CfbGame as it was before __slots__: same attributes, kept in a per-instance __dict__."""
+    def __init__(self, *values):
+        for name, value in zip(GAME_FIELDS, values):
+            setattr(self, name, value)
+
+    def to_db_tuple(self):
+        return tuple(getattr(self, name) for name in GAME_FIELDS)
+
+def make_rows(count: int, seed: int = 7):
+    """Synthetic parsed rows with realistic cardinalities (teams, coaches, confs, etc.)."""
+    rng = random.Random(seed)
+    teams = [f"team {i}" for i in range(260)]
+    confs = [f"conf {i}" for i in range(15)]
+    rows = []
+    for i in range(count):
+        values = []
+        for name in GAME_FIELDS:
+            kind = FIELD_KINDS[name]
+            if name in ("team", "opponent", "coach", "opp_coach", "team_season_id"):
+                values.append(rng.choice(teams))
+            elif name == "date":
+                values.append(f"{rng.randint(8, 12)}/{rng.randint(1, 28)}/{rng.randint(66, 99)}")
+            elif kind == "str":
+                values.append(rng.choice(confs))
+            elif kind == "float":
+                values.append(None if rng.random() < 0.1 else rng.randint(-60, 60) / 2)
+            else:
+                values.append(None if rng.random() < 0.1 else rng.randint(0, 70))
+        rows.append(tuple(values))
+    return rows
+
+def measure(label: str, build, rows):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(rows)
+    elapsed = time.perf_counter() - start
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    if isinstance(result, CfbGameBatch):
+        count = sum(1 for _ in result.iter_db_tuples())
+    else:
+        count = sum(1 for game in result if game.to_db_tuple())
+    to_tuples = time.perf_counter() - start
+    assert count == len(rows)
+    print(f"{label:<28} {current / 1e6:>10.1f} MB {elapsed:>10.3f} s {to_tuples:>12.3f} s")
+    del result
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Memory / build time of CfbGame containers.")
+    arg_parser.add_argument("--games", type=int, default=100_000)
+    args = arg_parser.parse_args()
+
+    rows = make_rows(args.games)
+    print(f"{args.games} games")
+    print(f"{'container':<28} {'memory':>13} {'build':>12} {'to tuples':>14}")
+    measure("list[dict CfbGame]", lambda r: [DictCfbGame(*row) for row in r], rows)
+    measure("list[slots CfbGame]", lambda r: [CfbGame(*row) for row in r], rows)
+    measure("CfbGameBatch", CfbGameBatch.from_tuples, rows)
+
+if __name__=="__main__":
+    main()
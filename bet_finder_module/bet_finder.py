@@ -1,36 +1,346 @@
+import copy
+import csv
+import functools
+import inspect
+import json
 import sqlite3
+import threading
 from utilities import cfb_tricodes
+from QueryCache import QueryCache
+from CfbGameDb import CfbGameDb
+from TeamResolver import TeamResolver, normalize_team_name
+from betting_stats import rate_summaries, rate_summary
+from TeamSeasonStats import STATS_COLUMNS, TeamSeasonStats, row_contributions
 import matplotlib.pyplot as plt
-from datetime import datetime
-from typing import List, Optional
-from dateutil import parser   # more flexible date parsing
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+# result values answered from team_season_stats, value -> aggregate column
+COVER_COLUMNS = {"yes": "covers", "no": "non_covers", "push": "cover_pushes"}
+OVER_UNDER_COLUMNS = {"over": "overs", "under": "unders", "push": "ou_pushes"}
+
+# rows streamed by iter_spread_deltas / iter_total_points_deltas, fields in the
+# same order as the dicts of spread_deltas / total_points_deltas
+class SpreadDelta(NamedTuple):
+    date: str
+    season: int
+    team: str
+    opponent: str
+    team_points: int
+    opp_points: int
+    closing_spread: float
+    actual_spread: int
+    delta: float
+
+class TotalPointsDelta(NamedTuple):
+    date: str
+    season: int
+    team: str
+    opponent: str
+    team_points: int
+    opp_points: int
+    actual_total: int
+    predicted_total: float
+    delta: float
+    result: Optional[str]
+
+# one row per team game from iter_rolling_trends: *_pct are over the last
+# `window_games` games up to and including this one, with the same denominators as
+# did_cover / did_hit_over_under / win_loss_record; streaks are signed run lengths
+# (+3 = third cover / over / win in a row, -2 = second miss in a row, 0 = push / tie)
+class RollingTrend(NamedTuple):
+    game_id: int
+    team_id: int
+    season: int
+    date: str
+    team: str
+    opponent: str
+    game_seq: int
+    window_games: int
+    cover_pct: Optional[float]
+    over_pct: Optional[float]
+    win_pct: Optional[float]
+    cover_streak: int
+    over_streak: int
+    win_streak: int
+
+# rows per fetchmany() round trip when streaming
+STREAM_ARRAYSIZE = 2000
+
+def _cache_key_arg(name: str, value):
+    # arguments that give the same answer map to the same key
+    if name == "team_name" and value:
+        return normalize_team_name(value)
+    if name == "conferences":
+        return tuple(sorted(set(value))) if value else None
+    if name in ("covered_value", "result_value"):
+        return value.lower()
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+def cached_query(method):
+    """
+    Serves repeated calls of a BetFinder query method from self.cache, keyed by the
+    method name and its normalized arguments (defaults filled in). Callers get a copy,
+    so mutating a result does not change the cached one.
+    """
+    parameters = list(inspect.signature(method).parameters.values())[1:]
+    names = [p.name for p in parameters]
+    defaults = [p.default for p in parameters]
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # positional args, then keyword args / defaults (cheaper than Signature.bind)
+        values = list(args) + [kwargs.get(name, default)
+                               for name, default in zip(names[len(args):], defaults[len(args):])]
+        if (self.cache is None or len(args) > len(names) or not kwargs.keys() <= set(names[len(args):])
+                or inspect.Parameter.empty in values):
+            # also lets the method raise its own TypeError for bad arguments
+            return method(self, *args, **kwargs)
+        key = (method.__name__,) + tuple(_cache_key_arg(name, value) for name, value in zip(names, values))
+        hit, result, marker = self.cache.lookup(key)
+        if not hit:
+            result = method(self, *args, **kwargs)
+            self.cache.store(key, result, marker)
+        return copy.deepcopy(result) if isinstance(result, (dict, list)) else result
+    return wrapper
+
 class BetFinder:
-    def __init__(self, db_path: str):
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
+    def __init__(self, db_path: str, debug: bool = False, cache_size: int = 1024,
+                 pooled: bool = False):
+        """
+        `pooled=True` is for sharing one BetFinder between threads: the database is
+        switched to WAL so readers never wait for an ingest, and each thread queries
+        through its own read-only (mode=ro) connection, opened on first use. The cache
+        and team resolver are shared. Methods that write (persist_rolling_trends) need
+        the default single connection mode.
+        """
+        self.db_path = str(db_path)
+        self.debug = debug
+        self.pooled = pooled
+        self._local = threading.local() if pooled else None
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        if pooled:
+            self._enable_wal()
+            # used from every thread, only for short lookups (cache marker, team reload)
+            shared_conn = self._connect(read_only=True, check_same_thread=False)
+        else:
+            self._conn = self._connect()
+            shared_conn = self._conn
+        self._ensure_date_columns()
+        # repeated queries are answered from memory until the database changes;
+        # cache_size=0 turns the cache off
+        self.cache = QueryCache(shared_conn, maxsize=cache_size) if cache_size > 0 else None
+        # team filters use games.team_id (indexed with season) instead of the csv text
+        self.resolver = TeamResolver(shared_conn)
+        # per team / season / site / opp_conf totals kept current by triggers on games;
+        # without the table the same totals are aggregated from games on every call
+        self.use_stats = TeamSeasonStats(self.conn).exists()
+
+        # per team game sequence (across seasons, by date) with trailing window counts
+        # and gaps-and-islands streaks; {team_filter} and {preceding} are filled per call
+        self._rolling_sql = """
+            WITH base AS (
+                SELECT id, team_id, season, date, team, opponent,
+                    CASE LOWER(covered) WHEN 'yes' THEN 1 WHEN 'no' THEN -1 ELSE 0 END AS cover_sign,
+                    CASE LOWER(over_or_under_result) WHEN 'over' THEN 1 WHEN 'under' THEN -1 ELSE 0 END AS over_sign,
+                    CASE WHEN team_points > opp_points THEN 1 WHEN team_points < opp_points THEN -1 ELSE 0 END AS win_sign,
+                    over_or_under_result IS NOT NULL AS has_result,
+                    team_points IS NOT NULL AND opp_points IS NOT NULL AS scored,
+                    ROW_NUMBER() OVER (PARTITION BY team_id ORDER BY date_ord, id) AS game_seq
+                FROM games
+                WHERE team_id IS NOT NULL {team_filter}
+            ),
+            islands AS (
+                -- constant within each run of equal outcomes
+                SELECT *,
+                    game_seq - ROW_NUMBER() OVER (PARTITION BY team_id, cover_sign ORDER BY game_seq) AS cover_run,
+                    game_seq - ROW_NUMBER() OVER (PARTITION BY team_id, over_sign ORDER BY game_seq) AS over_run,
+                    game_seq - ROW_NUMBER() OVER (PARTITION BY team_id, win_sign ORDER BY game_seq) AS win_run
+                FROM base
+            )
+            SELECT id AS game_id, team_id, season, date, team, opponent, game_seq,
+                COUNT(*) OVER recent AS window_games,
+                SUM(cover_sign = 1) OVER recent AS covers,
+                SUM(has_result) OVER recent AS ou_games,
+                SUM(over_sign = 1) OVER recent AS overs,
+                SUM(scored) OVER recent AS scored_games,
+                SUM(win_sign = 1) OVER recent AS wins,
+                cover_sign * ROW_NUMBER() OVER (PARTITION BY team_id, cover_sign, cover_run ORDER BY game_seq) AS cover_streak,
+                over_sign * ROW_NUMBER() OVER (PARTITION BY team_id, over_sign, over_run ORDER BY game_seq) AS over_streak,
+                win_sign * ROW_NUMBER() OVER (PARTITION BY team_id, win_sign, win_run ORDER BY game_seq) AS win_streak
+            FROM islands
+            WINDOW recent AS (PARTITION BY team_id ORDER BY game_seq ROWS BETWEEN {preceding} PRECEDING AND CURRENT ROW)
+        """
+        self._rolling_columns = (
+            "game_id", "team_id", "season", "date", "team", "opponent", "game_seq", "window_games",
+            "covers", "ou_games", "overs", "scored_games", "wins",
+            "cover_streak", "over_streak", "win_streak",
+        )
+        self._rolling_ddl = """
+            CREATE TABLE IF NOT EXISTS rolling_trends (
+                window_size     INTEGER NOT NULL,
+                game_id         INTEGER NOT NULL,
+                team_id         INTEGER NOT NULL,
+                season          INTEGER,
+                date            TEXT,
+                team            TEXT,
+                opponent        TEXT,
+                game_seq        INTEGER NOT NULL,
+                window_games    INTEGER NOT NULL,
+                covers          INTEGER NOT NULL,
+                ou_games        INTEGER NOT NULL,
+                overs           INTEGER NOT NULL,
+                scored_games    INTEGER NOT NULL,
+                wins            INTEGER NOT NULL,
+                cover_streak    INTEGER NOT NULL,
+                over_streak     INTEGER NOT NULL,
+                win_streak      INTEGER NOT NULL,
+                PRIMARY KEY (window_size, team_id, game_seq)
+            ) WITHOUT ROWID;
+            """
+
+    def team_id(self, team_name: str) -> Optional[int]:
+        team_id = self.resolver.get_id(team_name)
+        if team_id is None:
+            print(f"[WARN] Unknown team '{team_name}'")
+        return team_id
+
+    def _connect(self, read_only: bool = False, check_same_thread: bool = True) -> sqlite3.Connection:
+        if read_only:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _enable_wal(self):
+        # journal_mode is stored in the database file, so this only needs a writer once
+        conn = sqlite3.connect(self.db_path)
+        try:
+            mode = conn.execute("PRAGMA journal_mode = WAL;").fetchone()[0]
+            if mode.lower() != "wal":
+                print(f"[warn] Could not switch {self.db_path} to WAL (journal_mode={mode}), "
+                      "readers may wait for writers.")
+        finally:
+            conn.close()
+
+    def _ensure_date_columns(self):
+        """
+        The deltas, rolling trends, date window and InMemoryBetFinder order games by
+        games.date_ord, which older databases lack. The default mode adds and backfills
+        it; pooled mode only has read-only connections and refuses to start instead.
+        """
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(games);")}
+        if not columns or "date_ord" in columns:
+            return
+        if self.pooled:
+            self.close()
+            raise RuntimeError(f"{self.db_path}: games has no date_ord column (older schema). "
+                               "Migrate it first: open it once with BetFinder(db_path) or run "
+                               "CfbGameDb(conn).ensure_schema().")
+        print(f"[info] {self.db_path}: adding the games date columns.")
+        CfbGameDb(self._conn).ensure_date_columns()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """This thread's connection in pooled mode, the single connection otherwise."""
+        if self._local is None:
+            return self._conn
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # not thread bound, so close() can close it from any thread
+            conn = self._local.conn = self._connect(read_only=True, check_same_thread=False)
+        return conn
+
+    def close(self):
+        """Closes every connection this BetFinder opened (all threads in pooled mode)."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+    def cache_info(self) -> Optional[dict]:
+        """Hit / miss / eviction / invalidation counters of the result cache."""
+        return self.cache.info() if self.cache is not None else None
+
+    def cache_clear(self):
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _team_totals(
+        self,
+        team_ids: Optional[List[int]],
+        start_year: int,
+        end_year: int,
+        conferences: Optional[List[str]] = None
+    ) -> Dict[int, sqlite3.Row]:
+        """
+        STATS_COLUMNS totals per team_id between `start_year` and `end_year`, summed
+        from team_season_stats when it exists (a handful of rows per team season) and
+        from the raw games rows otherwise. `team_ids=None` returns every team.
+        """
+        if self.use_stats:
+            source = "team_season_stats"
+            sums = ", ".join(f"SUM({column}) AS {column}" for column in STATS_COLUMNS)
+        else:
+            source = "games"
+            sums = ", ".join(f"SUM({expr}) AS {column}"
+                             for column, expr in zip(STATS_COLUMNS, row_contributions("games")))
+        query = f"SELECT team_id, {sums} FROM {source} WHERE season BETWEEN ? AND ?"
+        params: List = [start_year, end_year]
 
+        if team_ids is not None:
+            placeholders = ",".join(["?"] * len(team_ids))
+            query += f" AND team_id IN ({placeholders})"
+            params.extend(team_ids)
+
+        if conferences:
+            placeholders = ",".join(["?"] * len(conferences))
+            query += f" AND opp_conf IN ({placeholders})"
+            params.extend(conferences)
+
+        query += " GROUP BY team_id"
+        cur = self.conn.cursor()
+        cur.execute(query, params)
+        return {row["team_id"]: row for row in cur.fetchall()}
+
+    @cached_query
     def did_cover(
         self,
         team_name: str,
         start_year: int,
         end_year: int,
         covered_value: str = "yes",
-        conferences: Optional[List[str]] = None
-    ) -> Optional[float]:
+        conferences: Optional[List[str]] = None,
+        with_ci: bool = False
+    ):
         """
         Returns the percentage of games where `team_name` covered the spread 
         between `start_year` and `end_year`.
+
+        With `with_ci=True` returns a dict instead: count, games, pct, Wilson and
+        bootstrap 95% intervals and the p-value against the -110 break even rate.
         """
 
         base_query = """
             SELECT COUNT(*) as total_games,
                 SUM(CASE WHEN LOWER(covered) = LOWER(?) THEN 1 ELSE 0 END) as covered_games
             FROM games
-            WHERE LOWER(team) = LOWER(?)
+            WHERE team_id = ?
             AND season BETWEEN ? AND ?
         """
 
-        params: List = [covered_value, team_name, start_year, end_year]
+        team_id = self.team_id(team_name)
+        if team_id is None:
+            return None
+        params: List = [covered_value, team_id, start_year, end_year]
 
         if conferences:
             placeholders = ",".join(["?"] * len(conferences))
@@ -40,25 +350,35 @@ class BetFinder:
         cur = self.conn.cursor()
         
         # 🔍 Debugging
-        print("\n=== [DEBUG] Running did_cover ===")
-        print(f"Team: {team_name} | Start: {start_year} | End: {end_year} | Covered: {covered_value}")
-        print(f"Params: {params}")
-
-        cur.execute(base_query, params)
-        row = cur.fetchone()
-
-        print(f"[DEBUG] Query result row: {row}")
+        if self.debug:
+            print("\n=== [DEBUG] Running did_cover ===")
+            print(f"Team: {team_name} | Start: {start_year} | End: {end_year} | Covered: {covered_value}")
+            print(f"Params: {params} | team_season_stats: {self.use_stats}")
+
+        column = COVER_COLUMNS.get(covered_value.lower())
+        if self.use_stats and column:
+            totals = self._team_totals([team_id], start_year, end_year, conferences).get(team_id)
+            total = totals["games"] if totals else 0
+            covered = totals[column] if totals else 0
+        else:
+            cur.execute(base_query, params)
+            row = cur.fetchone()
+            if self.debug:
+                print(f"[DEBUG] Query result row: {dict(row) if row else row}")
+            total = row["total_games"] if row else 0
+            covered = row["covered_games"] if row else 0
 
-        if not row or row["total_games"] == 0:
+        if total == 0:
             print(f"[WARN] No games found for team '{team_name}' between {start_year} and {end_year}")
             return None
 
-        total = row["total_games"]
-        covered = row["covered_games"]
-
-        print(f"[DEBUG] total: {total}, covered: {covered}")
+        if self.debug:
+            print(f"[DEBUG] total: {total}, covered: {covered}")
+        if with_ci:
+            return rate_summary(covered, total)
         return round((covered / total) * 100, 2)
     
+    @cached_query
     def win_loss_record(
             self,
             team_name: str,
@@ -76,14 +396,24 @@ class BetFinder:
             SUM(CASE WHEN team_points = opp_points THEN 1 ELSE 0 END) AS ties,
             COUNT(*) AS total
         FROM games
-        WHERE team = ?
+        WHERE team_id = ?
         AND season BETWEEN ? AND ?
         AND team_points IS NOT NULL
         AND opp_points IS NOT NULL
         """
 
+        team_id = self.team_id(team_name)
+        if self.use_stats:
+            totals = self._team_totals([team_id], start_year, end_year).get(team_id)
+            return {
+                "wins": totals["wins"] if totals else 0,
+                "losses": totals["losses"] if totals else 0,
+                "ties": totals["ties"] if totals else 0,
+                "total": totals["scored_games"] if totals else 0,
+            }
+
         cur = self.conn.cursor()
-        cur.execute(query, (team_name, start_year, end_year))
+        cur.execute(query, (team_id, start_year, end_year))
         row = cur.fetchone()
 
         return {
@@ -93,6 +423,55 @@ class BetFinder:
             "total": row["total"] or 0,
         }
 
+    def _stream(self, query: str, params: list, arraysize: int) -> Iterator[tuple]:
+        """Yields plain tuples for `query`, fetched `arraysize` rows at a time."""
+        cur = self.conn.cursor()
+        cur.row_factory = None
+        cur.arraysize = arraysize
+        cur.execute(query, params)
+        try:
+            while True:
+                rows = cur.fetchmany()
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cur.close()
+
+    def _team_filter(self, team_name: Optional[str], query: str, params: list):
+        # None means every team; an unknown team matches nothing, like team_id = NULL
+        if team_name is None:
+            return query, params
+        return query + " AND team_id = ?", params + [self.team_id(team_name)]
+
+    def iter_spread_deltas(
+            self,
+            team_name: Optional[str],
+            start_year: int,
+            end_year: int,
+            arraysize: int = STREAM_ARRAYSIZE
+        ) -> Iterator[SpreadDelta]:
+        """
+        Streams the rows of spread_deltas as SpreadDelta tuples, in date order, with
+        constant memory. `team_name=None` covers every team (league wide export).
+        """
+        query, params = self._team_filter(team_name, """
+        SELECT date, season, team, opponent, team_points, opp_points, team_spread
+        FROM games
+        WHERE season BETWEEN ? AND ?
+        AND team_spread IS NOT NULL
+        AND team_points IS NOT NULL
+        AND opp_points IS NOT NULL
+        """, [start_year, end_year])
+        query += " ORDER BY date_ord ASC, id ASC"
+
+        for game_date, season, team, opponent, team_points, opp_points, predicted in \
+                self._stream(query, params, arraysize):
+            actual_spread = opp_points - team_points
+            # positive = underdog underperformed
+            yield SpreadDelta(game_date, season, team, opponent, team_points, opp_points,
+                              predicted, actual_spread, round(predicted - actual_spread, 2))
+
     def spread_deltas(
             self,
             team_name: str,
@@ -104,59 +483,22 @@ class BetFinder:
         (team_spread) was from the actual result (opp_points - team_points)
         for each game between the given years.
         """
-        query = """
-        SELECT
-            date,
-            season,
-            team,
-            opponent,
-            team_points,
-            opp_points,
-            team_spread
-        FROM games
-        WHERE team = ?
-        AND season BETWEEN ? AND ?
-        AND team_spread IS NOT NULL
-        AND team_points IS NOT NULL
-        AND opp_points IS NOT NULL
-        ORDER BY date ASC
-        """
-
-        cur = self.conn.cursor()
-        cur.execute(query, (team_name, start_year, end_year))
-        rows = cur.fetchall()
-
-        results = []
-
-        for row in rows:
-            predicted = row["team_spread"]
-            actual_spread = row["opp_points"] - row["team_points"]
-            delta = predicted - actual_spread  # positive = underdog underperformed
-            results.append({
-                "date": row["date"],
-                "season": row["season"],
-                "team": row["team"],
-                "opponent": row["opponent"],
-                "team_points": row["team_points"],
-                "opp_points": row["opp_points"],
-                "closing_spread": predicted,
-                "actual_spread": actual_spread,
-                "delta": round(delta, 2)
-            })
-
-        return results
+        return [row._asdict() for row in self.iter_spread_deltas(team_name, start_year, end_year)]
 
+    @cached_query
     def did_hit_over_under(
         self,
         team_name: str,
         start_year: int,
         end_year: int,
         result_value: str = "over",
-        conferences: Optional[List[str]] = None
+        conferences: Optional[List[str]] = None,
+        with_ci: bool = False
     ):
         """
         Returns the percentage of games where the over/under result matched the given value.
         Valid result_value: "over", "under", "push"
+        With `with_ci=True` returns the same dict as did_cover(with_ci=True).
 
         If `conferences` is provided, only include games where opp_conf is in that list.
         """
@@ -164,12 +506,15 @@ class BetFinder:
             SELECT COUNT(*) as total_games,
                 SUM(CASE WHEN LOWER(over_or_under_result) = LOWER(?) THEN 1 ELSE 0 END) as matching_result
             FROM games
-            WHERE team = ?
+            WHERE team_id = ?
             AND season BETWEEN ? AND ?
             AND over_or_under_result IS NOT NULL
         """
 
-        params: list = [result_value, team_name, start_year, end_year]
+        team_id = self.team_id(team_name)
+        if team_id is None:
+            return None
+        params: list = [result_value, team_id, start_year, end_year]
 
         # Add conference filter if provided
         if conferences:
@@ -177,72 +522,66 @@ class BetFinder:
             base_query += f" AND opp_conf IN ({placeholders})"
             params.extend(conferences)
 
-        cur = self.conn.cursor()
-        cur.execute(base_query, params)
-        row = cur.fetchone()
-
-        total = row["total_games"]
-        matched = row["matching_result"]
+        column = OVER_UNDER_COLUMNS.get(result_value.lower())
+        if self.use_stats and column:
+            totals = self._team_totals([team_id], start_year, end_year, conferences).get(team_id)
+            total = totals["ou_games"] if totals else 0
+            matched = totals[column] if totals else 0
+        else:
+            cur = self.conn.cursor()
+            cur.execute(base_query, params)
+            row = cur.fetchone()
+            total = row["total_games"]
+            matched = row["matching_result"]
 
         if total == 0:
             return None
 
+        if with_ci:
+            return rate_summary(matched, total)
         return round((matched / total) * 100, 2)
 
+    def iter_total_points_deltas(
+            self,
+            team_name: Optional[str],
+            start_year: int,
+            end_year: int,
+            arraysize: int = STREAM_ARRAYSIZE
+        ) -> Iterator[TotalPointsDelta]:
+        """
+        Streams the rows of total_points_deltas as TotalPointsDelta tuples, in date
+        order, with constant memory. `team_name=None` covers every team.
+        """
+        query, params = self._team_filter(team_name, """
+        SELECT date, season, team, opponent, team_points, opp_points, over_under, over_or_under_result
+        FROM games
+        WHERE season BETWEEN ? AND ?
+        AND over_under IS NOT NULL
+        AND team_points IS NOT NULL
+        AND opp_points IS NOT NULL
+        """, [start_year, end_year])
+        query += " ORDER BY date_ord ASC, id ASC"
+
+        for game_date, season, team, opponent, team_points, opp_points, predicted, result in \
+                self._stream(query, params, arraysize):
+            actual_total = team_points + opp_points
+            # positive = game went over expected total
+            yield TotalPointsDelta(game_date, season, team, opponent, team_points, opp_points,
+                                   actual_total, predicted, round(actual_total - predicted, 2), result)
+
     def total_points_deltas(
             self,
             team_name: str,
             start_year: int,
             end_year: int
         ):
-            """
-            Returns a list of dictionaries comparing predicted total points (over_under)
-            to actual total points (team_points + opp_points) for each game.
-            """
-            query = """
-            SELECT
-                date,
-                season,
-                team_name,
-                opponent,
-                team_points,
-                opp_points,
-                over_under,
-                over_or_under_result
-            FROM games
-            WHERE team = ?
-            AND season BETWEEN ? AND ?
-            AND over_under IS NOT NULL
-            AND team_points IS NOT NULL
-            AND opp_points IS NOT NULL
-            ORDER BY date ASC
-            """
-            cur = self.conn.cursor()
-            cur.execute(query, (team_name, start_year, end_year))
-            rows = cur.fetchall()
-
-            results = []
-
-            for row in rows:
-                actual_total = row["team_points"] + row["opp_points"]
-                predicted_total = row["over_under"]
-                delta = actual_total - predicted_total  # positive = game went over expected total
-
-                results.append({
-                    "date": row["date"],
-                    "season": row["season"],
-                    "team": row["team"],
-                    "opponent": row["opponent"],
-                    "team_points": row["team_points"],
-                    "opp_points": row["opp_points"],
-                    "actual_total": actual_total,
-                    "predicted_total": predicted_total,
-                    "delta": round(delta, 2),
-                    "result": row["over_or_under_result"]
-                })
-
-            return results
-    
+        """
+        Returns a list of dictionaries comparing predicted total points (over_under)
+        to actual total points (team_points + opp_points) for each game.
+        """
+        return [row._asdict() for row in self.iter_total_points_deltas(team_name, start_year, end_year)]
+
+    @cached_query
     def did_hit_over_under_in_date_window(
         self,
         start_year: int,
@@ -254,70 +593,63 @@ class BetFinder:
     ) -> Optional[dict]:
         """
         Returns the percentage of games that went OVER, UNDER, or PUSH in the given date window and year range.
+        Runs as one aggregate over the indexed (season, date_ord) columns.
 
         If `team_name` is given, filters to that team only.
         If `conferences` are given, filters to those opponent conferences.
         """
-        query = """
-            SELECT date, over_under, total_points
-            FROM games
-            WHERE season BETWEEN ? AND ?
-            AND over_under IS NOT NULL
-            AND total_points IS NOT NULL
+        start_month, start_day = map(int, start_mmdd.split("/"))
+        end_month, end_day = map(int, end_mmdd.split("/"))
+
+        # one (season, first day, last day) row per calendar year in range; a calendar
+        # year holds games of that season and of the previous one (bowls in January)
+        windows = []
+        for year in range(start_year, end_year + 1):
+            try:
+                window_start = date(year, start_month, start_day).toordinal()
+                window_end = date(year, end_month, end_day).toordinal()
+            except ValueError:
+                continue  # e.g. 02/29 in a non leap year
+            for season in (year - 1, year):
+                if start_year <= season <= end_year:
+                    windows.append(f"({season}, {window_start}, {window_end})")
+        if not windows:
+            print("[warn] No games matched within the date window.")
+            return None
+
+        query = f"""
+            WITH date_windows(season, first_ord, last_ord) AS (VALUES {", ".join(windows)})
+            SELECT COUNT(*) AS games,
+                SUM(CAST(g.total_points AS REAL) > CAST(g.over_under AS REAL)) AS over_count,
+                SUM(CAST(g.total_points AS REAL) < CAST(g.over_under AS REAL)) AS under_count,
+                SUM(CAST(g.total_points AS REAL) = CAST(g.over_under AS REAL)) AS push_count
+            FROM date_windows w
+            JOIN games g ON g.season = w.season AND g.date_ord BETWEEN w.first_ord AND w.last_ord
+            WHERE g.over_under IS NOT NULL
+            AND g.total_points IS NOT NULL
+            AND CAST(g.over_under AS REAL) <> 0
+            AND CAST(g.total_points AS REAL) <> 0
         """
-        params: List = [start_year, end_year]
+        params: List = []
 
         if team_name:
-            query += " AND team = ?"
-            params.append(team_name)
+            team_id = self.team_id(team_name)
+            if team_id is None:
+                return None
+            query += " AND g.team_id = ?"
+            params.append(team_id)
 
         if conferences:
             placeholders = ",".join(["?"] * len(conferences))
-            query += f" AND opp_conf IN ({placeholders})"
+            query += f" AND g.opp_conf IN ({placeholders})"
             params.extend(conferences)
 
         cur = self.conn.cursor()
         cur.execute(query, params)
-        rows = cur.fetchall()
-
-        if not rows:
-            print("[warn] No games matched your filters.")
-            return None
-
-        start_month, start_day = map(int, start_mmdd.split("/"))
-        end_month, end_day = map(int, end_mmdd.split("/"))
-
-        over, under, push, total = 0, 0, 0, 0
-
-        for r in rows:
-            game_date = parser.parse(r["date"])
-
-            if start_year <= game_date.year <= end_year:
-                start_window = datetime(game_date.year, start_month, start_day)
-                end_window = datetime(game_date.year, end_month, end_day)
-
-                if start_window <= game_date <= end_window:
-                    closing = r["over_under"]
-                    actual = r["total_points"]
-
-                    # Skip if either value is None or empty string
-                    if not closing or not actual:
-                        continue
-
-                    try:
-                        closing_total = float(closing)
-                        actual_total = float(actual)
-                    except ValueError:
-                        continue  # skip bad data
-
-                    if actual_total > closing_total:
-                        over += 1
-                    elif actual_total < closing_total:
-                        under += 1
-                    else:
-                        push += 1
+        row = cur.fetchone()
 
-                    total += 1
+        total = row["games"]
+        over, under, push = row["over_count"], row["under_count"], row["push_count"]
 
         if total == 0:
             print("[warn] No games matched within the date window.")
@@ -333,28 +665,240 @@ class BetFinder:
             "push_count": push
         }
 
+    @cached_query
+    def team_report(
+        self,
+        teams: Optional[List[str]],
+        start_year: int,
+        end_year: int,
+        conferences: Optional[List[str]] = None,
+        with_ci: bool = False
+    ) -> Dict[str, dict]:
+        """
+        Returns cover / over / under / push percentages and the W/L/T record for every
+        team in `teams` (or every team with games when `teams` is None) between
+        `start_year` and `end_year`, computed in one grouped query (over team_season_stats
+        when it exists).
+
+        Percentages use the same denominators as did_cover (all games) and
+        did_hit_over_under (games with an over/under result), so they match those
+        methods; they are None when there is nothing to divide by.
+
+        With `with_ci=True` each team also gets "ci": the did_cover(with_ci=True) dict
+        for "cover", "over" and "under" (None without games); the bootstrap draws for
+        all teams are made in one NumPy call per metric.
+        """
+        # several names (aliases) can resolve to the same team, each gets its report
+        names: Dict[int, List[str]] = {}
+        if teams is not None:
+            for team in teams:
+                team_id = self.team_id(team)
+                if team_id is not None:
+                    names.setdefault(team_id, []).append(team)
+            if not names:
+                return {team: self._empty_team_report(None) for team in teams}
+
+        rows = self._team_totals(list(names) if teams is not None else None,
+                                 start_year, end_year, conferences)
+
+        def pct(count: int, total: int) -> Optional[float]:
+            return round((count / total) * 100, 2) if total else None
+
+        report: Dict[str, dict] = {}
+        if teams is None:
+            team_ids = sorted(rows, key=lambda team_id: self.resolver.get_name(team_id) or "")
+            names = {team_id: [self.resolver.get_name(team_id) or str(team_id)] for team_id in team_ids}
+        for team_id, team_names in names.items():
+            row = rows.get(team_id)
+            for team in team_names:
+                if row is None:
+                    report[team] = self._empty_team_report(team_id)
+                    continue
+                report[team] = {
+                    "team_id": team_id,
+                    "games": row["games"],
+                    "cover_pct": pct(row["covers"], row["games"]),
+                    "over_pct": pct(row["overs"], row["ou_games"]),
+                    "under_pct": pct(row["unders"], row["ou_games"]),
+                    "push_pct": pct(row["ou_pushes"], row["ou_games"]),
+                    "covers": row["covers"],
+                    "ou_games": row["ou_games"],
+                    "overs": row["overs"],
+                    "unders": row["unders"],
+                    "pushes": row["ou_pushes"],
+                    "wins": row["wins"],
+                    "losses": row["losses"],
+                    "ties": row["ties"],
+                }
+        if teams is not None:
+            # unresolved teams keep their slot so callers can report them
+            for team in teams:
+                report.setdefault(team, self._empty_team_report(None))
+        if with_ci:
+            self._add_team_report_ci(report)
+        return report
+
+    @staticmethod
+    def _add_team_report_ci(report: Dict[str, dict]):
+        played = [stats for stats in report.values() if stats["games"]]
+        for stats in report.values():
+            stats["ci"] = None
+        for stats in played:
+            stats["ci"] = {}
+        for metric, count, total in (("cover", "covers", "games"),
+                                     ("over", "overs", "ou_games"),
+                                     ("under", "unders", "ou_games")):
+            summaries = rate_summaries([(stats[count], stats[total]) for stats in played])
+            for stats, summary in zip(played, summaries):
+                stats["ci"][metric] = summary
+
+    @staticmethod
+    def _empty_team_report(team_id: Optional[int]) -> dict:
+        return {
+            "team_id": team_id, "games": 0,
+            "cover_pct": None, "over_pct": None, "under_pct": None, "push_pct": None,
+            "covers": 0, "ou_games": 0, "overs": 0, "unders": 0, "pushes": 0,
+            "wins": 0, "losses": 0, "ties": 0,
+        }
+
+    def _rolling_query(self, team_id: Optional[int], window: int, filtered: bool) -> str:
+        assert int(window) >= 1, "window must be at least 1 game"
+        return self._rolling_sql.format(
+            team_filter="AND team_id = ?" if filtered else "",
+            preceding=int(window) - 1,
+        )
 
-def analyze_teams(teams: List[str], start_year: int, end_year: int, bf: BetFinder, conferences: Optional[List[str]] = None):
+    def persist_rolling_trends(self, window: int = 10, team_name: Optional[str] = None) -> int:
+        """
+        Computes iter_rolling_trends for `window` (one team, or all teams) and stores it
+        in the rolling_trends table, replacing earlier rows for that window / team.
+        The table is a snapshot: re-run after loading new games. Returns the row count.
+        """
+        team_id = self.team_id(team_name) if team_name is not None else None
+        params: List = [team_id] if team_name is not None else []
+        columns = ", ".join(self._rolling_columns)
+        with self.conn:
+            self.conn.executescript(self._rolling_ddl)
+            delete_sql = "DELETE FROM rolling_trends WHERE window_size = ?"
+            if team_name is not None:
+                delete_sql += " AND team_id = ?"
+            self.conn.execute(delete_sql, [window] + params)
+            cur = self.conn.execute(
+                f"INSERT INTO rolling_trends (window_size, {columns}) "
+                f"SELECT {int(window)}, {columns} FROM ({self._rolling_query(team_id, window, team_name is not None)})",
+                params
+            )
+        print(f"[info] Stored {cur.rowcount} rolling trend rows for window {window}.")
+        return cur.rowcount
+
+    def iter_rolling_trends(
+            self,
+            team_name: Optional[str] = None,
+            window: int = 10,
+            start_year: Optional[int] = None,
+            end_year: Optional[int] = None,
+            persist: bool = False,
+            arraysize: int = STREAM_ARRAYSIZE
+        ) -> Iterator[RollingTrend]:
+        """
+        Streams a RollingTrend per game for one team (or every team when `team_name` is
+        None), ordered by team and game sequence, computed in a single pass with SQL
+        window functions. Windows roll across seasons; `start_year` / `end_year` only
+        limit which games are returned. With `persist=True` the trends are first stored
+        by persist_rolling_trends and streamed from that table.
+        """
+        team_id = self.team_id(team_name) if team_name is not None else None
+        params: List = [team_id] if team_name is not None else []
+        columns = ", ".join(self._rolling_columns)
+        if persist:
+            self.persist_rolling_trends(window, team_name)
+            query = f"SELECT {columns} FROM rolling_trends WHERE window_size = ?"
+            params = [window] + params
+            if team_name is not None:
+                query += " AND team_id = ?"
+        else:
+            query = f"SELECT {columns} FROM ({self._rolling_query(team_id, window, team_name is not None)}) WHERE 1"
+        if start_year is not None:
+            query += " AND season >= ?"
+            params.append(start_year)
+        if end_year is not None:
+            query += " AND season <= ?"
+            params.append(end_year)
+        query += " ORDER BY team_id, game_seq"
+
+        def pct(count: int, total: int) -> Optional[float]:
+            return round((count / total) * 100, 2) if total else None
+
+        for (game_id, row_team_id, season, game_date, team, opponent, game_seq, window_games,
+             covers, ou_games, overs, scored_games, wins,
+             cover_streak, over_streak, win_streak) in self._stream(query, params, arraysize):
+            yield RollingTrend(
+                game_id, row_team_id, season, game_date, team, opponent, game_seq, window_games,
+                pct(covers, window_games), pct(overs, ou_games), pct(wins, scored_games),
+                cover_streak, over_streak, win_streak,
+            )
+
+    def rolling_trends(
+            self,
+            team_name: Optional[str] = None,
+            window: int = 10,
+            start_year: Optional[int] = None,
+            end_year: Optional[int] = None,
+            persist: bool = False
+        ) -> List[dict]:
+        """List of dict version of iter_rolling_trends."""
+        return [row._asdict() for row in
+                self.iter_rolling_trends(team_name, window, start_year, end_year, persist=persist)]
+
+
+def analyze_teams(teams: Optional[List[str]], start_year: int, end_year: int, bf: BetFinder, conferences: Optional[List[str]] = None):
     """
-    Iterate over a list of teams and print spread/total stats for each.
+    Print spread/total stats for each team (every team when `teams` is None),
+    from a single BetFinder.team_report query.
     """
 
     assert start_year <= end_year, "start year must be less than or equal to end year"
 
-    for team in teams:
+    report = bf.team_report(teams, start_year, end_year, conferences=conferences)
+    for team, stats in report.items():
         print(f"\n--- {team} ---")
-        
-        result = bf.did_cover(team, start_year, end_year, conferences=conferences)
-        if result is not None:
-            print(f"{team} covered the spread {result}% of the time.")
 
-        over_pct = bf.did_hit_over_under(team, start_year, end_year, result_value="over", conferences=conferences)
-        if over_pct is not None:
-            print(f"{team} hit the **over** {over_pct}% of the time.")
+        if stats["cover_pct"] is not None:
+            print(f"{team} covered the spread {stats['cover_pct']}% of the time.")
+
+        if stats["over_pct"] is not None:
+            print(f"{team} hit the **over** {stats['over_pct']}% of the time.")
+
+        if stats["under_pct"] is not None:
+            print(f"{team} hit the **under** {stats['under_pct']}% of the time.")
+
+        if stats["games"]:
+            print(f"{team} went {stats['wins']}-{stats['losses']}-{stats['ties']}.")
 
-        under_pct = bf.did_hit_over_under(team, start_year, end_year, result_value="under", conferences=conferences)
-        if under_pct is not None:
-            print(f"{team} hit the **under** {under_pct}% of the time.")
+def write_csv(rows: Iterable[NamedTuple], path: str) -> int:
+    """
+    Writes streamed rows (e.g. iter_spread_deltas) to a csv with a header from the
+    tuple fields, one row at a time. Returns the number of rows written.
+    """
+    count = 0
+    with open(path, "w", newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for row in rows:
+            if count == 0:
+                writer.writerow(row._fields)
+            writer.writerow(row)
+            count += 1
+    return count
+
+def write_ndjson(rows: Iterable[NamedTuple], path: str) -> int:
+    """Writes streamed rows as one JSON object per line. Returns the number of rows written."""
+    count = 0
+    with open(path, "w", encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row._asdict()))
+            f.write("\n")
+            count += 1
+    return count
 
 def print_table_columns(db_path: str, table_name: str):
     conn = sqlite3.connect(db_path)
@@ -0,0 +1,280 @@
+import argparse
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+from bet_finder import BetFinder
+from QueryCache import QueryCache
+
+# endpoint -> BetFinder method; query parameters are the method's argument names,
+# e.g. /did_cover?team_name=ohio%20state&start_year=2010&end_year=2024
+ENDPOINTS = {
+    "did_cover": "did_cover",
+    "did_hit_over_under": "did_hit_over_under",
+    "win_loss_record": "win_loss_record",
+    "spread_deltas": "spread_deltas",
+    "total_points_deltas": "total_points_deltas",
+    "date_window": "did_hit_over_under_in_date_window",
+    "team_report": "team_report",
+    "rolling_trends": "rolling_trends",
+}
+MAX_BODY_SIZE = 1 << 20
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+class BadRequest(Exception):
+    pass
+
+def _as_list(value) -> List[str]:
+    # comma separated in a query string, a json list in a batch
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(",") if part.strip()]
+    return list(value)
+
+def _as_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+# arguments that are not strings; everything else is passed through as is
+PARAM_TYPES = {
+    "start_year": int,
+    "end_year": int,
+    "window": int,
+    "conferences": _as_list,
+    "teams": _as_list,
+    "with_ci": _as_bool,
+}
+# arguments that write to the database, which the server only opens read-only
+WRITE_PARAMS = ("persist",)
+
+def _json_body(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+class BetFinderServer:
+    """
+    Long running HTTP/JSON front end for BetFinder, so tools skip the process start,
+    imports and reconnect of a fresh bet_finder.py run.
+    One pooled BetFinder (per-thread read-only connections) answers the queries on a
+    thread pool while the asyncio loop only parses requests. Encoded responses are
+    kept in a QueryCache on the loop's own connection, so they are dropped as soon as
+    the database changes, and identical requests that arrive while the first one is
+    still running wait for its result instead of querying again.
+    POST /batch takes a json list of {"endpoint": ..., "params": {...}} and answers
+    every cache miss in a single thread pool job.
+    """
+    def __init__(self, db_path: str, threads: int = 4, cache_size: int = 4096, debug: bool = False):
+        self.bf = BetFinder(db_path, debug=debug, cache_size=cache_size, pooled=True)
+        self.threads = threads
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="bet_finder")
+        uri = f"file:{Path(db_path).resolve().as_posix()}?mode=ro"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self.responses = QueryCache(self._conn, maxsize=cache_size) if cache_size > 0 else None
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+        self.requests = 0
+        self.coalesced = 0
+        self.started = time.time()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.bf.close()
+        self._conn.close()
+
+    def _call(self, endpoint: str, params: dict) -> bytes:
+        """Runs one query on a pool thread and returns the encoded response body."""
+        if endpoint not in ENDPOINTS:
+            raise BadRequest(f"Unknown endpoint '{endpoint}'")
+        if not isinstance(params, dict):
+            raise BadRequest("params must be an object")
+        writes = [name for name in WRITE_PARAMS if name in params]
+        if writes:
+            raise BadRequest(f"{', '.join(writes)} is not supported, the server is read-only")
+        try:
+            kwargs = {name: PARAM_TYPES.get(name, str)(value) for name, value in params.items()}
+        except (TypeError, ValueError) as e:
+            raise BadRequest(f"Bad parameter: {e}")
+        method = getattr(self.bf, ENDPOINTS[endpoint])
+        try:
+            result = method(**kwargs)
+        except (TypeError, ValueError, AssertionError) as e:
+            raise BadRequest(f"{endpoint}: {e}")
+        return _json_body({"result": result})
+
+    def _call_many(self, calls: List[Tuple[str, dict]]) -> List[Tuple[int, bytes]]:
+        results = []
+        for endpoint, params in calls:
+            try:
+                results.append((200, self._call(endpoint, params)))
+            except BadRequest as e:
+                results.append((400, _json_body({"error": str(e)})))
+            except Exception as e:
+                print(f"[error] {endpoint} {params}: {e!r}")
+                results.append((500, _json_body({"error": repr(e)})))
+        return results
+
+    @staticmethod
+    def _cache_key(endpoint: str, params: dict) -> tuple:
+        return (endpoint, json.dumps(params, sort_keys=True, default=str))
+
+    async def query(self, endpoint: str, params: dict) -> bytes:
+        """Encoded response for one query: from the cache, an identical running query, or the pool."""
+        key = self._cache_key(endpoint, params)
+        marker = None
+        if self.responses is not None:
+            hit, body, marker = self.responses.lookup(key)
+            if hit:
+                return body
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().run_in_executor(self.executor, self._call, endpoint, params)
+        self._in_flight[key] = future
+        try:
+            body = await asyncio.shield(future)
+        finally:
+            del self._in_flight[key]
+        if self.responses is not None:
+            self.responses.store(key, body, marker)
+        return body
+
+    async def batch(self, items) -> bytes:
+        if not isinstance(items, list):
+            raise BadRequest("batch body must be a json list of {\"endpoint\": ..., \"params\": {...}}")
+        bodies: List[Optional[bytes]] = [None] * len(items)
+        misses = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict) or "endpoint" not in item:
+                bodies[i] = _json_body({"error": "batch items need an endpoint"})
+                continue
+            key = self._cache_key(item["endpoint"], item.get("params", {}))
+            if self.responses is not None:
+                hit, body, marker = self.responses.lookup(key)
+                if hit:
+                    bodies[i] = body
+                    continue
+            else:
+                marker = None
+            misses.append((i, key, marker, (item["endpoint"], item.get("params", {}))))
+        if misses:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._call_many, [call for _, _, _, call in misses])
+            for (i, key, marker, _), (status, body) in zip(misses, results):
+                bodies[i] = body
+                if status == 200 and self.responses is not None:
+                    self.responses.store(key, body, marker)
+        return b"[" + b",".join(bodies) + b"]"
+
+    def stats(self) -> dict:
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "response_cache": self.responses.info() if self.responses is not None else None,
+            "query_cache": self.bf.cache_info(),
+        }
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, bytes]:
+        url = urlsplit(target)
+        path = url.path.strip("/")
+        try:
+            if path == "batch":
+                if method != "POST":
+                    return 405, _json_body({"error": "use POST for /batch"})
+                try:
+                    items = json.loads(body or b"null")
+                except ValueError as e:
+                    raise BadRequest(f"Invalid json: {e}")
+                return 200, await self.batch(items)
+            if method != "GET":
+                return 405, _json_body({"error": f"use GET for /{path}"})
+            if path in ("", "health"):
+                return 200, _json_body({"status": "ok", "endpoints": sorted(ENDPOINTS)})
+            if path == "stats":
+                return 200, _json_body(self.stats())
+            if path not in ENDPOINTS:
+                return 404, _json_body({"error": f"Unknown endpoint '/{path}'"})
+            return 200, await self.query(path, dict(parse_qsl(url.query)))
+        except BadRequest as e:
+            return 400, _json_body({"error": str(e)})
+        except Exception as e:
+            print(f"[error] {method} {target}: {e!r}")
+            return 500, _json_body({"error": repr(e)})
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Minimal HTTP/1.1: one request at a time per connection, keep-alive by default."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    await self._respond(writer, 400, _json_body({"error": "Malformed request"}), False)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._respond(writer, 413, _json_body({"error": "Body too large"}), False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                self.requests += 1
+                status, payload = await self.dispatch(method.upper(), target, body)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: bytes, keep_alive: bool):
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + payload)
+        await writer.drain()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"[info] BetFinder server listening on http://{host}:{port} "
+              f"({self.threads} query threads)")
+        async with server:
+            await server.serve_forever()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Serve BetFinder queries over local HTTP/JSON.")
+    arg_parser.add_argument("--db", default="./new_database.db", help="sqlite database path")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--threads", type=int, default=4, help="query threads")
+    arg_parser.add_argument("--cache-size", type=int, default=4096,
+                            help="cached responses (and BetFinder results), 0 turns caching off")
+    arg_parser.add_argument("--debug", action="store_true")
+    args = arg_parser.parse_args()
+
+    server = BetFinderServer(args.db, threads=args.threads, cache_size=args.cache_size, debug=args.debug)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("[info] Shutting down.")
+    finally:
+        server.close()
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,106 @@
+import math
+from statistics import NormalDist
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional, only needed for the bootstrap intervals
+    np = None
+
+# win rate needed to break even on a standard -110 line: risk 110 to win 100
+STANDARD_JUICE = -110
+BREAK_EVEN = 110 / 210  # 0.5238
+
+def break_even_rate(american_odds: int = STANDARD_JUICE) -> float:
+    """Win probability at which a bet at `american_odds` has zero expected value."""
+    if american_odds < 0:
+        return -american_odds / (-american_odds + 100)
+    return 100 / (american_odds + 100)
+
+def normal_sf(z: float) -> float:
+    """P(Z >= z) for a standard normal Z."""
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def z_score(successes: int, trials: int, p: float = BREAK_EVEN) -> Optional[float]:
+    """Normal approximation z of `successes` out of `trials` against a true rate `p`."""
+    if trials <= 0:
+        return None
+    return (successes - trials * p) / math.sqrt(trials * p * (1 - p))
+
+def p_value(successes: int, trials: int, p: float = BREAK_EVEN) -> Optional[float]:
+    """
+    One sided p-value that a record at least this good happens by chance when the
+    true rate is `p` (e.g. a cover rate that only looks like it beats the juice).
+    """
+    z = z_score(successes, trials, p)
+    return normal_sf(z) if z is not None else None
+
+BOOTSTRAP_RESAMPLES = 10000
+# fixed by default so the same report shows the same intervals
+BOOTSTRAP_SEED = 0
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> Optional[Tuple[float, float]]:
+    """Wilson score interval for the success rate, in percent."""
+    if trials <= 0:
+        return None
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return (round((center - margin) * 100, 2), round((center + margin) * 100, 2))
+
+def bootstrap_intervals(successes: Sequence[int], trials: Sequence[int],
+                        resamples: int = BOOTSTRAP_RESAMPLES, confidence: float = 0.95,
+                        seed: Optional[int] = BOOTSTRAP_SEED) -> List[Optional[Tuple[float, float]]]:
+    """
+    Percentile bootstrap intervals (in percent) for many success rates at once.
+    Resampling n games with replacement from a record of k successes gives
+    Binomial(n, k / n) successes, so every resample of every record is drawn in a
+    single rng.binomial call of shape (records, resamples).
+    """
+    if np is None:
+        raise ImportError("bootstrap intervals need numpy: pip install numpy "
+                          "(or install this project with the 'analytics' extra).")
+    if len(trials) == 0:
+        return []
+    k = np.asarray(successes, dtype=np.float64)
+    n = np.asarray(trials, dtype=np.int64)
+    safe_n = np.maximum(n, 1)
+    rng = np.random.default_rng(seed)
+    draws = rng.binomial(n[:, None], (k / safe_n)[:, None], size=(len(n), resamples)) / safe_n[:, None]
+    alpha = (1 - confidence) / 2 * 100
+    lows, highs = np.percentile(draws, [alpha, 100 - alpha], axis=1)
+    return [
+        (round(low * 100, 2), round(high * 100, 2)) if count > 0 else None
+        for low, high, count in zip(lows.tolist(), highs.tolist(), n.tolist())
+    ]
+
+def rate_summaries(records: Sequence[Tuple[int, int]], break_even: float = BREAK_EVEN,
+                   resamples: int = BOOTSTRAP_RESAMPLES, confidence: float = 0.95) -> List[dict]:
+    """
+    count / games / pct, Wilson and bootstrap intervals and the one sided p-value
+    against `break_even` for each (successes, trials) record. The bootstrap interval
+    is None when numpy is not installed.
+    """
+    records = list(records)
+    try:
+        bootstraps = bootstrap_intervals([k for k, _ in records], [n for _, n in records],
+                                         resamples=resamples, confidence=confidence)
+    except ImportError as e:
+        print(f"[warn] {e}")
+        bootstraps = [None] * len(records)
+    return [
+        {
+            "count": successes,
+            "games": trials,
+            "pct": round(successes / trials * 100, 2) if trials else None,
+            "wilson_ci": wilson_interval(successes, trials, confidence),
+            "bootstrap_ci": bootstrap,
+            "p_value": p_value(successes, trials, break_even),
+        }
+        for (successes, trials), bootstrap in zip(records, bootstraps)
+    ]
+
+def rate_summary(successes: int, trials: int, **kwargs) -> dict:
+    return rate_summaries([(successes, trials)], **kwargs)[0]
@@ -1,104 +1,315 @@
 from CfbGame import CfbGame
 from CfbGameDb import CfbGameDb
+from CfbCsvParser import CfbCsvParser
+from TeamResolver import TeamResolver
+from IngestManifest import IngestManifest
+from TeamSeasonStats import TeamSeasonStats
+import argparse
 import csv
+import multiprocessing
+import os
+import queue as queue_module
 from pathlib import Path
 import sqlite3
-from utilities import cfb_tricodes, CsvKeys
-
-invalid_cfb_set = set()
-def parse_and_load(csv_path: Path, game_db: CfbGameDb):
-    with open(csv_path, newline='', encoding='utf-8') as csvfile:
-        reader = csv.reader(csvfile)
-        headers = next(reader)
-        count_inserted = 0
-        count_skipped = 0
-        for row in reader:
-            site = row[CsvKeys.SITE]
-            if site is None or site == "" or site == " ":
-                site = "N"
-            assert site is not None and site in ["N", "V", "H"], f"Site is not valid {site}"
-            season = row[CsvKeys.SEASON]
-            game_type = row[CsvKeys.GAME_TYPE]
-            date = row[CsvKeys.DATE]
-            team_rank = row[CsvKeys.TEAM_RANK]
-            team = row[CsvKeys.TEAM].lower().strip()
-            team_conf = row[CsvKeys.TEAM_CONF].lower().strip()
-            team_division = row[CsvKeys.TEAM_DIVISION]
-            coach = row[CsvKeys.COACH].lower().strip()
-            team_spread = row[CsvKeys.TEAM_SPREAD]
-            opp_rank = row[CsvKeys.OPP_RANK]
-            opponent = row[CsvKeys.OPPONENT].lower().strip()
-            opp_conf = row[CsvKeys.OPP_CONF].lower().strip()
-            opp_division = row[CsvKeys.OPP_DIVISION]
-            opp_coach = row[CsvKeys.OPP_COACH].lower().strip()
-            opp_spread = row[CsvKeys.OPP_SPREAD]
-            result = row[CsvKeys.RESULT]
-            team_points = row[CsvKeys.TEAM_POINTS]
-            opp_points = row[CsvKeys.OPP_POINTS]
-            points_diff = row[CsvKeys.POINTS_DIFF]
-            total_points = row[CsvKeys.TOTAL_POINTS]
-            team_season_id = row[CsvKeys.TEAM_SEASON_ID]
-            team_game_no = row[CsvKeys.TEAM_GAME_NO]
-            underdog_favorite = row[CsvKeys.UNDERDOG_FAVORITE].lower().strip()
-            covered = row[CsvKeys.COVERED]
-            team_wins_entering = row[CsvKeys.TEAM_WINS_ENTERING]
-            team_losses_entering = row[CsvKeys.TEAM_LOSSES_ENTERING]
-            team_ties_entering = row[CsvKeys.TEAM_TIES_ENTERING]
-            opp_wins_entering = row[CsvKeys.OPP_WINS_ENTERING]
-            opp_losses_entering = row[CsvKeys.OPP_LOSSES_ENTERING]
-            opp_ties_entering = row[CsvKeys.OPP_TIES_ENTERING]
-            over_under = row[CsvKeys.OVER_UNDER]
-            over_or_under_result = row[CsvKeys.OVER_OR_UNDER_RESULT]
-            # if team not in (k.lower().strip() for k in cfb_tricodes.keys()):
-            #     if team not in invalid_cfb_set:
-            #         invalid_cfb_set.add(team)
-            #         print(f"{team} not valid!")
-            #     continue
-            # if opponent not in (k.lower().strip() for k in cfb_tricodes.keys()):
-            #     if opponent not in invalid_cfb_set:
-            #         invalid_cfb_set.add(opponent)
-            #         print(f"{opponent} not valid!")
-            #     continue
-            # assert team in cfb_tricodes.keys(), f"{team} not valid"
-            # assert opponent in cfb_tricodes.keys(), f"{opponent} not valid"
-
-
-            team_id = game_db.get_team_id_by_name(team)
-            opponent_id = game_db.get_team_id_by_name(opponent)
-
-            game_obj = CfbGame(
-                team_id, opponent_id, season, game_type, date, team_rank,
-                team, team_conf, team_division, coach, team_spread, site,
-                opp_rank, opponent, opp_conf, opp_division, opp_coach, 
-                opp_spread, result, team_points, opp_points, points_diff, 
-                total_points, team_season_id, team_game_no, underdog_favorite,
-                covered, team_wins_entering, team_losses_entering, team_ties_entering,
-                opp_wins_entering, opp_losses_entering, opp_ties_entering,
-                over_under, over_or_under_result
-            )
-
-            # print(f"{team}: {team_id} vs {opponent}: {opponent_id}, {date}")
-
-            if team_id is None or opponent_id is None:
-                print(f"[warn] Skipping row due to unresolved team: {row}")
-                continue
+import time
+from typing import List, Optional
 
-            if game_db.game_exists(team_id, opponent_id, date):
-                # print(f"[info] Skipping existing game: {team}: {team_id} vs {opponent}: {opponent_id} on {date}")
-                count_skipped += 1
+def parse_and_load(csv_path: Path, game_db: CfbGameDb, batch_size: int = 5000,
+                   row_by_row: bool = False, update_existing: bool = True,
+                   rejects_path: Optional[Path] = None):
+    """
+    Load a CFB csv export into the games table.
+    Rows go through CfbCsvParser (typed columns, resolved team ids, bad rows written
+    to `rejects_path`, default <csv>.rejects.csv) and are then bulk loaded into a temp
+    staging table and merged into games with one INSERT ... ON CONFLICT on
+    (team_id, opponent_id, date), so re-loading an unchanged file inserts nothing.
+    `row_by_row=True` keeps the old game_exists + insert_game per row path, which is
+    only useful for debugging.
+    """
+    csv_path = Path(csv_path)
+    if rejects_path is None:
+        rejects_path = csv_path.with_suffix(".rejects.csv")
+    # team lookups are served from memory; pick up any teams added since the last load
+    game_db.resolver.refresh_if_changed()
+    parser = CfbCsvParser(game_db.resolver, chunk_size=batch_size, rejects_path=rejects_path)
+    games = parser.iter_file(csv_path)
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+    if row_by_row:
+        for game_tuple in games:
+            game_obj = CfbGame(*game_tuple)
+            if game_db.game_exists(game_obj.team_id, game_obj.opponent_id, game_obj.date):
+                counts["skipped"] += 1
                 continue
-            # construct game obj
             game_db.insert_game(game_obj)
-            count_inserted += 1
-        print(f"[info] {count_inserted} games inserted, {count_skipped} skipped (already existed).")
+            counts["inserted"] += 1
+    else:
+        counts.update(game_db.merge_games(games, batch_size=batch_size,
+                                          update_existing=update_existing))
+    counts["rejected"] = parser.counts["rejected"]
+    counts["unresolved"] = parser.counts["unresolved"]
+    game_db.ensure_indexes()
+    print(f"[info] {counts['inserted']} games inserted, {counts['updated']} updated, "
+          f"{counts['skipped']} skipped (already existed), {counts['unresolved']} unresolved, "
+          f"{counts['rejected']} rejected.")
+    return counts
+
+def _iter_tracked_lines(f, hasher, position: dict):
+    """
+    Decodes lines of a binary file for csv.reader while tracking how far it got:
+    `offset` / `lines` / hasher only cover newline terminated lines, `read` covers all.
+    """
+    for line in f:
+        position["read"] += len(line)
+        if line.endswith(b"\n"):
+            hasher.update(line)
+            position["offset"] += len(line)
+            position["lines"] += 1
+        yield line.decode("utf-8")
+
+def load_incremental(csv_path: Path, game_db: CfbGameDb, manifest: IngestManifest,
+                     batch_size: int = 5000, update_existing: bool = True):
+    """
+    Loads only what is new in `csv_path` since the last run, using the ingest manifest:
+    unchanged files are skipped, files that grew are read from the last checkpoint and
+    files changed before the checkpoint are reloaded in full. Every batch is merged and
+    checkpointed in the same transaction (manifest and game_db must share a connection),
+    so an interrupted load resumes from the last committed batch.
+    """
+    csv_path = Path(csv_path)
+    action, byte_offset, row_offset, hasher = manifest.plan(csv_path)
+    counts = {"inserted": 0, "updated": 0, "skipped": 0, "rejected": 0, "unresolved": 0,
+              "action": action}
+    if action == "skip":
+        print(f"[info] {csv_path} unchanged since last ingest, skipping.")
+        return counts
+    if action == "resume":
+        print(f"[info] Resuming {csv_path} after row {row_offset} (byte {byte_offset}).")
+
+    game_db.resolver.refresh_if_changed()
+    parser = CfbCsvParser(game_db.resolver, chunk_size=batch_size,
+                          rejects_path=csv_path.with_suffix(".rejects.csv"))
+    # the header line is not counted as a row
+    position = {"offset": byte_offset, "read": byte_offset,
+                "lines": row_offset if byte_offset else -1}
+    game_db.begin_staging()
+    try:
+        with open(csv_path, "rb") as f:
+            f.seek(byte_offset)
+            reader = csv.reader(_iter_tracked_lines(f, hasher, position))
+            if byte_offset == 0:
+                next(reader, None)
+            for tuples in parser.iter_chunks(reader):
+                staged = game_db.stage_games(tuples, batch_size=batch_size)
+                # recorded first and committed by merge_staging: rows + checkpoint are atomic
+                manifest.record(csv_path, hasher.hexdigest(), position["offset"],
+                                max(position["lines"], 0))
+                merged = game_db.merge_staging(update_existing=update_existing)
+                counts["inserted"] += merged["inserted"]
+                counts["updated"] += merged["updated"]
+                counts["skipped"] += staged - merged["inserted"] - merged["updated"]
+    finally:
+        parser.close()
+    manifest.record(csv_path, hasher.hexdigest(), position["offset"],
+                    max(position["lines"], 0), size=position["read"], commit=True)
+    counts["rejected"] = parser.counts["rejected"]
+    counts["unresolved"] = parser.counts["unresolved"]
+    print(f"[info] {csv_path}: {counts['inserted']} games inserted, {counts['updated']} updated, "
+          f"{counts['skipped']} skipped, {counts['unresolved']} unresolved, {counts['rejected']} rejected.")
+    return counts
+
+# seconds the queue must stay quiet before a worker that is gone without a "done" or
+# "error" message is reported as failed
+WORKER_GRACE = 5.0
+
+# per worker process state for load_many, set by _init_parse_worker
+_worker_queue = None
+_worker_db_path = None
+
+def _init_parse_worker(queue, db_path: str):
+    global _worker_queue, _worker_db_path
+    _worker_queue = queue
+    _worker_db_path = db_path
+
+def _parse_file_worker(source_order: int, csv_path: str, batch_size: int):
+    """
+    Runs in a pool process: parses one csv, resolves team ids against a read-only
+    connection and hands typed batches to the writer through the shared queue.
+    """
+    # lets the writer notice if this process dies before the file is done
+    _worker_queue.put(("start", source_order, os.getpid()))
+    try:
+        conn = sqlite3.connect(f"file:{_worker_db_path}?mode=ro", uri=True)
+        try:
+            for message in _iter_parsed_file(source_order, csv_path, TeamResolver(conn), batch_size):
+                _worker_queue.put(message)
+        finally:
+            conn.close()
+    except Exception as e:
+        _worker_queue.put(("error", source_order, f"{type(e).__name__}: {e}"))
+
+def _iter_parsed_file(source_order: int, csv_path: str, resolver: TeamResolver, batch_size: int):
+    csv_path = Path(csv_path)
+    parser = CfbCsvParser(resolver, chunk_size=batch_size,
+                          rejects_path=csv_path.with_suffix(".rejects.csv"))
+    for tuples in parser.iter_file_chunks(csv_path):
+        yield ("batch", source_order, tuples)
+    yield ("done", source_order, dict(parser.counts))
+
+def _iter_queue(queue, results: list, grace: float, poll: float = 1.0):
+    """
+    Messages from the parse workers until every file has ended with its "done" or
+    "error" message. A file whose worker is gone without sending either (the task
+    raised past its handler, the process was killed, or the last message could not be
+    sent) gets an "error" message once the queue has been quiet for `grace` seconds,
+    so the writer never waits forever. `results` are the AsyncResults by source order.
+    """
+    pending = set(range(len(results)))
+    worker_pids = {}
+    quiet_since = time.monotonic()
+    while pending:
+        try:
+            message = queue.get(timeout=poll)
+        except queue_module.Empty:
+            if time.monotonic() - quiet_since < grace:
+                continue
+            alive = {process.pid for process in multiprocessing.active_children()}
+            for source_order in sorted(pending):
+                result = results[source_order]
+                pid = worker_pids.get(source_order)
+                if result.ready():
+                    try:
+                        result.get()
+                        error = "worker finished without reporting"
+                    except Exception as e:
+                        error = f"{type(e).__name__}: {e}"
+                elif pid is not None and pid not in alive:
+                    error = f"worker process {pid} died"
+                else:
+                    continue
+                pending.discard(source_order)
+                yield ("error", source_order, error)
+            continue
+        quiet_since = time.monotonic()
+        kind, source_order, payload = message
+        if kind == "start":
+            worker_pids[source_order] = payload
+            continue
+        if kind != "batch":
+            pending.discard(source_order)
+        yield message
+
+def load_many(paths: List[Path], game_db: CfbGameDb, db_path: str, workers: int = 4,
+              batch_size: int = 5000, update_existing: bool = True):
+    """
+    Loads several csv files at once. A process pool parses, normalizes and resolves
+    team ids for each file in parallel and sends batches over a queue to this process,
+    the single SQLite writer, which stages them and merges everything into games in
+    one transaction. When the same game appears in several files the later path wins.
+    `db_path` is opened read-only by the workers for team lookups; workers <= 1 parses
+    in this process instead.
+    """
+    paths = [str(p) for p in paths]
+    start = time.perf_counter()
+    game_db.resolver.refresh_if_changed()
+    game_db.begin_staging()
+    file_counts = {}
+    staged = 0
+    print(f"[info] Loading {len(paths)} files with {max(workers, 1)} parser worker(s).")
+
+    if workers <= 1:
+        messages = (message for i, path in enumerate(paths)
+                    for message in _iter_parsed_file(i, path, game_db.resolver, batch_size))
+        pool = None
+    else:
+        queue = multiprocessing.Queue(maxsize=workers * 4)
+        pool = multiprocessing.Pool(processes=min(workers, len(paths)) or 1,
+                                    initializer=_init_parse_worker,
+                                    initargs=(queue, str(db_path)))
+        results = [pool.apply_async(_parse_file_worker, (i, path, batch_size))
+                   for i, path in enumerate(paths)]
+        pool.close()
+        messages = _iter_queue(queue, results, WORKER_GRACE)
+
+    try:
+        for kind, source_order, payload in messages:
+            path = paths[source_order]
+            if kind == "batch":
+                staged += game_db.stage_games(payload, batch_size=batch_size,
+                                              source_order=source_order)
+            elif kind == "done":
+                file_counts[path] = payload
+                print(f"[info] [{len(file_counts)}/{len(paths)}] {path}: {payload['parsed']} rows parsed, "
+                      f"{payload['rejected']} rejected, {payload['unresolved']} unresolved "
+                      f"({time.perf_counter() - start:.2f}s)")
+            else:
+                file_counts[path] = {"parsed": 0, "rejected": 0, "unresolved": 0, "error": payload}
+                print(f"[error] [{len(file_counts)}/{len(paths)}] {path}: {payload}")
+    finally:
+        if pool is not None:
+            deadline = time.monotonic() + WORKER_GRACE
+            for result in results:
+                result.wait(max(deadline - time.monotonic(), 0))
+            if not all(result.ready() for result in results):
+                # a task lost with its worker process never completes and would block join()
+                pool.terminate()
+            pool.join()
+
+    merged = game_db.merge_staging(update_existing=update_existing)
+    game_db.ensure_indexes()
+    counts = {
+        "inserted": merged["inserted"],
+        "updated": merged["updated"],
+        "skipped": staged - merged["inserted"] - merged["updated"],
+        "rejected": sum(c["rejected"] for c in file_counts.values()),
+        "unresolved": sum(c["unresolved"] for c in file_counts.values()),
+        "files": file_counts,
+    }
+    elapsed = time.perf_counter() - start
+    rate = staged / elapsed if elapsed > 0 else float("inf")
+    print(f"[info] Loaded {staged} rows from {len(paths)} files in {elapsed:.2f}s ({rate:.0f} rows/sec): "
+          f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['skipped']} skipped, "
+          f"{counts['unresolved']} unresolved, {counts['rejected']} rejected.")
+    return counts
 
 def main():
-    conn = sqlite3.connect("./new_database.db")
+    arg_parser = argparse.ArgumentParser(description="Load CFB csv exports into the games table.")
+    arg_parser.add_argument("csv_paths", nargs="*", type=Path,
+                            help="csv files to load; with none, print the first stored game")
+    arg_parser.add_argument("--db", default="./new_database.db", help="sqlite database path")
+    arg_parser.add_argument("--full", action="store_true",
+                            help="re-read every file (in parallel) instead of only new data")
+    arg_parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                            help="parser processes for --full multi-file loads")
+    arg_parser.add_argument("--batch-size", type=int, default=5000)
+    arg_parser.add_argument("--no-update", action="store_true",
+                            help="leave existing games untouched instead of updating changed values")
+    args = arg_parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
     game_db = CfbGameDb(conn)
-    # game_db.create_table_if_not_exists()
-    # csv_path = Path("../database/cfb_db_2024_normalized.csv")
-    # parse_and_load(csv_path=csv_path, game_db=game_db)
-    game_db.select_print_all()
+    if not args.csv_paths:
+        game_db.select_print_all()
+        game_db.close()
+        return
+    game_db.create_table_if_not_exists()
+    # triggers on games keep the aggregates current through every load path below
+    TeamSeasonStats(conn).create_table_if_not_exists()
+    manifest = IngestManifest(conn)
+    manifest.create_table_if_not_exists()
+    if not args.full:
+        for csv_path in args.csv_paths:
+            load_incremental(csv_path, game_db, manifest, batch_size=args.batch_size,
+                             update_existing=not args.no_update)
+        game_db.ensure_indexes()
+    else:
+        if len(args.csv_paths) == 1:
+            parse_and_load(args.csv_paths[0], game_db, batch_size=args.batch_size,
+                           update_existing=not args.no_update)
+        else:
+            load_many(args.csv_paths, game_db, args.db, workers=args.workers,
+                      batch_size=args.batch_size, update_existing=not args.no_update)
+        for csv_path in args.csv_paths:
+            manifest.record_complete(csv_path)
     game_db.close()
 
 if __name__=="__main__":
@@ -0,0 +1,57 @@
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+import pytest
+
+# the modules import each other flat (from CfbGameDb import CfbGameDb)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from CfbGameDb import CfbGameDb
+from database_setup import CfbTeamDb
+from utilities import game_date_columns
+
+TEAMS = ("alpha state", "bravo tech", "charlie a&m", "delta")
+
+def make_games(team_id: int, opponent_id: int, season: int, count: int, **values) -> list:
+    """`count` weekly games of team_id vs opponent_id from Sep 1 of `season`, sharing `values`."""
+    first = date(season, 9, 1)
+    games = []
+    for week in range(count):
+        game_date = first + timedelta(weeks=week)
+        games.append(dict(values, team_id=team_id, opponent_id=opponent_id, season=season,
+                          date=f"{game_date.month}/{game_date.day}/{game_date.year % 100:02d}"))
+    return games
+
+def insert_games(conn: sqlite3.Connection, games: list):
+    """Inserts game dicts (games column -> value) with the derived date columns filled in."""
+    for game in games:
+        row = dict(zip(("iso_date", "date_ord", "month", "day_of_season"),
+                       game_date_columns(game["date"], game["season"])))
+        row.update(game)
+        columns = ", ".join(row)
+        conn.execute(f"INSERT INTO games ({columns}) VALUES ({', '.join('?' * len(row))});",
+                     tuple(row.values()))
+    conn.commit()
+
+def create_db(path: Path) -> str:
+    """Empty games database with a small teams table (ids 1..len(TEAMS))."""
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(CfbTeamDb(conn)._ddl)
+        conn.executemany("INSERT INTO teams (team_name) VALUES (?);", [(name,) for name in TEAMS])
+        conn.commit()
+        CfbGameDb(conn).create_table_if_not_exists()
+    finally:
+        conn.close()
+    return str(path)
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    return create_db(tmp_path / "games.db")
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
@@ -0,0 +1,68 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from bet_finder import BetFinder
+from conftest import create_db, insert_games, make_games
+
+def _drop_date_columns(db_path: str):
+    # games as created before the date columns existed
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        DROP INDEX IF EXISTS idx_games_season_date_ord;
+        ALTER TABLE games DROP COLUMN iso_date;
+        ALTER TABLE games DROP COLUMN date_ord;
+        ALTER TABLE games DROP COLUMN month;
+        ALTER TABLE games DROP COLUMN day_of_season;
+    """)
+    conn.close()
+
+def test_old_database_gets_date_columns(db_path, conn):
+    insert_games(conn, make_games(1, 2, 2020, 3, team_spread=-3.5, team_points=24, opp_points=17))
+    _drop_date_columns(db_path)
+
+    bf = BetFinder(db_path)
+    try:
+        deltas = bf.spread_deltas(team_name="alpha state", start_year=2020, end_year=2020)
+    finally:
+        bf.close()
+    assert [row["date"] for row in deltas] == ["9/1/20", "9/8/20", "9/15/20"]
+
+def test_pooled_mode_refuses_old_database(db_path, conn):
+    insert_games(conn, make_games(1, 2, 2020, 3))
+    _drop_date_columns(db_path)
+
+    with pytest.raises(RuntimeError, match="date_ord"):
+        BetFinder(db_path, pooled=True)
+
+def test_close_closes_every_thread_connection(tmp_path):
+    # a path that needs escaping in a file: uri
+    db_path = create_db(tmp_path / "odd #name?.db")
+    conn = sqlite3.connect(db_path)
+    insert_games(conn, make_games(1, 2, 2020, 4, covered="yes"))
+    conn.close()
+
+    bf = BetFinder(db_path, cache_size=0, pooled=True)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: bf.did_cover("alpha state", start_year=2020, end_year=2020),
+                                    range(16)))
+    assert results == [100.0] * 16
+    connections = list(bf._connections)
+    assert len(connections) >= 3  # the shared one, this thread's and at least one worker's
+    bf.close()
+    for thread_conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+            thread_conn.execute("SELECT 1;")
+
+def test_team_report_gives_every_alias_its_report(db_path, conn):
+    insert_games(conn, make_games(1, 2, 2020, 5, covered="yes", over_or_under_result="over",
+                                  team_points=30, opp_points=20))
+    bf = BetFinder(db_path)
+    try:
+        report = bf.team_report(["alpha state", "Alpha  State", "nobody"], 2020, 2020, with_ci=True)
+    finally:
+        bf.close()
+    assert list(report) == ["alpha state", "Alpha  State", "nobody"]
+    assert report["alpha state"]["games"] == report["Alpha  State"]["games"] == 5
+    assert report["alpha state"] is not report["Alpha  State"]
+    assert report["Alpha  State"]["ci"]["cover"] is not None
+    assert report["nobody"]["team_id"] is None
@@ -0,0 +1,20 @@
+import asyncio
+import json
+from bet_finder_server import BetFinderServer
+from conftest import insert_games, make_games
+
+def test_rolling_trends_rejects_persist(db_path, conn):
+    insert_games(conn, make_games(1, 2, 2020, 12, covered="yes", over_or_under_result="over"))
+    server = BetFinderServer(db_path, threads=2)
+    try:
+        status, body = asyncio.run(server.dispatch(
+            "GET", "/rolling_trends?team_name=alpha%20state&window=5&persist=1", b""))
+        assert status == 400
+        assert "read-only" in json.loads(body)["error"]
+
+        status, body = asyncio.run(server.dispatch(
+            "GET", "/rolling_trends?team_name=alpha%20state&window=5", b""))
+        assert status == 200
+        assert len(json.loads(body)["result"]) == 12
+    finally:
+        server.close()
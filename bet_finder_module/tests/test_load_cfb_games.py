@@ -0,0 +1,22 @@
+import os
+import load_cfb_games
+from CfbGameDb import CfbGameDb
+
+def _parse_or_die(source_order, csv_path, resolver, batch_size):
+    if source_order == 1:
+        os._exit(1)  # killed mid-file, e.g. by the OOM killer
+    yield ("done", source_order, {"parsed": 0, "rejected": 0, "unresolved": 0})
+
+def test_load_many_survives_a_dead_worker(monkeypatch, conn, tmp_path):
+    # pool workers are forked, so they see the patched parser
+    monkeypatch.setattr(load_cfb_games, "_iter_parsed_file", _parse_or_die)
+    monkeypatch.setattr(load_cfb_games, "WORKER_GRACE", 0.5)
+    paths = [tmp_path / f"games_{i}.csv" for i in range(3)]
+    db_path = conn.execute("PRAGMA database_list;").fetchone()[2]
+
+    counts = load_cfb_games.load_many(paths, CfbGameDb(conn), db_path, workers=2)
+
+    errors = {path: file_counts.get("error") for path, file_counts in counts["files"].items()}
+    assert errors[str(paths[0])] is None and errors[str(paths[2])] is None
+    assert "died" in errors[str(paths[1])]
+    assert counts["inserted"] == 0
@@ -0,0 +1,28 @@
+from TrendMiner import TrendMiner, _mine_combo
+from conftest import insert_games, make_games
+
+def test_cell_with_ats_results_but_no_totals(conn):
+    # graded against the spread, but no total was ever posted
+    games = make_games(1, 2, 2020, 36, covered="yes", over_or_under_result=None)
+    games += make_games(1, 3, 2020, 4, covered="no", over_or_under_result=None)
+    insert_games(conn, games)
+
+    trends = _mine_combo(conn, ("team",), [(2020, 2020)], min_games=30, max_p=0.5)
+
+    assert [(t.metric, t.side, t.filters, t.bets, t.hits) for t in trends] == [
+        ("ats", "cover", (("team", 1),), 40, 36)]
+
+def test_run_counts_decided_games_only(db_path, conn):
+    games = make_games(1, 2, 2019, 20, covered="yes", over_or_under_result="over")
+    games += make_games(1, 2, 2020, 14, covered="yes", over_or_under_result="under")
+    games += make_games(1, 3, 2020, 6, covered="push", over_or_under_result="push")
+    insert_games(conn, games)
+
+    miner = TrendMiner(db_path, spans=(1,), min_games=10, max_p=0.5, dimensions=["team"], max_dims=1)
+    trends = {(t.metric, t.first_season, t.last_season): t for t in miner.run(workers=1)}
+
+    whole = trends[("ats", 2019, 2020)]
+    assert (whole.side, whole.bets, whole.hits) == ("cover", 34, 34)
+    assert (trends[("total", 2019, 2020)].side, trends[("total", 2019, 2020)].hits) == ("over", 20)
+    assert trends[("total", 2020, 2020)].side == "under"
+    assert miner.describe(whole) == "team=alpha state"
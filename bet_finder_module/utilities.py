@@ -1,5 +1,7 @@
 
 from enum import IntEnum
+from datetime import date, datetime
+from typing import Optional, Tuple
 
 class CsvKeys(IntEnum):
     NO = 0
@@ -47,6 +49,37 @@ class CsvKeys(IntEnum):
     EVENT_ID = 42
 
 
+def parse_game_date(date_text: Optional[str], season: Optional[int] = None) -> Optional[date]:
+    """
+    Parses a csv game date: m/d/yy (the export format), m/d/yyyy or ISO yyyy-mm-dd.
+    A two digit year is taken as the season year or the one after it (bowl games in
+    January). Returns None for an empty value and raises ValueError for bad input.
+    """
+    date_text = (date_text or "").strip()
+    if not date_text:
+        return None
+    if "-" in date_text:
+        return datetime.strptime(date_text[:10], "%Y-%m-%d").date()
+    month, day, year = (int(part) for part in date_text.split("/"))
+    if year < 100:
+        if season is not None and season % 100 == year:
+            year = season
+        elif season is not None and (season + 1) % 100 == year:
+            year = season + 1
+        else:
+            year += 1900 if year >= 50 else 2000
+    return date(year, month, day)
+
+def game_date_columns(date_text: Optional[str], season: Optional[int] = None) -> Tuple:
+    """(iso_date, date_ord, month, day_of_season) stored alongside games.date."""
+    game_date = parse_game_date(date_text, season)
+    if game_date is None:
+        return (None, None, None, None)
+    season_start = date(season if season is not None else game_date.year, 7, 1)
+    return (game_date.isoformat(), game_date.toordinal(), game_date.month,
+            (game_date - season_start).days)
+
+
 # Here are some imports that are useful
 nfl_tricodes = {'49ers': 'SF', 'Bears': 'CHI', 'Bengals': 'CIN',
             'Bills': 'BUF', 'Broncos': 'DEN', 'Browns': 'CLE',
@@ -4,6 +4,7 @@ from pathlib import Path
 from typing import Optional
 import json
 from enum import Enum
+from http_cache import CachedHttpClient, config
 
 class BovadaSports(Enum):
     NBASL="basketball/nba-summer-league"
@@ -13,8 +14,15 @@ class BovadaLive(Enum):
     PRE="preMatchOnly=true"
 
 
+# seconds a cached coupon is used before asking Bovada again (then it is revalidated)
+BOVADA_TTLS = {
+    r"liveOnly=true": 15,
+    r"preMatchOnly=true": 300,
+}
+
 class BovadaDataFetcher():
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, cache_dir: Optional[Path] = config.get("HTTP_CACHE_DIR"),
+                 replay: bool = False):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
             "Accept": "application/json, text/plain, */*",
@@ -23,17 +31,13 @@ class BovadaDataFetcher():
         self.base_url = "https://www.bovada.lv/services/sports/event/coupon/events/A/description"
         self.debug = debug
         self.base_data_storage_path = Path("/home/justin/Desktop/sports#2025#datastore")
+        self.http = CachedHttpClient(cache_dir, ttls=BOVADA_TTLS, headers=self.headers, replay=replay)
     def make_request(self, url: str):
         print(f"Attempting get request to {url}")
-        try:
-            response = requests.get(url, headers=self.headers)
-            if response.status_code == 200:
-                data = response.json()
-                print(f"Received data! Type: {type(data)}")
-                return data
-        except Exception as e:
-            print(f"Exception {e}")
-            return None
+        data = self.http.get_json(url)
+        if data is not None:
+            print(f"Received data! Type: {type(data)}")
+        return data
     def save_data_to_json(self, data_set: dict, sub_dir: str, file_name: str):
         data_file_path = self.base_data_storage_path / sub_dir / file_name
         try:
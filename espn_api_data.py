@@ -1,8 +1,11 @@
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from pathlib import Path
+from http_cache import CachedHttpClient, config
 import json
+import os
+import re
 
 #/home/justin/Desktop/000-github/download-odds-api-data/bovada-data/ncaaf#2025#regular_season
 # https://sports.core.api.espn.com/v2/sports/football/leagues/college-football/seasons/2025/types/2/weeks/1/events?lang=en&region=us&page=4
@@ -15,27 +18,62 @@ class EspnSeason(Enum):
     REG=2
     POST=3
 
+ESPN_BASE_URL = "https://sports.core.api.espn.com/v2/sports"
+ESPN_DATA_STORAGE_PATH = Path("/home/justin/Desktop/sports#2025#datastore/ncaaf#2025")
+# seconds a cached response is used without asking ESPN again (then it is revalidated)
+ESPN_TTLS = {
+    r"/(odds|score|status|situation|probabilities)\b": 60,
+    r"/events/\d+": 600,
+    r"/weeks/\d+/events": 3600,
+    r"/weeks\?": 86400,
+    r"/(teams|venues|athletes|franchises)/": 7 * 86400,
+}
+
 class EspnApi():
-    def __init__(self, debug=False):
-        self.data_storage_path = Path("/home/justin/Desktop/sports#2025#datastore/ncaaf#2025")
-        self.base_url = "https://sports.core.api.espn.com/v2/sports"
+    """
+    Pages and event $refs are fetched concurrently on up to `max_workers` threads
+    through a CachedHttpClient: one pooled keep-alive session, at most
+    `per_host_limit` requests in flight per host, retries with exponential backoff
+    (`backoff` * 2^n seconds, Retry-After is honoured) and, with a `cache_dir`
+    (default HTTP_CACHE_DIR from .env), responses cached per ESPN_TTLS.
+    max_workers=1 fetches one url at a time like before. `base_url` and
+    `data_storage_path` can point at a local stand-in server and a scratch directory.
+    """
+    def __init__(self, debug=False, base_url: str = ESPN_BASE_URL,
+                 data_storage_path: Path = ESPN_DATA_STORAGE_PATH,
+                 max_workers: int = 8, per_host_limit: int = 8,
+                 retries: int = 3, backoff: float = 0.5, timeout: float = 20,
+                 cache_dir: Optional[Path] = config.get("HTTP_CACHE_DIR"), replay: bool = False):
+        assert max_workers >= 1, "max_workers must be positive"
+        self.debug = debug
+        self.data_storage_path = Path(data_storage_path)
+        self.base_url = base_url.rstrip("/")
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
             "Accept": "application/json, text/plain, */*",
             # (maybe?) "Referer": "https://www.espn.com/",
         }
+        self.max_workers = max_workers
+        self.http = CachedHttpClient(cache_dir, ttls=ESPN_TTLS, headers=self.headers, replay=replay,
+                                     pool_size=max_workers, per_host_limit=per_host_limit,
+                                     retries=retries, backoff=backoff, timeout=timeout)
+
+    def close(self):
+        self.http.close()
 
     def make_request(self, url: str):
         print(f"Attempting get request to {url}")
-        try:
-            response = requests.get(url, headers=self.headers)
-            if response.status_code == 200:
-                data = response.json()
-                print(f"Received data! Type: {type(data)}")
-                return data
-        except Exception as e:
-            print(f"Exception {e}")
-            return None
+        data = self.http.get_json(url)
+        if data is not None and self.debug:
+            print(f"Received data! Type: {type(data)}")
+        return data
+
+    def make_requests(self, urls: List[str]) -> list:
+        """make_request for every url, concurrently; results are in the order of `urls`."""
+        if self.max_workers <= 1 or len(urls) <= 1:
+            return [self.make_request(url) for url in urls]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            return list(executor.map(self.make_request, urls))
 
     def parse_request_metadata(self, data: dict):
         # and pages / page count data
@@ -50,6 +88,24 @@ class EspnApi():
         }
         return page_data
 
+    def get_week_numbers(self, sport: EspnSport, season: int, season_type: EspnSeason) -> List[int]:
+        """Week numbers ESPN lists for a season type ([] when it has none)."""
+        url = (f"{self.base_url}/{sport.value}/seasons/{season}"
+               f"/types/{season_type.value}/weeks?lang=en&region=us")
+        data = self.make_request(url)
+        if data is None:
+            print(f"[warn] No weeks for {season} {season_type.name}")
+            return []
+        pages = [data] + self.make_requests([f"{url}&page={idx}" for idx in range(2, data.get("pageCount", 1) + 1)])
+        weeks = set()
+        for page in pages:
+            assert page is not None, f"Missing a page of {url}"
+            for ref in self.parse_events_items(page):
+                match = re.search(r"/weeks/(\d+)", ref)
+                if match:
+                    weeks.add(int(match.group(1)))
+        return sorted(weeks)
+
     def get_all_event_data(self, sport: EspnSport, season: int,
                            season_type: EspnSeason, week: int,
                            page_index: Optional[int] = 1):
@@ -68,12 +124,14 @@ class EspnApi():
         url_end = f"?lang=en&region=us&page={page_index}"
         url = url_start + url_end
         data = self.make_request(url)
+        assert data is not None, f"No data for {url}"
         page_data = self.parse_request_metadata(data)
         all_events_array = self.parse_events_items(data)
-        for idx in range(2, page_data["page_count"] + 1):
-            url_end = f"?lang=en&region=us&page={idx}"
-            url = url_start + url_end
-            next_data = self.make_request(url)
+        # the first page gives the page count, the rest are fetched together
+        page_urls = [url_start + f"?lang=en&region=us&page={idx}"
+                     for idx in range(2, page_data["page_count"] + 1)]
+        for page_url, next_data in zip(page_urls, self.make_requests(page_urls)):
+            assert next_data is not None, f"No data for {page_url}"
             all_events_array.extend(self.parse_events_items(next_data))
         assert len(all_events_array) == page_data["count"], f"Page data count != events array, {page_data['count']} != {len(all_events_array)}"
         return all_events_array
@@ -88,8 +146,11 @@ class EspnApi():
 
     def get_data_from_event_urls(self, url_array: list, season: int, season_type: EspnSeason, week: int):
         espn_data_set = {}
-        for url in url_array:
-            data = self.make_request(url)
+        responses = self.make_requests(list(url_array))
+        failed = [url for url, data in zip(url_array, responses) if data is None]
+        # never save a partial week
+        assert not failed, f"No data for {len(failed)} event(s): {failed[:5]}"
+        for data in responses:
             keys_list = ["id", "date", "name", "shortName"]
             sub_data = {k: data[k] for k in keys_list if k in data}
             sub_data["season"] = season
@@ -101,8 +162,12 @@ class EspnApi():
     def save_data_to_json(self, data_set: dict, espn_id_file: str):
         data_file_path = self.data_storage_path / espn_id_file
         try:
-            with open(data_file_path, 'w') as json_file:
+            # write then rename, so an interrupted run never leaves a truncated file
+            # that check_if_file_exists would take as done
+            tmp_path = data_file_path.with_name(data_file_path.name + ".tmp")
+            with open(tmp_path, 'w') as json_file:
                 json.dump(data_set, json_file, indent=4)
+            os.replace(tmp_path, data_file_path)
             print(f"Succesfully wrote data to : {data_file_path}")
             return
         except FileNotFoundError:
@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from espn_api_data import ESPN_BASE_URL, EspnApi, EspnSeason, EspnSport
+
+MANIFEST_FILE = "espn#manifest.json"
+
+def week_file_name(season: int, season_type: EspnSeason, week: int) -> str:
+    # regular season weeks keep the name EspnApi.run has always written
+    if season_type == EspnSeason.REG:
+        return f"espn#{season}#ids#week#{week}.json"
+    return f"espn#{season}#{season_type.name.lower()}#ids#week#{week}.json"
+
+def event_id_from_ref(ref: str) -> Optional[str]:
+    match = re.search(r"/events/(\d+)", ref)
+    return match.group(1) if match else None
+
+def parse_event_date(value: Optional[str]) -> Optional[datetime]:
+    """ESPN kickoff times look like 2025-08-30T16:00Z."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+def write_json_atomic(path: Path, data):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+class EspnBackfill:
+    """
+    Downloads ESPN event ids for any range of seasons / season types / weeks into
+    one directory, writing the same per week json as EspnApi.run.
+    A manifest (espn#manifest.json) records, per week, the $ref of every stored event
+    and whether the week is settled. A settled week (every event stored and kicked
+    off more than `refresh_days` ago) is skipped without any request; any other week
+    re-reads its event list and only fetches events that are missing, whose $ref
+    changed, or that are still upcoming / recent (time or matchup may change).
+    Events no longer listed for a week are dropped from its file.
+    The week file and then the manifest are replaced atomically after every week, so
+    an interrupted run resumes at the first unfinished week.
+    """
+    def __init__(self, api: EspnApi, out_dir: Path, sport: EspnSport = EspnSport.NCAAF,
+                 refresh_days: int = 7, recheck: bool = False):
+        self.api = api
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.sport = sport
+        self.refresh_days = refresh_days
+        self.recheck = recheck
+        self.manifest_path = self.out_dir / MANIFEST_FILE
+        self.manifest = self._load_manifest()
+        self.fetched = 0
+        self.kept = 0
+
+    def _load_manifest(self) -> dict:
+        if not self.manifest_path.exists():
+            return {"weeks": {}}
+        with open(self.manifest_path, "r") as f:
+            return json.load(f)
+
+    def _load_week_file(self, name: str) -> Dict[str, dict]:
+        path = self.out_dir / name
+        if not path.exists():
+            return {}
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            print(f"[warn] Corrupt {path}, fetching the week again")
+            return {}
+
+    def _is_settled(self, event: dict, now: datetime) -> bool:
+        kickoff = parse_event_date(event.get("date"))
+        return kickoff is not None and kickoff < now - timedelta(days=self.refresh_days)
+
+    def backfill_week(self, season: int, season_type: EspnSeason, week: int):
+        key = f"{season}/{season_type.name}/{week}"
+        name = week_file_name(season, season_type, week)
+        entry = self.manifest["weeks"].get(key, {})
+        stored = self._load_week_file(name)
+        if entry.get("settled") and not self.recheck and set(entry.get("events", {})) == set(stored):
+            print(f"[info] {key}: settled, {len(stored)} events stored")
+            self.kept += len(stored)
+            return
+
+        refs = self.api.get_all_event_data(self.sport, season, season_type, week)
+        listed = {}
+        for ref in refs:
+            event_id = event_id_from_ref(ref)
+            assert event_id is not None, f"No event id in {ref}"
+            listed[event_id] = ref
+        now = datetime.now(timezone.utc)
+        known_refs = entry.get("events", {})
+        missing = [ref for event_id, ref in listed.items()
+                   if event_id not in stored
+                   or known_refs.get(event_id) != ref
+                   or not self._is_settled(stored[event_id], now)]
+        fetched = self.api.get_data_from_event_urls(missing, season, season_type, week) if missing else {}
+
+        events = {}
+        for event_id in listed:
+            event = fetched.get(event_id, stored.get(event_id))
+            assert event is not None, f"{key}: event {event_id} was neither stored nor fetched"
+            events[event_id] = event
+        dropped = len(set(stored) - set(listed))
+        write_json_atomic(self.out_dir / name, events)
+        self.manifest["weeks"][key] = {
+            "file": name,
+            "events": listed,
+            "settled": all(self._is_settled(event, now) for event in events.values()),
+            "checked": now.isoformat(timespec="seconds"),
+        }
+        write_json_atomic(self.manifest_path, self.manifest)
+        self.fetched += len(fetched)
+        self.kept += len(events) - len(fetched)
+        print(f"[info] {key}: {len(events)} events, fetched {len(fetched)}, "
+              f"kept {len(events) - len(fetched)}, dropped {dropped}")
+
+    def run(self, seasons: Sequence[int], season_types: Sequence[EspnSeason],
+            weeks: Optional[Sequence[int]] = None):
+        """Backfills every (season, season type, week); `weeks` None means every week ESPN lists."""
+        for season in seasons:
+            for season_type in season_types:
+                season_weeks = list(weeks) if weeks else self.api.get_week_numbers(self.sport, season, season_type)
+                for week in season_weeks:
+                    self.backfill_week(season, season_type, week)
+        print(f"[info] Backfill done: fetched {self.fetched} events, {self.kept} already stored.")
+
+def parse_weeks(values: Optional[List[str]]) -> Optional[List[int]]:
+    """'1-5' and '7' style week arguments."""
+    if not values:
+        return None
+    weeks = []
+    for value in values:
+        first, _, last = value.partition("-")
+        weeks.extend(range(int(first), int(last or first) + 1))
+    return sorted(set(weeks))
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Resumable backfill of ESPN event ids.")
+    arg_parser.add_argument("--seasons", type=int, nargs=2, metavar=("FIRST", "LAST"), required=True)
+    arg_parser.add_argument("--types", nargs="+", choices=[t.name for t in EspnSeason], default=["REG"],
+                            help="season types")
+    arg_parser.add_argument("--weeks", nargs="+", help="weeks, e.g. 1-5 15 (default: every week ESPN lists)")
+    arg_parser.add_argument("--out", required=True, help="directory for the week files and the manifest")
+    arg_parser.add_argument("--base-url", default=ESPN_BASE_URL)
+    arg_parser.add_argument("--workers", type=int, default=8)
+    arg_parser.add_argument("--per-host", type=int, default=8, help="concurrent requests per host")
+    arg_parser.add_argument("--refresh-days", type=int, default=7,
+                            help="events that kicked off less than this long ago are fetched again")
+    arg_parser.add_argument("--recheck", action="store_true", help="re-read the event lists of settled weeks too")
+    args = arg_parser.parse_args()
+
+    api = EspnApi(base_url=args.base_url, data_storage_path=Path(args.out),
+                  max_workers=args.workers, per_host_limit=args.per_host)
+    backfill = EspnBackfill(api, Path(args.out), refresh_days=args.refresh_days, recheck=args.recheck)
+    try:
+        backfill.run(range(args.seasons[0], args.seasons[1] + 1),
+                     [EspnSeason[name] for name in args.types], parse_weeks(args.weeks))
+    finally:
+        api.close()
+
+if __name__=="__main__":
+    main()
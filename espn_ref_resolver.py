@@ -0,0 +1,226 @@
+import argparse
+import copy
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from espn_api_data import ESPN_BASE_URL, EspnApi, EspnSport
+
+# dotted key paths followed from each event; lists are fanned out and paged
+# collections ({"items": [...]}) are walked through transparently
+DEFAULT_PATHS = (
+    "competitions.competitors.team",
+    "competitions.competitors.score",
+    "competitions.odds",
+    "competitions.venue",
+)
+# refs reached through these keys change during a game day, so they are shared
+# between events of one run but never read back from the disk cache
+VOLATILE_KEYS = {"odds", "score", "status", "situation", "predictor", "probabilities"}
+
+def normalize_ref(url: str) -> str:
+    """
+    One cache key per resource: lower case scheme / host, sorted query, and https
+    for ESPN hosts (their $refs say http:// and would each cost a redirect).
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = parts.netloc.lower()
+    if scheme == "http" and host.endswith("espn.com"):
+        scheme = "https"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path, query, ""))
+
+class RefResolver:
+    """
+    Follows `$ref` links from ESPN events along `paths` and embeds the linked
+    documents in place of the {"$ref": ...} stubs.
+    Work goes level by level: every ref needed at the current depth, across all
+    events, is collected first, identical refs (the same team or venue shows up in
+    dozens of events) are fetched once, concurrently through EspnApi.make_requests,
+    and then the next level is collected from the embedded documents.
+    Fetched documents are memoized in memory and, when `cache_dir` is set, on disk
+    (one json file per normalized url, older than `disk_ttl` seconds is refetched);
+    refs under VOLATILE_KEYS only use the in-memory cache.
+    """
+    def __init__(self, api: EspnApi, paths: Sequence[str] = DEFAULT_PATHS,
+                 cache_dir: Optional[Path] = None, disk_ttl: Optional[float] = None,
+                 volatile_keys=VOLATILE_KEYS):
+        self.api = api
+        self.paths = [tuple(path.split(".")) for path in paths]
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.disk_ttl = disk_ttl
+        self.volatile_keys = set(volatile_keys)
+        self._memory: Dict[str, dict] = {}
+        self.stats = {"refs": 0, "memory_hits": 0, "disk_hits": 0, "fetched": 0, "failed": 0}
+
+    def _disk_path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def _read_disk(self, url: str) -> Optional[dict]:
+        path = self._disk_path(url)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except json.JSONDecodeError:
+            return None
+        if self.disk_ttl is not None and time.time() - entry["fetched"] > self.disk_ttl:
+            return None
+        return entry["data"]
+
+    def _write_disk(self, url: str, data: dict):
+        path = self._disk_path(url)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"url": url, "fetched": time.time(), "data": data}, f)
+        os.replace(tmp_path, path)
+
+    def fetch_many(self, urls: Dict[str, bool]) -> Dict[str, Optional[dict]]:
+        """Documents for normalized `urls` (url -> volatile), each fetched at most once per resolver."""
+        results = {}
+        to_fetch = []
+        for url, volatile in urls.items():
+            if url in self._memory:
+                self.stats["memory_hits"] += 1
+                results[url] = self._memory[url]
+                continue
+            data = self._read_disk(url) if self.cache_dir and not volatile else None
+            if data is not None:
+                self.stats["disk_hits"] += 1
+                self._memory[url] = results[url] = data
+                continue
+            to_fetch.append(url)
+        for url, data in zip(to_fetch, self.api.make_requests(to_fetch)):
+            results[url] = data
+            if data is None:
+                self.stats["failed"] += 1
+                continue
+            self.stats["fetched"] += 1
+            self._memory[url] = data
+            if self.cache_dir and not urls[url]:
+                self._write_disk(url, data)
+        return results
+
+    def _walk(self, parent, key, path: Tuple[str, ...], volatile: bool, pending: Dict[str, list]):
+        """Queues the refs under parent[key] still needed to follow `path`."""
+        node = parent[key]
+        volatile = volatile or (isinstance(key, str) and key in self.volatile_keys)
+        if isinstance(node, list):
+            for i in range(len(node)):
+                self._walk(node, i, path, volatile, pending)
+            return
+        if not isinstance(node, dict):
+            return
+        ref = node.get("$ref")
+        if ref and ((path and path[0] not in node and "items" not in node) or (not path and set(node) == {"$ref"})):
+            pending[normalize_ref(ref)].append((parent, key, path, volatile))
+        elif not path:
+            return
+        elif path[0] in node:
+            self._walk(node, path[0], path[1:], volatile, pending)
+        elif "items" in node:
+            self._walk(node, "items", path, volatile, pending)
+
+    def resolve(self, roots: List[dict], volatile_roots: bool = True) -> List[dict]:
+        """
+        Resolves `roots` (events, or {"$ref": event_url} stubs) in place along every
+        path and returns them. Root stubs are not read from the disk cache unless
+        `volatile_roots` is False (event documents change until the game is final).
+        """
+        holder = list(roots)
+        pending: Dict[str, list] = defaultdict(list)
+        for i in range(len(holder)):
+            for path in self.paths:
+                self._walk(holder, i, path, volatile_roots, pending)
+        while pending:
+            # stubs a naive traversal would have requested (one per place, not per path)
+            self.stats["refs"] += sum(len({(id(r[0]), r[1]) for r in referrers}) for referrers in pending.values())
+            documents = self.fetch_many({url: any(r[3] for r in referrers) for url, referrers in pending.items()})
+            next_pending: Dict[str, list] = defaultdict(list)
+            for url, referrers in pending.items():
+                data = documents.get(url)
+                if data is None:
+                    continue  # the stub stays in place
+                # one copy per url, shared by all its referrers, keeps the cached document pristine
+                data = copy.deepcopy(data)
+                for parent, key, path, volatile in referrers:
+                    parent[key] = data
+                for parent, key, path, volatile in referrers:
+                    # volatility is per ref: a team linked from a live score is still a team
+                    self._walk(parent, key, path, False, next_pending)
+            pending = next_pending
+        return holder
+
+    def resolve_event_urls(self, urls: Sequence[str]) -> List[dict]:
+        return self.resolve([{"$ref": url} for url in urls])
+
+def event_summary(event: dict) -> dict:
+    """Scores and ESPN odds of a resolved event (DEFAULT_PATHS)."""
+    summary = {key: event.get(key) for key in ("id", "date", "name", "shortName")}
+    competitions = event.get("competitions") or [{}]
+    competition = competitions[0]
+    competitors = []
+    for competitor in competition.get("competitors", []):
+        team = competitor.get("team") or {}
+        score = competitor.get("score") or {}
+        competitors.append({
+            "team_id": competitor.get("id"),
+            "team": team.get("displayName") or team.get("abbreviation"),
+            "home_away": competitor.get("homeAway"),
+            "winner": competitor.get("winner"),
+            "score": score.get("value") if isinstance(score, dict) else score,
+        })
+    odds = []
+    for line in (competition.get("odds") or {}).get("items", []):
+        if set(line) == {"$ref"}:
+            continue
+        odds.append({
+            "provider": (line.get("provider") or {}).get("name"),
+            "details": line.get("details"),
+            "spread": line.get("spread"),
+            "over_under": line.get("overUnder"),
+        })
+    summary["venue"] = (competition.get("venue") or {}).get("fullName")
+    summary["competitors"] = competitors
+    summary["odds"] = odds
+    return summary
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Resolve ESPN event $refs (teams, scores, odds).")
+    arg_parser.add_argument("week_files", nargs="+", help="espn#...#ids#week#N.json files (event ids)")
+    arg_parser.add_argument("--out", required=True, help="json file for the event summaries")
+    arg_parser.add_argument("--paths", nargs="+", default=list(DEFAULT_PATHS), help="dotted $ref paths to follow")
+    arg_parser.add_argument("--cache-dir", help="on-disk $ref cache directory")
+    arg_parser.add_argument("--disk-ttl", type=float, help="seconds before a disk cached document is refetched")
+    arg_parser.add_argument("--base-url", default=ESPN_BASE_URL)
+    arg_parser.add_argument("--workers", type=int, default=8)
+    args = arg_parser.parse_args()
+
+    event_ids = []
+    for week_file in args.week_files:
+        with open(week_file, "r") as f:
+            event_ids.extend(json.load(f))
+    api = EspnApi(base_url=args.base_url, max_workers=args.workers)
+    resolver = RefResolver(api, args.paths, cache_dir=args.cache_dir, disk_ttl=args.disk_ttl)
+    urls = [f"{api.base_url}/{EspnSport.NCAAF.value}/events/{event_id}?lang=en&region=us" for event_id in event_ids]
+    try:
+        events = resolver.resolve_event_urls(urls)
+    finally:
+        api.close()
+    summaries = {event.get("id", url): event_summary(event) for url, event in zip(urls, events)}
+    with open(args.out, "w") as f:
+        json.dump(summaries, f, indent=4)
+    stats = resolver.stats
+    print(f"[info] {len(events)} events: {stats['refs']} refs followed, {stats['fetched']} fetched, "
+          f"{stats['memory_hits']} memory / {stats['disk_hits']} disk hits, {stats['failed']} failed.")
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import requests
+from dotenv import dotenv_values
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+config = dotenv_values(".env")
+
+# responses worth retrying (rate limited / upstream hiccups), with exponential backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# query parameters that are credentials, not part of what a url names
+SECRET_PARAMS = ("apiKey", "api_key", "apikey")
+
+def cache_key_url(url: str, strip_params=SECRET_PARAMS) -> str:
+    """Url without credentials and with a sorted query, so equal requests share an entry."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in strip_params)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+class CachedHttpClient:
+    """
+    Shared GET-json layer for the fetchers: one pooled keep-alive session with
+    retries / backoff and a per-host concurrency limit, plus an on-disk cache.
+    The cache is content addressed: bodies are stored once under their sha256
+    (bodies/<hash>), and an index entry per url (index/<hash of url>.json) keeps
+    the body hash, ETag, Last-Modified and fetch time. An entry younger than its
+    TTL is served without a request; an older one is revalidated with
+    If-None-Match / If-Modified-Since, and a 304 serves the stored body again.
+    `ttls` maps url regexes to seconds (first match wins, else `default_ttl`).
+    `replay=True` serves any cached entry regardless of age and never hits the
+    network. If a refresh fails, the stale body is served with a warning.
+    """
+    def __init__(self, cache_dir: Optional[Path] = config.get("HTTP_CACHE_DIR"),
+                 ttls: Optional[Dict[str, float]] = None, default_ttl: float = 0,
+                 headers: Optional[dict] = None, replay: bool = False,
+                 pool_size: int = 8, per_host_limit: int = 8,
+                 retries: int = 3, backoff: float = 0.5, timeout: float = 20):
+        assert per_host_limit >= 1, "per_host_limit must be positive"
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            (self.cache_dir / "index").mkdir(parents=True, exist_ok=True)
+            (self.cache_dir / "bodies").mkdir(parents=True, exist_ok=True)
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (ttls or {}).items()]
+        self.default_ttl = default_ttl
+        self.replay = replay
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=["GET"], raise_on_status=False)
+        # enough pooled connections per host that no worker opens a throwaway one
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, per_host_limit),
+                              max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stale": 0, "errors": 0,
+                      "bytes_downloaded": 0, "bytes_saved": 0}
+
+    def close(self):
+        self.session.close()
+
+    def ttl_for(self, url: str) -> float:
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def _count(self, stat: str, size: int = 0):
+        with self._lock:
+            self.stats[stat] += 1
+            if stat in ("hits", "revalidated", "stale"):
+                self.stats["bytes_saved"] += size
+            elif stat == "misses":
+                self.stats["bytes_downloaded"] += size
+
+    def info(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _index_path(self, key: str) -> Path:
+        return self.cache_dir / "index" / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def _load(self, key: str) -> Tuple[Optional[dict], Optional[bytes]]:
+        if self.cache_dir is None:
+            return None, None
+        try:
+            with open(self._index_path(key), "r") as f:
+                entry = json.load(f)
+            with open(self.cache_dir / "bodies" / entry["body"], "rb") as f:
+                return entry, f.read()
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None, None
+
+    def _store(self, key: str, response: requests.Response, body: bytes):
+        if self.cache_dir is None:
+            return
+        body_hash = hashlib.sha256(body).hexdigest()
+        body_path = self.cache_dir / "bodies" / body_hash
+        if not body_path.exists():
+            self._write_atomic(body_path, body)
+        entry = {
+            "url": key,
+            "body": body_hash,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched": time.time(),
+        }
+        self._write_atomic(self._index_path(key), json.dumps(entry).encode("utf-8"))
+
+    def _touch(self, key: str, entry: dict):
+        entry = dict(entry, fetched=time.time())
+        self._write_atomic(self._index_path(key), json.dumps(entry).encode("utf-8"))
+
+    def get(self, url: str, ttl: Optional[float] = None,
+            on_response: Optional[Callable[[requests.Response], None]] = None) -> Optional[bytes]:
+        """
+        Response body of a GET to `url`, from the cache when allowed; None on failure.
+        `on_response` is called with every response that came from the network (e.g.
+        to read quota headers), not for cache hits.
+        """
+        key = cache_key_url(url)
+        entry, body = self._load(key)
+        if entry is not None:
+            age = time.time() - entry["fetched"]
+            if self.replay or age < (self.ttl_for(url) if ttl is None else ttl):
+                self._count("hits", len(body))
+                return body
+        elif self.replay:
+            print(f"[warn] Replay mode and no cached response for {key}")
+            self._count("errors")
+            return None
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            with self._host_slot(url):
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except Exception as e:
+            response = None
+            error = repr(e)
+        else:
+            error = f"status {response.status_code}"
+            if on_response is not None:
+                on_response(response)
+        if response is not None and response.status_code == 304 and entry is not None:
+            self._touch(key, entry)
+            self._count("revalidated", len(body))
+            return body
+        if response is not None and response.status_code == 200:
+            content = response.content
+            self._store(key, response, content)
+            self._count("misses", len(content))
+            return content
+        if entry is not None:
+            print(f"[warn] {key}: {error}, serving the cached response from {time.ctime(entry['fetched'])}")
+            self._count("stale", len(body))
+            return body
+        print(f"[warn] {key}: {error}")
+        self._count("errors")
+        return None
+
+    def get_json(self, url: str, ttl: Optional[float] = None,
+                 on_response: Optional[Callable[[requests.Response], None]] = None):
+        body = self.get(url, ttl=ttl, on_response=on_response)
+        if body is None:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            print(f"[warn] {cache_key_url(url)}: invalid json ({e})")
+            return None
+
+    def print_stats(self):
+        stats = self.info()
+        print(f"[info] http cache: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+              f"{stats['misses']} downloads, {stats['stale']} stale, {stats['errors']} errors; "
+              f"{stats['bytes_downloaded'] / 1e6:.2f} MB downloaded, {stats['bytes_saved'] / 1e6:.2f} MB saved")
@@ -0,0 +1,131 @@
+import argparse
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "odds_api"
+# region each fixture bookmaker is listed under by the Odds API
+BOOKMAKER_REGIONS = {
+    "draftkings": "us",
+    "fanduel": "us",
+    "betmgm": "us",
+    "espnbet": "us2",
+    "hardrockbet": "us2",
+}
+
+class OddsApiFixtureServer(ThreadingHTTPServer):
+    """
+    Offline stand-in for the Odds API v4, answering from recorded responses in
+    `fixture_dir` (sports.json and <sport>_odds.json). /events and /scores are
+    derived from the odds fixtures. Usage is metered like the real API (odds cost
+    markets x regions, scores 1 or 2 with daysFrom, the rest is free) and reported
+    in the x-requests-remaining / -used / -last headers; past the quota requests
+    get 401 OUT_OF_USAGE_CREDITS.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, fixture_dir: Path = FIXTURE_DIR, quota: int = 500):
+        super().__init__(address, OddsApiFixtureHandler)
+        self.fixture_dir = Path(fixture_dir)
+        self.quota = quota
+        self.used = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def load(self, name: str):
+        path = self.fixture_dir / name
+        if not path.exists():
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+class OddsApiFixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if not params.get("apiKey"):
+            return self._send(401, {"message": "API key is missing", "error_code": "MISSING_KEY"}, 0)
+        path = url.path.rstrip("/")
+        if path == "/v4/sports":
+            sports = self.server.load("sports.json")
+            if params.get("all") != "true":
+                sports = [sport for sport in sports if sport["active"]]
+            return self._send(200, sports, 0)
+
+        match = re.fullmatch(r"/v4/sports/([a-z0-9_]+)/(odds|events|scores)", path)
+        sports = {sport["key"] for sport in self.server.load("sports.json")}
+        if not match or match.group(1) not in sports:
+            return self._send(404, {"message": "Unknown sport or endpoint", "error_code": "UNKNOWN_SPORT"}, 0)
+        sport, endpoint = match.groups()
+        events = self.server.load(f"{sport}_odds.json") or []
+
+        if endpoint == "events":
+            return self._send(200, [{k: v for k, v in event.items() if k != "bookmakers"} for event in events], 0)
+        if endpoint == "scores":
+            cost = 2 if params.get("daysFrom") else 1
+            scores = [dict({k: v for k, v in event.items() if k != "bookmakers"},
+                           completed=False, scores=None, last_update=None) for event in events]
+            return self._send(200, scores, cost)
+
+        markets = [m for m in params.get("markets", "h2h").split(",") if m]
+        bookmakers = [b for b in params.get("bookmakers", "").split(",") if b]
+        regions = [r for r in params.get("regions", "").split(",") if r]
+        if not bookmakers and not regions:
+            return self._send(422, {"message": "Missing regions or bookmakers", "error_code": "INVALID_REGION"}, 0)
+        # bookmakers take precedence over regions, every 10 count as one region
+        cost = len(markets) * (-(-len(bookmakers) // 10) if bookmakers else len(regions))
+        if not events:
+            cost = 0  # responses without events are not billed
+        result = []
+        for event in events:
+            books = []
+            for book in event["bookmakers"]:
+                if (book["key"] in bookmakers) if bookmakers else (BOOKMAKER_REGIONS.get(book["key"]) in regions):
+                    book_markets = [market for market in book["markets"] if market["key"] in markets]
+                    if book_markets:
+                        books.append(dict(book, markets=book_markets))
+            result.append(dict(event, bookmakers=books))
+        return self._send(200, result, cost)
+
+    def _send(self, status: int, payload, cost: int):
+        with self.server.lock:
+            self.server.requests += 1
+            if status == 200 and self.server.used + cost > self.server.quota:
+                status, cost = 401, 0
+                payload = {"message": "Usage quota has been reached", "error_code": "OUT_OF_USAGE_CREDITS"}
+            self.server.used += cost if status == 200 else 0
+            used = self.server.used
+            remaining = self.server.quota - used
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("x-requests-remaining", str(remaining))
+        self.send_header("x-requests-used", str(used))
+        self.send_header("x-requests-last", str(cost if status == 200 else 0))
+        self.end_headers()
+        self.wfile.write(body)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Offline Odds API v4 stand-in serving recorded fixtures.")
+    arg_parser.add_argument("--port", type=int, default=8787)
+    arg_parser.add_argument("--fixtures", default=str(FIXTURE_DIR))
+    arg_parser.add_argument("--quota", type=int, default=500, help="usage credits before 401s")
+    args = arg_parser.parse_args()
+    server = OddsApiFixtureServer(("127.0.0.1", args.port), args.fixtures, args.quota)
+    print(f"[info] Odds API fixtures from {args.fixtures} on http://127.0.0.1:{args.port}/v4")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[info] Shutting down.")
+
+if __name__=="__main__":
+    main()
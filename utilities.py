@@ -1,62 +1,367 @@
-import requests
-from datetime import datetime
+import argparse
+import csv
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from enum import Enum
-from dotenv import dotenv_values
-
-config = dotenv_values(".env")
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+from http_cache import CachedHttpClient, config
 
 class SportsEnum(Enum):
     NFL="americanfootball_nfl"
+    NCAAF="americanfootball_ncaaf"
+    NBA="basketball_nba"
+    NCAAB="basketball_ncaab"
+    WNBA="basketball_wnba"
+    MLB="baseball_mlb"
+    NHL="icehockey_nhl"
+    MLS="soccer_usa_mls"
+    EPL="soccer_epl"
+
+ODDS_API_BASE_URL = "https://api.the-odds-api.com/v4"
+# featured markets, the ones /odds returns for every sport
+FEATURED_MARKETS = ("h2h", "spreads", "totals")
+# seconds a cached response is used before asking the Odds API again; every
+# request that reaches the API counts against the monthly quota
+ODDS_API_TTLS = {
+    r"/odds": 60,
+    r"/scores": 60,
+    r"/events": 300,
+    r"/sports/?(\?|$)": 86400,
+}
+
+class Outcome(NamedTuple):
+    name: str
+    price: float
+    point: Optional[float]
+
+class Market(NamedTuple):
+    key: str
+    last_update: Optional[str]
+    outcomes: tuple
+
+class Bookmaker(NamedTuple):
+    key: str
+    title: str
+    last_update: Optional[str]
+    markets: tuple
+
+class OddsEvent(NamedTuple):
+    id: str
+    sport_key: str
+    sport_title: Optional[str]
+    commence_time: str
+    home_team: Optional[str]
+    away_team: Optional[str]
+    bookmakers: tuple
+
+class OddsRow(NamedTuple):
+    """One outcome price, flattened for csv / sqlite."""
+    event_id: str
+    sport_key: str
+    commence_time: str
+    home_team: Optional[str]
+    away_team: Optional[str]
+    bookmaker: str
+    market: str
+    last_update: Optional[str]
+    outcome: str
+    price: float
+    point: Optional[float]
+
+def parse_odds_event(data: dict) -> OddsEvent:
+    """Odds API event json (with or without bookmakers) -> OddsEvent."""
+    bookmakers = tuple(
+        Bookmaker(book["key"], book.get("title", book["key"]), book.get("last_update"), tuple(
+            Market(market["key"], market.get("last_update"), tuple(
+                Outcome(outcome["name"], outcome["price"], outcome.get("point"))
+                for outcome in market.get("outcomes", [])
+            ))
+            for market in book.get("markets", [])
+        ))
+        for book in data.get("bookmakers", [])
+    )
+    return OddsEvent(data["id"], data["sport_key"], data.get("sport_title"), data["commence_time"],
+                     data.get("home_team"), data.get("away_team"), bookmakers)
+
+def iter_odds_rows(events: Iterable[OddsEvent]) -> Iterator[OddsRow]:
+    for event in events:
+        for book in event.bookmakers:
+            for market in book.markets:
+                for outcome in market.outcomes:
+                    yield OddsRow(event.id, event.sport_key, event.commence_time, event.home_team,
+                                  event.away_team, book.key, market.key, market.last_update or book.last_update,
+                                  outcome.name, outcome.price, outcome.point)
+
+def odds_request_cost(markets: Sequence[str], regions: Sequence[str], bookmakers: Sequence[str] = ()) -> int:
+    """Usage credits of one /odds request: markets x regions, every 10 bookmakers count as a region."""
+    region_units = -(-len(bookmakers) // 10) if bookmakers else len(regions)
+    return len(markets) * region_units
+
+class QuotaTracker:
+    """
+    Usage credits left this month, from the x-requests-remaining / x-requests-used
+    headers of the last response. Requests reserve their estimated cost first, so
+    concurrent requests never overshoot, and are refused when they would dip into
+    `reserve`. With `pace=True` a day may only spend remaining / days until the
+    quota resets (`reset_day` of the month); the start of day balance is kept in
+    `state_path` so separate runs on the same day share the budget.
+    """
+    def __init__(self, reserve: int = 0, pace: bool = False, reset_day: int = 1,
+                 state_path: Optional[Path] = None):
+        self.reserve = reserve
+        self.pace = pace
+        self.reset_day = reset_day
+        self.state_path = Path(state_path) if state_path else None
+        self.remaining: Optional[int] = None
+        self.used: Optional[int] = None
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._cycle = None
+        self._day = None
+        self._day_start_remaining: Optional[int] = None
+        if self.state_path and self.state_path.exists():
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+            self._cycle = state.get("cycle")
+            self._day = state.get("day")
+            self._day_start_remaining = state.get("day_start_remaining")
+            self.remaining = state.get("remaining")
+            self.used = state.get("used")
+
+    def cycle_start(self, today: Optional[date] = None) -> date:
+        """Day the current monthly quota started."""
+        today = today or date.today()
+        if today.day >= self.reset_day:
+            return today.replace(day=self.reset_day)
+        if today.month == 1:
+            return date(today.year - 1, 12, self.reset_day)
+        return date(today.year, today.month - 1, self.reset_day)
+
+    def days_left(self, today: Optional[date] = None) -> int:
+        today = today or date.today()
+        if today.day < self.reset_day:
+            return self.reset_day - today.day
+        next_month = date(today.year + (today.month == 12), today.month % 12 + 1, 1)
+        return (next_month - today).days + self.reset_day - 1
+
+    def daily_budget(self) -> Optional[float]:
+        if self._day_start_remaining is None:
+            return None
+        return self._day_start_remaining / self.days_left()
+
+    def update(self, headers):
+        remaining = headers.get("x-requests-remaining")
+        if remaining is None:
+            return
+        remaining = int(float(remaining))
+        used = int(float(headers.get("x-requests-used", 0)))
+        with self._lock:
+            # concurrent responses can arrive out of order: usage only grows within a
+            # quota cycle, so an older (lower) count is ignored
+            cycle = self.cycle_start().isoformat()
+            if self._cycle == cycle and self.used is not None and used < self.used:
+                return
+            self._cycle = cycle
+            self.remaining = remaining
+            self.used = used
+            today = date.today().isoformat()
+            if self._day != today:
+                self._day = today
+                self._day_start_remaining = self.remaining + int(float(headers.get("x-requests-last", 0)))
+            self._save()
+
+    def _save(self):
+        if self.state_path is None:
+            return
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"cycle": self._cycle, "day": self._day, "day_start_remaining": self._day_start_remaining,
+                       "remaining": self.remaining, "used": self.used}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def try_reserve(self, cost: int) -> bool:
+        with self._lock:
+            if cost <= 0 or self.remaining is None:
+                # free, or nothing known yet (the first response tells)
+                self.pending += max(cost, 0)
+                return True
+            if self.remaining - self.pending - self.reserve < cost:
+                return False
+            if self.pace and self._day == date.today().isoformat():
+                spent_today = self._day_start_remaining - self.remaining + self.pending
+                if spent_today + cost > self.daily_budget():
+                    return False
+            self.pending += cost
+            return True
+
+    def release(self, cost: int):
+        with self._lock:
+            self.pending -= max(cost, 0)
+
+    def describe(self) -> str:
+        budget = self.daily_budget()
+        pace = f", {budget:.0f} per day until reset" if self.pace and budget is not None else ""
+        return f"{self.remaining} remaining, {self.used} used{pace}"
 
 class OddsDataFetcher():
-    def __init__(self, version: int):
+    """
+    Odds API v4 client. Every sport's odds come from one /odds request carrying all
+    regions and markets (the API bills markets x regions per request either way);
+    inactive sports, learned from the free /sports list, are never requested.
+    Requests go through a QuotaTracker fed by the usage headers and independent
+    sports are fetched concurrently. Responses are parsed into
+    OddsEvent / Bookmaker / Market / Outcome tuples. `base_url` can point at
+    odds_api_fixture_server.py for offline runs.
+    """
+    def __init__(self, version: int, cache_dir: Optional[Path] = config.get("HTTP_CACHE_DIR"),
+                 replay: bool = False, base_url: str = ODDS_API_BASE_URL,
+                 api_key: Optional[str] = config.get("API_KEY"),
+                 quota: Optional[QuotaTracker] = None, max_workers: int = 4):
         assert version == 4, "Can only handle Odds API V4!"
-        self.base_url = "https://api.the-odds-api.com/v4"
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_workers = max_workers
+        self.quota = quota or QuotaTracker()
+        # the apiKey query parameter is left out of cache keys
+        self.http = CachedHttpClient(cache_dir, ttls=ODDS_API_TTLS, replay=replay, pool_size=max_workers)
+
+    def close(self):
+        self.http.close()
+
+    def _url(self, path: str, **params) -> str:
+        query = "&".join(f"{key}={value}" for key, value in params.items() if value is not None)
+        return f"{self.base_url}{path}?apiKey={self.api_key}" + (f"&{query}" if query else "")
 
     # helper to wrap requests
-    def make_request(self, url: str):
-        print(f"Attempting get request to {url}")
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-                print(f"Succesfully received data! Type: {type(data)}")
-                return data
-        except Exception as e:
-            print(f"Exception {e}")
+    def make_request(self, url: str, cost: int = 0):
+        """GET json; `cost` is the estimated usage, refused up front when the quota can't cover it."""
+        if not self.quota.try_reserve(cost):
+            print(f"[warn] Skipping {url.split('apiKey=')[0]}: costs {cost}, quota {self.quota.describe()}")
             return None
+        print(f"Attempting get request to {url.split('apiKey=')[0]}")
+        try:
+            data = self.http.get_json(url, on_response=lambda response: self.quota.update(response.headers))
+        finally:
+            self.quota.release(cost)
+        if data is not None:
+            print(f"Succesfully received data! Type: {type(data)}")
+        return data
 
     # handle types
     def process_odds_api_data(self, data):
-        print(type(data))
         if isinstance(data, list):
-            self.process_list_data(data)
+            return self.process_list_data(data)
         if isinstance(data, dict):
-            self.process_dict_data(data)
+            return self.process_dict_data(data)
+        return None
 
-    # helper to abstractlly process json data
+    # the API answers errors with {"message": ..., "error_code": ...}
     def process_dict_data(self, data: dict):
-        print("Process dict data")
+        print(f"[warn] Odds API: {data.get('message', data)}")
+        return None
+
+    def process_list_data(self, data: list) -> List[OddsEvent]:
+        return [parse_odds_event(event) for event in data]
 
-    def process_list_data(self, data: list):
-        print("Process list data")
+    def get_sports(self, all_sports: bool = False) -> Optional[list]:
+        """Sports list; free, so it also primes the quota numbers."""
+        return self.make_request(self._url("/sports", all="true" if all_sports else None))
 
     #Request sport events
-    def get_events(self, sport: SportsEnum):
-        url = (
-                f"{self.base_url}/sports/{sport.value}/events"
-                f"?apiKey={config.get('API_KEY')}"
-        )
-        data = self.make_request(url)
+    def get_events(self, sport: Union[SportsEnum, str]) -> Optional[List[OddsEvent]]:
+        sport_key = sport.value if isinstance(sport, SportsEnum) else sport
+        data = self.make_request(self._url(f"/sports/{sport_key}/events"))
         if not data:
             print("Could not process None data in get_events")
-            return
-        print("Processing data!")
-        self.process_odds_api_data(data)
+            return None
+        return self.process_odds_api_data(data)
+
+    def get_odds(self, sport: Union[SportsEnum, str], regions: Sequence[str] = ("us",),
+                 markets: Sequence[str] = FEATURED_MARKETS, bookmakers: Sequence[str] = (),
+                 odds_format: str = "american") -> Optional[List[OddsEvent]]:
+        sport_key = sport.value if isinstance(sport, SportsEnum) else sport
+        url = self._url(f"/sports/{sport_key}/odds",
+                        regions=",".join(regions) if not bookmakers else None,
+                        bookmakers=",".join(bookmakers) if bookmakers else None,
+                        markets=",".join(markets), oddsFormat=odds_format, dateFormat="iso")
+        data = self.make_request(url, cost=odds_request_cost(markets, regions, bookmakers))
+        if data is None:
+            return None
+        return self.process_odds_api_data(data)
 
+    def get_odds_bulk(self, sports: Sequence[Union[SportsEnum, str]], regions: Sequence[str] = ("us",),
+                      markets: Sequence[str] = FEATURED_MARKETS, bookmakers: Sequence[str] = (),
+                      odds_format: str = "american") -> Dict[str, List[OddsEvent]]:
+        """
+        Odds for many sports, one request each, run concurrently. Sports are listed
+        in priority order: when the quota can't cover all of them the later ones are
+        skipped. Returns sport key -> events for the sports that were fetched.
+        """
+        sport_keys = [sport.value if isinstance(sport, SportsEnum) else sport for sport in sports]
+        listed = self.get_sports()
+        if listed is not None:
+            active = {sport["key"] for sport in listed if sport.get("active")}
+            skipped = [key for key in sport_keys if key not in active]
+            if skipped:
+                print(f"[info] Not active, not requested: {', '.join(skipped)}")
+            sport_keys = [key for key in sport_keys if key in active]
+        cost = odds_request_cost(markets, regions, bookmakers)
+        print(f"[info] {len(sport_keys)} sports x {cost} credits, quota {self.quota.describe()}")
+        results: Dict[str, List[OddsEvent]] = {}
+        if not sport_keys:
+            return results
+
+        def fetch(sport_key: str):
+            return sport_key, self.get_odds(sport_key, regions, markets, bookmakers, odds_format)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(sport_keys))) as executor:
+            for sport_key, events in executor.map(fetch, sport_keys):
+                if events is not None:
+                    results[sport_key] = events
+        print(f"[info] Fetched odds for {len(results)}/{len(sport_keys)} sports, quota {self.quota.describe()}")
+        return results
+
+def write_odds_csv(events: Iterable[OddsEvent], path: str) -> int:
+    count = 0
+    with open(path, "w", newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(OddsRow._fields)
+        for row in iter_odds_rows(events):
+            writer.writerow(row)
+            count += 1
+    return count
 
 def main():
-    print("utilites.py")
+    arg_parser = argparse.ArgumentParser(description="Fetch Odds API v4 odds for many sports.")
+    arg_parser.add_argument("--sports", nargs="+", default=[SportsEnum.NFL.name, SportsEnum.NCAAF.name],
+                            help="SportsEnum names or sport keys, highest priority first")
+    arg_parser.add_argument("--regions", nargs="+", default=["us"])
+    arg_parser.add_argument("--markets", nargs="+", default=list(FEATURED_MARKETS))
+    arg_parser.add_argument("--bookmakers", nargs="+", default=[])
+    arg_parser.add_argument("--base-url", default=ODDS_API_BASE_URL, help="e.g. the fixture server")
+    arg_parser.add_argument("--reserve", type=int, default=0, help="credits never spent")
+    arg_parser.add_argument("--pace", action="store_true", help="spread the remaining quota over the days left")
+    arg_parser.add_argument("--state", help="quota state file, shares the daily budget between runs")
+    arg_parser.add_argument("--workers", type=int, default=4)
+    arg_parser.add_argument("--out", help="write one row per outcome price to this csv")
+    args = arg_parser.parse_args()
+
+    sports = [SportsEnum[name].value if name in SportsEnum.__members__ else name for name in args.sports]
+    quota = QuotaTracker(reserve=args.reserve, pace=args.pace, state_path=args.state)
+    fetcher = OddsDataFetcher(version=4, base_url=args.base_url, quota=quota, max_workers=args.workers)
+    try:
+        results = fetcher.get_odds_bulk(sports, args.regions, args.markets, args.bookmakers)
+    finally:
+        fetcher.close()
+    for sport_key, events in results.items():
+        print(f"{sport_key}: {len(events)} events, {sum(1 for _ in iter_odds_rows(events))} prices")
+    if args.out:
+        count = write_odds_csv([event for events in results.values() for event in events], args.out)
+        print(f"[info] Wrote {count} prices to {args.out}")
 
 if __name__=="__main__":
     main()